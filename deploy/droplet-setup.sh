@@ -37,9 +37,10 @@ After=network.target
 [Service]
 User=root
 WorkingDirectory=$APP_DIR/stacktrail_backend
-ExecStart=$APP_DIR/stacktrail_backend/venv/bin/gunicorn guardrail.wsgi:application --bind 127.0.0.1:8000 --workers 2
+ExecStart=$APP_DIR/stacktrail_backend/venv/bin/gunicorn --bind 127.0.0.1:8000 --workers 2
 Restart=always
 Environment=PATH=$APP_DIR/stacktrail_backend/venv/bin
+Environment=GUNICORN_PROFILE=asgi
 
 [Install]
 WantedBy=multi-user.target
@@ -49,6 +50,27 @@ systemctl daemon-reload
 systemctl enable stacktrail-gunicorn
 systemctl restart stacktrail-gunicorn
 
+echo "=== Scan worker systemd service ==="
+cat > /tmp/stacktrail-worker.service << EOF
+[Unit]
+Description=StackTrail scan worker
+After=network.target
+
+[Service]
+User=root
+WorkingDirectory=$APP_DIR/stacktrail_backend
+ExecStart=$APP_DIR/stacktrail_backend/venv/bin/python manage.py run_worker
+Restart=always
+Environment=PATH=$APP_DIR/stacktrail_backend/venv/bin
+
+[Install]
+WantedBy=multi-user.target
+EOF
+mv /tmp/stacktrail-worker.service /etc/systemd/system/
+systemctl daemon-reload
+systemctl enable stacktrail-worker
+systemctl restart stacktrail-worker
+
 echo "=== Nginx (HTTP first; Certbot will add HTTPS) ==="
 cp "$APP_DIR/deploy/nginx.stacktrail-http-only.conf" /etc/nginx/sites-available/stacktrail
 ln -sf /etc/nginx/sites-available/stacktrail /etc/nginx/sites-enabled/
@@ -59,3 +81,4 @@ echo "=== Done ==="
 echo "1. Ensure stacktrail_backend/.env exists (DJANGO_SECRET_KEY, ALLOWED_HOSTS, OPENAI_API_KEY, etc.)."
 echo "2. Run: sudo certbot --nginx -d stacktrail.org -d www.stacktrail.org"
 echo "3. Gunicorn: systemctl status stacktrail-gunicorn"
+echo "4. Scan worker: systemctl status stacktrail-worker"
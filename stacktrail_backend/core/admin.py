@@ -1,8 +1,14 @@
 from django.contrib import admin
-from .models import Organization, Assessment, ScanRun, ReportRun, Finding
+from .models import AISuggestion, Organization, Assessment, ScanJob, ScanRun, ScanSection, ScanSweep, ReportRun, Finding, TicketLink, TicketOutboxItem
 
 admin.site.register(Organization)
 admin.site.register(Assessment)
 admin.site.register(ScanRun)
+admin.site.register(ScanSection)
+admin.site.register(ScanSweep)
+admin.site.register(ScanJob)
 admin.site.register(ReportRun)
 admin.site.register(Finding)
+admin.site.register(AISuggestion)
+admin.site.register(TicketLink)
+admin.site.register(TicketOutboxItem)
@@ -1,66 +1,437 @@
-"""AI-generated cyber hygiene suggestions and tags for findings."""
+"""AI-generated cyber hygiene suggestions and tags for findings.
+
+get_ai_suggestions_many() answers a batch of items: cached results come from the AISuggestion table,
+misses are packed AI_SUGGESTION_BATCH_SIZE to a prompt (one keyed JSON reply per prompt), prompts run
+concurrently (AI_SUGGESTION_CONCURRENCY at a time), and anything a combined reply did not cover is
+retried one item per prompt. iter_ai_suggestions() yields the same results one by one as they become
+ready (cache hits first), for streaming responses. aget_ai_suggestions_many() / aiter_ai_suggestions()
+are the async versions for async views: prompts run on the async OpenAI client, so waiting on the
+model holds no thread. Set AI_SUGGESTION_BACKEND = "core.ai_suggestions.StubBackend" to run
+without OpenAI (tests, demos).
+"""
+import asyncio
+import functools
+import hashlib
 import json
 import logging
 import os
+import weakref
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+from typing import Any, AsyncIterator, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import AISuggestion
 
 logger = logging.getLogger(__name__)
 
+# Bump when the prompt changes so cached answers to the old prompt are not reused.
+PROMPT_VERSION = 1
+EMPTY = {"suggestions": [], "tags": []}
 
-def get_ai_suggestions_for_finding(
-    title: str,
-    explanation: str,
-    remediation_steps: list,
-    extra_context: str = "",
-) -> dict:
-    """Call OpenAI to return suggestions and Google Workspace–style tags for a finding.
-    Returns {"suggestions": list[str], "tags": list[str]}."""
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key:
-        logger.warning("OPENAI_API_KEY not set; AI suggestions disabled. Set it in .env or environment.")
-        return {"suggestions": [], "tags": []}
 
-    try:
-        from openai import OpenAI
-        client = OpenAI(api_key=api_key)
-        steps_text = "\n".join(f"- {s}" for s in (remediation_steps or []))
-        prompt = f"""You are a cyber hygiene advisor for small businesses. Given this checklist item, do two things:
+class SuggestionRequest(NamedTuple):
+    title: str
+    explanation: str = ""
+    remediation_steps: Sequence[str] = ()
+    extra_context: str = ""
+    # Label for the item in a combined prompt (e.g. the finding key); not part of the cache key.
+    key: str = ""
+
+
+def _item_text(item: SuggestionRequest) -> str:
+    steps_text = "\n".join(f"- {s}" for s in (item.remediation_steps or []))
+    extra_context = item.extra_context
+    return f"""Checklist item: {item.title}
+Context: {item.explanation or "General cyber hygiene."}
+Existing steps: {steps_text or "None"}
+{extra_context and f"Extra context: {extra_context}" or ""}"""
+
+
+def build_prompt(item: SuggestionRequest) -> str:
+    return f"""You are a cyber hygiene advisor for small businesses. Given this checklist item, do two things:
 
 1. Suggest 2-4 short, actionable steps (one line each) to address it. Be specific and practical.
 2. Suggest 2-4 tags/labels to categorize this item for Google Workspace (e.g. Gmail labels, Drive folders, or task labels). Use short, single-word or two-word tags like: Security, Identity, MFA, Backups, Compliance, Training, Access, Email, Payments, Incident-Response.
 
-Checklist item: {title}
-Context: {explanation or "General cyber hygiene."}
-Existing steps: {steps_text or "None"}
-{extra_context and f"Extra context: {extra_context}" or ""}
+{_item_text(item)}
 
 Return only a single JSON object with two keys: "suggestions" (array of step strings) and "tags" (array of tag strings). Example: {{"suggestions": ["Step one", "Step two"], "tags": ["Security", "MFA", "Identity"]}}. No other text."""
 
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
+
+def build_batch_prompt(items: Dict[str, SuggestionRequest]) -> str:
+    """One prompt for several items: the instructions are sent once and the reply is keyed by item id."""
+    sections = "\n\n".join(f"[{key}]\n{_item_text(item)}" for key, item in items.items())
+    example = json.dumps({key: {"suggestions": ["Step one", "Step two"], "tags": ["Security", "MFA"]} for key in list(items)[:1]})
+    return f"""You are a cyber hygiene advisor for small businesses. For EACH checklist item below (each starts with its id in brackets), do two things:
+
+1. Suggest 2-4 short, actionable steps (one line each) to address it. Be specific and practical.
+2. Suggest 2-4 tags/labels to categorize this item for Google Workspace (e.g. Gmail labels, Drive folders, or task labels). Use short, single-word or two-word tags like: Security, Identity, MFA, Backups, Compliance, Training, Access, Email, Payments, Incident-Response.
+
+{sections}
+
+Return only a single JSON object with one key per item id ({", ".join(items)}); each value is an object with "suggestions" (array of step strings) and "tags" (array of tag strings). Example: {example}. No other text."""
+
+
+def _clean(data: Any) -> Optional[dict]:
+    if not isinstance(data, dict):
+        return None
+    suggestions = data.get("suggestions") if isinstance(data.get("suggestions"), list) else []
+    tags = data.get("tags") if isinstance(data.get("tags"), list) else []
+    return {"suggestions": [str(s) for s in suggestions], "tags": [str(t) for t in tags]}
+
+
+def _extract_json(text: str) -> Any:
+    """Decode the JSON object in a model reply (code fences and leading prose are skipped); None if there isn't one."""
+    text = (text or "").strip()
+    # Strip markdown code block if present
+    if "```" in text:
+        start = text.find("```")
+        if text[start:start + 7] == "```json":
+            start += 7
+        else:
+            start = text.find("\n", start) + 1 if text.find("\n", start) != -1 else start + 3
+        end = text.find("```", start)
+        if end != -1:
+            text = text[start:end].strip()
+    if "{" in text:
+        text = text[text.index("{"):]
+    try:
+        return json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        return None
+
+
+def parse_response(text: str) -> Optional[dict]:
+    """Pull {"suggestions": [...], "tags": [...]} out of a model reply; None if it isn't there."""
+    return _clean(_extract_json(text))
+
+
+def parse_batch_response(text: str, keys: Sequence[str]) -> Dict[str, dict]:
+    """Per-item results from a combined reply; items missing or malformed in the reply are left out."""
+    data = _extract_json(text)
+    if not isinstance(data, dict):
+        return {}
+    out = {}
+    for key in keys:
+        item = _clean(data.get(key))
+        if item is not None:
+            out[key] = item
+    return out
+
+
+@functools.lru_cache(maxsize=4)
+def openai_client(api_key: str):
+    """One client (and connection pool) per key for the whole process; safe to share across threads."""
+    from openai import OpenAI
+    return OpenAI(api_key=api_key)
+
+
+# AsyncOpenAI pools connections on the event loop that created them, so clients are kept per loop.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+
+
+def async_openai_client(api_key: str):
+    from openai import AsyncOpenAI
+    clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+    if api_key not in clients:
+        clients[api_key] = AsyncOpenAI(api_key=api_key)
+    return clients[api_key]
+
+
+class OpenAIBackend:
+    """Chat completions. suggest() / suggest_batch() return None / omit items on failure so misses are not cached;
+    asuggest() / asuggest_batch() do the same on the async client."""
+
+    def __init__(self):
+        self.model = getattr(settings, "AI_SUGGESTION_MODEL", "gpt-4o-mini")
+        self.api_key = os.environ.get("OPENAI_API_KEY")
+
+    @property
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    def _complete(self, prompt: str) -> str:
+        resp = openai_client(self.api_key).chat.completions.create(
+            model=self.model,
             messages=[{"role": "user", "content": prompt}],
             temperature=0.3,
         )
-        text = (resp.choices[0].message.content or "").strip()
-        # Strip markdown code block if present
-        if "```" in text:
-            start = text.find("```")
-            if text[start:start + 7] == "```json":
-                start += 7
-            else:
-                start = text.find("\n", start) + 1 if text.find("\n", start) != -1 else start + 3
-            end = text.find("```", start)
-            if end != -1:
-                text = text[start:end].strip()
-        if "{" in text:
-            text = text[text.index("{"):]
+        return resp.choices[0].message.content or ""
+
+    async def _acomplete(self, prompt: str) -> str:
+        resp = await async_openai_client(self.api_key).chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.3,
+        )
+        return resp.choices[0].message.content or ""
+
+    def suggest(self, item: SuggestionRequest) -> Optional[dict]:
+        try:
+            return parse_response(self._complete(build_prompt(item)))
+        except Exception as e:
+            logger.exception("OpenAI AI suggestions failed: %s", e)
+            return None
+
+    def suggest_batch(self, items: Dict[str, SuggestionRequest]) -> Dict[str, dict]:
+        try:
+            return parse_batch_response(self._complete(build_batch_prompt(items)), list(items))
+        except Exception as e:
+            logger.exception("OpenAI batched AI suggestions failed: %s", e)
+            return {}
+
+    async def asuggest(self, item: SuggestionRequest) -> Optional[dict]:
+        try:
+            return parse_response(await self._acomplete(build_prompt(item)))
+        except Exception as e:
+            logger.exception("OpenAI AI suggestions failed: %s", e)
+            return None
+
+    async def asuggest_batch(self, items: Dict[str, SuggestionRequest]) -> Dict[str, dict]:
         try:
-            data = json.loads(text)
-            suggestions = data.get("suggestions") if isinstance(data.get("suggestions"), list) else []
-            tags = data.get("tags") if isinstance(data.get("tags"), list) else []
-            return {"suggestions": [str(s) for s in suggestions], "tags": [str(t) for t in tags]}
-        except (json.JSONDecodeError, TypeError):
-            pass
-        return {"suggestions": [], "tags": []}
-    except Exception as e:
-        logger.exception("OpenAI AI suggestions failed: %s", e)
-        return {"suggestions": [], "tags": []}
+            return parse_batch_response(await self._acomplete(build_batch_prompt(items)), list(items))
+        except Exception as e:
+            logger.exception("OpenAI batched AI suggestions failed: %s", e)
+            return {}
+
+
+class StubBackend:
+    """Deterministic local backend: echoes the existing steps and derives tags from the title."""
+    model = "stub"
+    available = True
+
+    def suggest(self, item: SuggestionRequest) -> Optional[dict]:
+        steps = [str(s) for s in item.remediation_steps][:4] or [f"Review: {item.title}"]
+        tags = ["Security"] + [w.capitalize() for w in item.title.split() if len(w) > 3][:2]
+        return {"suggestions": steps, "tags": tags}
+
+    def suggest_batch(self, items: Dict[str, SuggestionRequest]) -> Dict[str, dict]:
+        return {key: self.suggest(item) for key, item in items.items()}
+
+    async def asuggest(self, item: SuggestionRequest) -> Optional[dict]:
+        return self.suggest(item)
+
+    async def asuggest_batch(self, items: Dict[str, SuggestionRequest]) -> Dict[str, dict]:
+        return self.suggest_batch(items)
+
+
+def get_backend():
+    return import_string(getattr(settings, "AI_SUGGESTION_BACKEND", "core.ai_suggestions.OpenAIBackend"))()
+
+
+def cache_key(item: SuggestionRequest, model: str) -> str:
+    payload = [PROMPT_VERSION, model, item.title, item.explanation or "", list(item.remediation_steps or []), item.extra_context or ""]
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False).encode()).hexdigest()
+
+
+def _cache_ttl() -> timedelta:
+    return timedelta(seconds=int(getattr(settings, "AI_SUGGESTION_CACHE_TTL_SECONDS", 30 * 24 * 3600)))
+
+
+def _cached(keys: List[str]) -> Dict[str, dict]:
+    now = timezone.now()
+    rows = AISuggestion.objects.filter(key__in=keys, created_at__gt=now - _cache_ttl()).values_list("key", "suggestions", "tags")
+    found = {key: {"suggestions": suggestions, "tags": tags} for key, suggestions, tags in rows}
+    if found:
+        AISuggestion.objects.filter(key__in=list(found)).update(last_used_at=now)
+    return found
+
+
+def _store(results: Dict[str, dict], model: str) -> None:
+    now = timezone.now()
+    with transaction.atomic():
+        AISuggestion.objects.bulk_create(
+            [
+                AISuggestion(key=key, model=model, suggestions=r["suggestions"], tags=r["tags"], created_at=now, last_used_at=now)
+                for key, r in results.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["key"],
+            update_fields=["model", "suggestions", "tags", "created_at", "last_used_at"],
+        )
+
+
+def prune_cache() -> int:
+    """Drop expired entries, then the least recently used beyond AI_SUGGESTION_CACHE_MAX_ENTRIES."""
+    deleted, _ = AISuggestion.objects.filter(created_at__lte=timezone.now() - _cache_ttl()).delete()
+    max_entries = int(getattr(settings, "AI_SUGGESTION_CACHE_MAX_ENTRIES", 5000))
+    stale = list(AISuggestion.objects.order_by("-last_used_at").values_list("pk", flat=True)[max_entries:])
+    if stale:
+        deleted += AISuggestion.objects.filter(pk__in=stale).delete()[0]
+    return deleted
+
+
+def _prompt_ids(items: Dict[str, SuggestionRequest]) -> Dict[str, str]:
+    """cache key -> id used in a combined prompt: the item's own key when it is set and unique, else its position."""
+    ids = {}
+    for n, (digest, item) in enumerate(items.items(), start=1):
+        ids[digest] = item.key if item.key and item.key not in ids.values() else f"item-{n}"
+    return ids
+
+
+def _generate(backend, missing: Dict[str, SuggestionRequest]) -> Iterator[Dict[str, Optional[dict]]]:
+    """Run the backend over uncached items, yielding replies as each prompt finishes: combined prompts
+    first (when the backend supports them), then one prompt per item for whatever they did not cover."""
+    concurrency = int(getattr(settings, "AI_SUGGESTION_CONCURRENCY", 4))
+    batch_size = int(getattr(settings, "AI_SUGGESTION_BATCH_SIZE", 20))
+    covered = set()
+    with ThreadPoolExecutor(max_workers=max(1, min(len(missing), concurrency)), thread_name_prefix="ai-suggest") as pool:
+        if batch_size > 1 and len(missing) > 1 and hasattr(backend, "suggest_batch"):
+            keys = list(missing)
+            chunks = [keys[i:i + batch_size] for i in range(0, len(keys), batch_size)]
+
+            def run_chunk(chunk: List[str]) -> Dict[str, dict]:
+                ids = _prompt_ids({key: missing[key] for key in chunk})
+                replies = backend.suggest_batch({ids[key]: missing[key] for key in chunk})
+                return {key: replies[ids[key]] for key in chunk if ids[key] in replies}
+
+            for future in as_completed([pool.submit(run_chunk, chunk) for chunk in chunks]):
+                replies = future.result()
+                covered.update(replies)
+                yield replies
+            if len(covered) < len(missing):
+                logger.info("Combined AI suggestion reply covered %d of %d items; retrying the rest one by one", len(covered), len(missing))
+        futures = {pool.submit(backend.suggest, item): key for key, item in missing.items() if key not in covered}
+        for future in as_completed(futures):
+            yield {futures[future]: future.result()}
+
+
+def _positions(items: Sequence[SuggestionRequest], model: str) -> Dict[str, List[int]]:
+    """Cache key -> indexes of the items that share it (identical items in one batch are generated once)."""
+    positions: Dict[str, List[int]] = {}
+    for index, item in enumerate(items):
+        positions.setdefault(cache_key(item, model), []).append(index)
+    return positions
+
+
+def _indexed(positions: Dict[str, List[int]], results: Dict[str, dict]) -> List[Tuple[int, dict]]:
+    return [(index, result) for key, result in results.items() for index in positions[key]]
+
+
+def iter_ai_suggestions(items: Sequence[SuggestionRequest], backend=None) -> Iterator[Tuple[int, dict]]:
+    """(index, result) for every item as soon as it is ready: cache hits first, then generated items
+    as their prompts finish, then empty results for items that failed."""
+    backend = backend or get_backend()
+    if not items:
+        return
+    if not backend.available:
+        logger.warning("OPENAI_API_KEY not set; AI suggestions disabled. Set it in .env or environment.")
+        for index in range(len(items)):
+            yield index, dict(EMPTY)
+        return
+    positions = _positions(items, backend.model)
+    cached = _cached(list(positions))
+    yield from _indexed(positions, cached)
+    missing = {key: items[indexes[0]] for key, indexes in positions.items() if key not in cached}
+    if not missing:
+        return
+    done = set()
+    for replies in _generate(backend, missing):
+        fresh = {key: r for key, r in replies.items() if r is not None}
+        if fresh:
+            _store(fresh, backend.model)
+        done.update(fresh)
+        yield from _indexed(positions, fresh)
+    # Once per call rather than per stored reply (prompts finish one by one).
+    if done:
+        prune_cache()
+    yield from _indexed(positions, {key: dict(EMPTY) for key in missing if key not in done})
+
+
+async def _acall(backend, method: str, arg):
+    """backend.a<method>(arg), or the sync method on a thread for backends without async support."""
+    if hasattr(backend, f"a{method}"):
+        return await getattr(backend, f"a{method}")(arg)
+    return await asyncio.to_thread(getattr(backend, method), arg)
+
+
+async def _agenerate(backend, missing: Dict[str, SuggestionRequest]) -> AsyncIterator[Dict[str, Optional[dict]]]:
+    """_generate() on the event loop; AI_SUGGESTION_CONCURRENCY prompts in flight at once."""
+    limit = asyncio.Semaphore(max(1, int(getattr(settings, "AI_SUGGESTION_CONCURRENCY", 4))))
+    batch_size = int(getattr(settings, "AI_SUGGESTION_BATCH_SIZE", 20))
+
+    async def run_chunk(chunk: List[str]) -> Dict[str, dict]:
+        ids = _prompt_ids({key: missing[key] for key in chunk})
+        async with limit:
+            replies = await _acall(backend, "suggest_batch", {ids[key]: missing[key] for key in chunk})
+        return {key: replies[ids[key]] for key in chunk if ids[key] in replies}
+
+    async def run_one(key: str) -> Dict[str, Optional[dict]]:
+        async with limit:
+            return {key: await _acall(backend, "suggest", missing[key])}
+
+    covered = set()
+    if batch_size > 1 and len(missing) > 1 and hasattr(backend, "suggest_batch"):
+        keys = list(missing)
+        for next_reply in asyncio.as_completed([run_chunk(keys[i:i + batch_size]) for i in range(0, len(keys), batch_size)]):
+            replies = await next_reply
+            covered.update(replies)
+            yield replies
+        if len(covered) < len(missing):
+            logger.info("Combined AI suggestion reply covered %d of %d items; retrying the rest one by one", len(covered), len(missing))
+    for next_reply in asyncio.as_completed([run_one(key) for key in missing if key not in covered]):
+        yield await next_reply
+
+
+async def aiter_ai_suggestions(items: Sequence[SuggestionRequest], backend=None) -> AsyncIterator[Tuple[int, dict]]:
+    """Async iter_ai_suggestions(); cache reads and writes run through sync_to_async."""
+    backend = backend or get_backend()
+    if not items:
+        return
+    if not backend.available:
+        logger.warning("OPENAI_API_KEY not set; AI suggestions disabled. Set it in .env or environment.")
+        for index in range(len(items)):
+            yield index, dict(EMPTY)
+        return
+    positions = _positions(items, backend.model)
+    cached = await sync_to_async(_cached)(list(positions))
+    for pair in _indexed(positions, cached):
+        yield pair
+    missing = {key: items[indexes[0]] for key, indexes in positions.items() if key not in cached}
+    if not missing:
+        return
+    done = set()
+    async for replies in _agenerate(backend, missing):
+        fresh = {key: r for key, r in replies.items() if r is not None}
+        if fresh:
+            await sync_to_async(_store)(fresh, backend.model)
+        done.update(fresh)
+        for pair in _indexed(positions, fresh):
+            yield pair
+    if done:
+        await sync_to_async(prune_cache)()
+    for pair in _indexed(positions, {key: dict(EMPTY) for key in missing if key not in done}):
+        yield pair
+
+
+def get_ai_suggestions_many(items: Sequence[SuggestionRequest], backend=None) -> List[dict]:
+    """Suggestions for each item, in order. Cache hits cost one query; misses are sent in combined
+    prompts that run concurrently. Failed items come back empty."""
+    results: List[dict] = [dict(EMPTY) for _ in items]
+    for index, result in iter_ai_suggestions(items, backend):
+        results[index] = result
+    return results
+
+
+async def aget_ai_suggestions_many(items: Sequence[SuggestionRequest], backend=None) -> List[dict]:
+    results: List[dict] = [dict(EMPTY) for _ in items]
+    async for index, result in aiter_ai_suggestions(items, backend):
+        results[index] = result
+    return results
+
+
+def get_ai_suggestions_for_finding(
+    title: str,
+    explanation: str,
+    remediation_steps: list,
+    extra_context: str = "",
+) -> dict:
+    """Return suggestions and Google Workspace–style tags for a finding.
+    Returns {"suggestions": list[str], "tags": list[str]}."""
+    return get_ai_suggestions_many([SuggestionRequest(title, explanation, tuple(remediation_steps or ()), extra_context)])[0]
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        # Parse and validate the scoring rulesets at startup so a bad file fails fast.
+        import guardrail.rulesets  # noqa: F401
@@ -0,0 +1,40 @@
+"""Async DRF views for I/O-bound endpoints (AI suggestions).
+
+DRF's APIView.dispatch is sync. AsyncAPIViewMixin runs it as a coroutine: authentication, permissions and
+throttling (database work) go through sync_to_async, then the async handler is awaited. Under ASGI a view
+waiting on DNS, HTTP or the model holds no thread; under WSGI Django runs it with async_to_sync as usual.
+"""
+import inspect
+
+from asgiref.sync import sync_to_async
+from rest_framework import views
+
+
+class AsyncAPIViewMixin:
+    """Put before the DRF view class; every handler except options must be `async def`."""
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncAPIView(AsyncAPIViewMixin, views.APIView):
+    pass
@@ -0,0 +1,135 @@
+"""
+Conditional GET and response caching for polled read endpoints.
+
+Every write that changes what an org's read endpoints return bumps Organization.data_version
+(bump_org_versions, called inside the write's transaction). GET responses are keyed by
+(user, URL, version): the ETag is derived from that key, so If-None-Match is answered with 304
+and a matching cache entry is served without running the view. Old entries are never read again
+once the version moves on and simply expire.
+
+Counters are cached for RESPONSE_CACHE_VERSION_TTL seconds. Bumps made in this process drop the
+cached counter on commit; bumps from other processes (the scan worker) show up after the TTL.
+"""
+import functools
+import hashlib
+from typing import Callable, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Max, Sum
+from django.utils.http import parse_etags
+from rest_framework import response, status
+
+from .models import Assessment, Organization
+
+
+def response_ttl() -> int:
+    return int(getattr(settings, "RESPONSE_CACHE_TTL", 300))
+
+
+def version_ttl() -> int:
+    return int(getattr(settings, "RESPONSE_CACHE_VERSION_TTL", 5))
+
+
+def _org_key(org_id: int) -> str:
+    return f"version:org:{org_id}"
+
+
+def _owner_key(user_id: int) -> str:
+    return f"version:owner:{user_id}"
+
+
+def bump_org_versions(org_ids: Iterable[int]) -> None:
+    """Mark these orgs' read data as changed. Call inside the transaction that writes it."""
+    org_ids = sorted(set(org_ids))
+    if not org_ids:
+        return
+    orgs = Organization.objects.filter(pk__in=org_ids)
+    orgs.update(data_version=F("data_version") + 1)
+    owner_ids = set(orgs.values_list("owner_id", flat=True))
+    keys = [_org_key(pk) for pk in org_ids] + [_owner_key(pk) for pk in owner_ids]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def org_version(org_id: int) -> Optional[str]:
+    key = _org_key(org_id)
+    version = cache.get(key)
+    if version is None:
+        row = Organization.objects.filter(pk=org_id).values_list("data_version", flat=True).first()
+        if row is None:
+            return None
+        version = f"org{org_id}.{row}"
+        cache.set(key, version, version_ttl())
+    return version
+
+
+def owner_version(user_id: int) -> str:
+    """Version of everything a user's dashboard shows: their orgs' counters plus org creation."""
+    key = _owner_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        agg = Organization.objects.filter(owner_id=user_id).aggregate(n=Count("pk"), last=Max("pk"), total=Sum("data_version"))
+        version = f"owner{user_id}.{agg['n']}.{agg['last'] or 0}.{agg['total'] or 0}"
+        cache.set(key, version, version_ttl())
+    return version
+
+
+def assessment_org_id(user_id: int, assessment_id: int) -> Optional[int]:
+    """The org an assessment belongs to (never changes, so cached without expiry)."""
+    key = f"assessment-org:{user_id}:{assessment_id}"
+    org_id = cache.get(key)
+    if org_id is None:
+        org_id = (
+            Assessment.objects.filter(pk=assessment_id, organization__owner_id=user_id)
+            .values_list("organization_id", flat=True)
+            .first()
+        )
+        if org_id is None:
+            return None
+        cache.set(key, org_id, None)
+    return org_id
+
+
+def user_dashboard_version(request, **kwargs) -> Optional[str]:
+    return owner_version(request.user.pk)
+
+
+def org_pk_version(request, pk, **kwargs) -> Optional[str]:
+    return org_version(pk)
+
+
+def assessment_pk_version(request, pk, **kwargs) -> Optional[str]:
+    org_id = assessment_org_id(request.user.pk, pk)
+    return org_version(org_id) if org_id is not None else None
+
+
+def versioned_get(version: Callable[..., Optional[str]]):
+    """Decorate a view's get(): ETag / If-None-Match plus a per-user response cache keyed by
+    version(request, **url_kwargs). A None version runs the view uncached."""
+
+    def decorator(get):
+        @functools.wraps(get)
+        def wrapper(view, request, *args, **kwargs):
+            current = version(request, **kwargs)
+            if current is None:
+                return get(view, request, *args, **kwargs)
+            digest = hashlib.sha256(f"{request.user.pk}|{request.build_absolute_uri()}|{current}".encode()).hexdigest()
+            etag = f'"{digest[:40]}"'
+            headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+            if etag in parse_etags(request.headers.get("If-None-Match", "")):
+                return response.Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+            cache_key = f"response:{digest}"
+            data = cache.get(cache_key)
+            if data is not None:
+                return response.Response(data, headers=headers)
+            resp = get(view, request, *args, **kwargs)
+            if resp.status_code == status.HTTP_200_OK:
+                cache.set(cache_key, resp.data, response_ttl())
+                for name, value in headers.items():
+                    resp[name] = value
+            return resp
+
+        return wrapper
+
+    return decorator
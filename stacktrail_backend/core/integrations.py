@@ -1,48 +1,297 @@
-"""Create cards/tickets in Trello, Jira, and Google Workspace (Tasks)."""
+"""Create cards/tickets in Trello, Jira, and Google Workspace (Tasks).
+Calls go through one pooled requests.Session per provider, so keep-alive connections are reused.
+provider_client() returns a client whose create_many() sends up to `max_batch` tickets per HTTP call
+(Jira bulk create, Google batch requests; Trello has no batch create, so one call per card).
+Every call goes through core.outbound.scheduler (rate limits, retries, circuit breaker). API base URLs
+come from settings (TRELLO_API_BASE, GOOGLE_TASKS_API_BASE; a Jira `domain` may carry its own scheme)
+so the clients can be pointed at a local fake server."""
+import json
+import threading
+import uuid
+from email import message_from_bytes
+from email.policy import HTTP
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
 import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from .outbound import CircuitOpenError, never_sent, scheduler
+
+_sessions: Dict[str, requests.Session] = {}
+_lock = threading.Lock()
+
+
+def provider_session(provider: str) -> requests.Session:
+    with _lock:
+        session = _sessions.get(provider)
+        if session is None:
+            session = requests.Session()
+            pool_size = int(getattr(settings, "TICKET_WORKFLOW_CONCURRENCY", 8))
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[provider] = session
+        return session
+
+
+def send(provider: str, method: str, url: str, credential: str = "", raise_for_status: bool = True, **kwargs) -> requests.Response:
+    """One provider call through the outbound scheduler; raises for an error status left after retries."""
+    r = scheduler.request(provider_session(provider), provider, method, url, credential=credential, **kwargs)
+    if raise_for_status:
+        r.raise_for_status()
+    return r
+
+
+def trello_base() -> str:
+    return getattr(settings, "TRELLO_API_BASE", "https://api.trello.com").rstrip("/")
+
+
+def google_tasks_base() -> str:
+    return getattr(settings, "GOOGLE_TASKS_API_BASE", "https://tasks.googleapis.com").rstrip("/")
+
+
+def jira_base(domain: str) -> str:
+    domain = domain.rstrip("/")
+    return domain if domain.startswith(("http://", "https://")) else f"https://{domain}"
 
 
 def create_trello_card(api_key: str, token: str, list_id: str, name: str, desc: str, member_id: str = None) -> dict:
-    url = "https://api.trello.com/1/cards"
+    url = f"{trello_base()}/1/cards"
     params = {"key": api_key, "token": token}
     data = {"idList": list_id, "name": name, "desc": desc}
     if member_id:
         data["idMembers"] = member_id
-    r = requests.post(url, params=params, json=data, timeout=10)
-    r.raise_for_status()
-    return r.json()
+    return send("trello", "POST", url, credential=token, params=params, json=data, timeout=10).json()
 
 
-def create_jira_issue(domain: str, email: str, api_token: str, project_key: str, summary: str, description: str, assignee_id: str = None) -> dict:
-    url = f"https://{domain.rstrip('/')}/rest/api/3/issue"
-    auth = (email, api_token)
-    payload = {
-        "fields": {
-            "project": {"key": project_key},
-            "summary": summary,
-            "description": {
-                "type": "doc",
-                "version": 1,
-                "content": [{"type": "paragraph", "content": [{"type": "text", "text": description}]}],
-            },
-            "issuetype": {"name": "Task"},
-        }
+def _jira_fields(project_key: str, summary: str, description: str, assignee_id: str = None) -> dict:
+    fields = {
+        "project": {"key": project_key},
+        "summary": summary,
+        "description": {
+            "type": "doc",
+            "version": 1,
+            "content": [{"type": "paragraph", "content": [{"type": "text", "text": description}]}],
+        },
+        "issuetype": {"name": "Task"},
     }
     if assignee_id:
-        payload["fields"]["assignee"] = {"accountId": assignee_id}
-    r = requests.post(url, json=payload, auth=auth, headers={"Accept": "application/json", "Content-Type": "application/json"}, timeout=10)
-    r.raise_for_status()
+        fields["assignee"] = {"accountId": assignee_id}
+    return fields
+
+
+def create_jira_issue(domain: str, email: str, api_token: str, project_key: str, summary: str, description: str, assignee_id: str = None) -> dict:
+    url = f"{jira_base(domain)}/rest/api/3/issue"
+    auth = (email, api_token)
+    payload = {"fields": _jira_fields(project_key, summary, description, assignee_id)}
+    r = send("jira", "POST", url, credential=email, json=payload, auth=auth, headers={"Accept": "application/json", "Content-Type": "application/json"}, timeout=10)
     return r.json()
 
 
 def create_google_task(access_token: str, task_list_id: str, title: str, notes: str) -> dict:
     """Create a task in Google Tasks. Use OAuth2 access_token."""
-    url = f"https://tasks.googleapis.com/tasks/v1/lists/{task_list_id}/tasks"
+    url = f"{google_tasks_base()}/tasks/v1/lists/{task_list_id}/tasks"
     headers = {
         "Authorization": f"Bearer {access_token}",
         "Content-Type": "application/json",
     }
     body = {"title": title, "notes": notes}
-    r = requests.post(url, json=body, headers=headers, timeout=10)
-    r.raise_for_status()
-    return r.json()
+    return send("google_tasks", "POST", url, credential=access_token, json=body, headers=headers, timeout=10).json()
+
+
+# Batch-capable clients.
+
+class TicketItem(NamedTuple):
+    title: str
+    description: str
+    assignee_id: Optional[str] = None
+
+
+class Failure:
+    """Why a ticket was not created, which decides whether the outbox may send it again."""
+    RETRY = "retry"  # never reached the provider, or it asked us to come back (429, 503, circuit open)
+    UNKNOWN = "unknown"  # the provider may have created it (read timeout, connection dropped after sending, 5xx)
+    PERMANENT = "permanent"  # rejected (4xx other than 429); the same request will be rejected again
+
+
+def failure_for_status(status: Optional[int]) -> str:
+    if status in (429, 503):
+        return Failure.RETRY
+    if status is not None and 400 <= status < 500:
+        return Failure.PERMANENT
+    return Failure.UNKNOWN
+
+
+def failure_for_exception(e: Exception) -> str:
+    if isinstance(e, CircuitOpenError):
+        return Failure.RETRY
+    if isinstance(e, requests.ConnectionError) and never_sent(e):
+        return Failure.RETRY
+    if isinstance(e, requests.HTTPError) and e.response is not None:
+        return failure_for_status(e.response.status_code)
+    return Failure.UNKNOWN
+
+
+class ItemResult(NamedTuple):
+    """Outcome of one ticket in a batch: `data` ({"id"/"key", "url"}) on success, else `error` and its `failure` class."""
+    data: Optional[Dict[str, Any]] = None
+    error: str = ""
+    failure: str = Failure.UNKNOWN
+
+    @property
+    def ok(self) -> bool:
+        return self.data is not None
+
+    @classmethod
+    def raised(cls, e: Exception) -> "ItemResult":
+        return cls(error=str(e), failure=failure_for_exception(e))
+
+
+class TrelloClient:
+    max_batch = 1
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+
+    def create_many(self, items: Sequence[TicketItem]) -> List[ItemResult]:
+        results = []
+        for item in items:
+            try:
+                card = create_trello_card(
+                    api_key=self.config.get("api_key", ""),
+                    token=self.config.get("token", ""),
+                    list_id=self.config["list_id"],
+                    name=item.title,
+                    desc=item.description,
+                    member_id=item.assignee_id,
+                )
+                results.append(ItemResult({"url": card.get("url"), "id": card.get("id")}))
+            except Exception as e:
+                results.append(ItemResult.raised(e))
+        return results
+
+
+class JiraClient:
+    """POST /rest/api/3/issue/bulk: up to 50 issues per call; failures are reported per element."""
+    max_batch = 50
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.domain = config.get("domain", "").rstrip("/")
+
+    def create_many(self, items: Sequence[TicketItem]) -> List[ItemResult]:
+        payload = {"issueUpdates": [
+            {"fields": _jira_fields(self.config["project_key"], item.title, item.description, item.assignee_id)}
+            for item in items
+        ]}
+        r = send(
+            "jira",
+            "POST",
+            f"{jira_base(self.domain)}/rest/api/3/issue/bulk",
+            credential=self.config.get("email", ""),
+            raise_for_status=False,
+            json=payload,
+            auth=(self.config.get("email", ""), self.config.get("api_token", "")),
+            headers={"Accept": "application/json", "Content-Type": "application/json"},
+            timeout=30,
+        )
+        # A batch where every element failed comes back 400 with the same per-element body.
+        body = r.json() if r.headers.get("Content-Type", "").startswith("application/json") else {}
+        if not r.ok and not (r.status_code == 400 and "errors" in body):
+            r.raise_for_status()
+        failed = {}
+        for err in body.get("errors") or []:
+            element = err.get("elementErrors") or {}
+            messages = list(element.get("errorMessages") or []) + [f"{k}: {v}" for k, v in (element.get("errors") or {}).items()]
+            failed[err.get("failedElementNumber")] = ItemResult(
+                error="; ".join(messages) or f"HTTP {err.get('status')}", failure=failure_for_status(err.get("status"))
+            )
+        # Created issues are listed in request order, skipping the failed elements.
+        issues = iter(body.get("issues") or [])
+        results = []
+        for index in range(len(items)):
+            if index in failed:
+                results.append(failed[index])
+                continue
+            issue = next(issues, None)
+            if issue is None:
+                results.append(ItemResult(error="missing from Jira bulk response"))
+                continue
+            results.append(ItemResult({"key": issue.get("key"), "url": f"{self.domain}/browse/{issue.get('key')}"}))
+        return results
+
+
+class GoogleTasksClient:
+    """Google batch endpoint: one multipart/mixed request carrying up to 50 task inserts."""
+    max_batch = 50
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+
+    def create_many(self, items: Sequence[TicketItem]) -> List[ItemResult]:
+        if len(items) == 1:
+            try:
+                task = create_google_task(self.config["access_token"], self.config["task_list_id"], items[0].title, items[0].description)
+                return [ItemResult({"id": task.get("id"), "url": task.get("self")})]
+            except Exception as e:
+                return [ItemResult.raised(e)]
+        boundary = f"batch_{uuid.uuid4().hex}"
+        path = f"/tasks/v1/lists/{self.config['task_list_id']}/tasks"
+        parts = []
+        for index, item in enumerate(items):
+            parts.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\nContent-ID: <item-{index}>\r\n\r\n"
+                f"POST {path} HTTP/1.1\r\nContent-Type: application/json\r\n\r\n"
+                f"{json.dumps({'title': item.title, 'notes': item.description})}\r\n"
+            )
+        body = "".join(parts) + f"--{boundary}--\r\n"
+        r = send(
+            "google_tasks",
+            "POST",
+            f"{google_tasks_base()}/batch/tasks/v1",
+            credential=self.config["access_token"],
+            data=body.encode(),
+            headers={"Authorization": f"Bearer {self.config['access_token']}", "Content-Type": f"multipart/mixed; boundary={boundary}"},
+            timeout=30,
+        )
+        responses = parse_batch_response(r.headers.get("Content-Type", ""), r.content)
+        results = []
+        for index in range(len(items)):
+            status, data = responses.get(f"item-{index}", (None, None))
+            if status is None:
+                results.append(ItemResult(error="missing from Google batch response"))
+            elif 200 <= status < 300 and isinstance(data, dict):
+                results.append(ItemResult({"id": data.get("id"), "url": data.get("selfLink") or data.get("self")}))
+            else:
+                message = ((data or {}).get("error") or {}).get("message") if isinstance(data, dict) else None
+                results.append(ItemResult(error=message or f"HTTP {status}", failure=failure_for_status(status)))
+        return results
+
+
+def parse_batch_response(content_type: str, content: bytes) -> Dict[str, tuple]:
+    """Split a Google multipart/mixed batch reply into {content id: (HTTP status, decoded JSON body)}."""
+    message = message_from_bytes(f"Content-Type: {content_type}\r\n\r\n".encode() + content, policy=HTTP)
+    out = {}
+    for part in message.iter_parts():
+        content_id = (part.get("Content-ID") or "").strip("<> ")
+        content_id = content_id[len("response-"):] if content_id.startswith("response-") else content_id
+        raw = part.get_payload(decode=True) or b""
+        head, _, payload = raw.replace(b"\r\n", b"\n").partition(b"\n\n")
+        try:
+            status = int(head.split(b"\n", 1)[0].split()[1])
+        except (IndexError, ValueError):
+            continue
+        try:
+            data = json.loads(payload) if payload.strip() else None
+        except json.JSONDecodeError:
+            data = None
+        out[content_id] = (status, data)
+    return out
+
+
+PROVIDER_CLIENTS = {"trello": TrelloClient, "jira": JiraClient, "google_tasks": GoogleTasksClient}
+
+
+def provider_client(provider: str, config: Dict[str, Any]):
+    return PROVIDER_CLIENTS[provider](config)
@@ -0,0 +1,114 @@
+"""Database-backed scan job queue: enqueue from the API, claim and run from manage.py run_worker.
+Fleet sweeps (POST /api/scan-all) are queued the same way as ScanSweep rows and resumed from their
+checkpoint if the worker running them dies."""
+import logging
+import uuid
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Organization, ScanJob, ScanSweep
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = (ScanJob.Status.QUEUED, ScanJob.Status.RUNNING)
+
+
+def max_concurrent_jobs() -> int:
+    return int(getattr(settings, "SCAN_JOB_MAX_CONCURRENT", 4))
+
+
+def enqueue_scan(org: Organization, user=None, incremental: bool = False) -> ScanJob:
+    """Queue a scan for org. A burst of requests for the same org shares the job already waiting."""
+    existing = ScanJob.objects.filter(organization=org, status__in=ACTIVE_STATUSES).order_by("created_at").first()
+    if existing:
+        return existing
+    return ScanJob.objects.create(organization=org, requested_by=user, incremental=incremental)
+
+
+def claim_next_scan_job() -> Optional[ScanJob]:
+    """Atomically move the oldest queued job to running, unless the global cap is reached.
+    The conditional UPDATE makes this safe with several workers on any database backend."""
+    if ScanJob.objects.filter(status=ScanJob.Status.RUNNING).count() >= max_concurrent_jobs():
+        return None
+    candidates = ScanJob.objects.filter(status=ScanJob.Status.QUEUED).order_by("created_at").values_list("pk", flat=True)[:10]
+    for pk in candidates:
+        claimed = ScanJob.objects.filter(pk=pk, status=ScanJob.Status.QUEUED).update(
+            status=ScanJob.Status.RUNNING, started_at=timezone.now()
+        )
+        if claimed:
+            return ScanJob.objects.select_related("organization").get(pk=pk)
+    return None
+
+
+def run_scan_job(job: ScanJob) -> ScanJob:
+    from guardrail.scanning import run_scan
+
+    progress = {}
+
+    def on_probe(name, result):
+        progress[name] = result
+        ScanJob.objects.filter(pk=job.pk).update(progress=progress)
+
+    try:
+        job.scan_run = run_scan(job.organization, incremental=job.incremental, on_probe=on_probe)
+        job.status = ScanJob.Status.DONE
+    except Exception as e:
+        logger.exception("Scan job %s failed", job.pk)
+        job.status = ScanJob.Status.FAILED
+        job.error = str(e)
+    job.finished_at = timezone.now()
+    job.save(update_fields=["scan_run", "status", "error", "finished_at"])
+    return job
+
+
+def _stale_cutoff():
+    return timezone.now() - timedelta(seconds=int(getattr(settings, "SCAN_JOB_STALE_SECONDS", 300)))
+
+
+def requeue_stale_jobs() -> int:
+    """Put jobs left running by a crashed worker back in the queue."""
+    return ScanJob.objects.filter(status=ScanJob.Status.RUNNING, started_at__lt=_stale_cutoff()).update(
+        status=ScanJob.Status.QUEUED, started_at=None
+    )
+
+
+def enqueue_sweep(user, filters: Dict[str, Any], incremental: bool = False) -> ScanSweep:
+    return ScanSweep.objects.create(requested_by=user, filters=filters, incremental=incremental, status=ScanSweep.Status.QUEUED)
+
+
+def claim_next_sweep() -> Optional[ScanSweep]:
+    """Atomically move the oldest queued sweep to running (conditional UPDATE, safe with several workers).
+    The new claim token makes any earlier run of the same sweep stop at its next write."""
+    for pk in ScanSweep.objects.filter(status=ScanSweep.Status.QUEUED).order_by("started_at").values_list("pk", flat=True)[:10]:
+        claimed = ScanSweep.objects.filter(pk=pk, status=ScanSweep.Status.QUEUED).update(
+            status=ScanSweep.Status.RUNNING, heartbeat_at=timezone.now(), claim_token=uuid.uuid4().hex
+        )
+        if claimed:
+            return ScanSweep.objects.get(pk=pk)
+    return None
+
+
+def run_sweep_job(sweep: ScanSweep) -> ScanSweep:
+    """Run a claimed sweep on the async scanner; it commits a checkpoint per chunk and beats while it runs."""
+    from guardrail.scanning.batch import SweepLostError, arun_sweep
+
+    try:
+        async_to_sync(arun_sweep)(sweep)
+    except SweepLostError as e:
+        logger.warning("%s; stopping this run", e)
+    except Exception:
+        # arun_sweep has already marked the sweep failed.
+        logger.exception("Scan sweep %s failed", sweep.pk)
+    return sweep
+
+
+def requeue_stale_sweeps() -> int:
+    """Queue sweeps whose worker stopped sending heartbeats; they resume after last_org_id.
+    Sweeps run by manage.py scan_all have no heartbeat and are resumed with --resume instead."""
+    return ScanSweep.objects.filter(status=ScanSweep.Status.RUNNING, heartbeat_at__lt=_stale_cutoff()).update(
+        status=ScanSweep.Status.QUEUED, claim_token=""
+    )
@@ -0,0 +1,42 @@
+"""
+Compare score distributions of two scoring ruleset versions over stored assessments (read-only).
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Assessment
+from guardrail.rulesets import RulesetError, get_ruleset
+from guardrail.scoring import compare_rulesets
+
+
+class Command(BaseCommand):
+    help = "Score every completed assessment under two ruleset versions in one pass and report the differences. Writes nothing."
+
+    def add_arguments(self, parser):
+        parser.add_argument("old_version", type=int)
+        parser.add_argument("new_version", type=int)
+        parser.add_argument("--org-id", type=int, action="append", dest="org_ids", help="Only this org's assessments (repeatable).")
+        parser.add_argument("--json", action="store_true", help="Print the raw report as JSON.")
+
+    def handle(self, *args, **options):
+        try:
+            old, new = get_ruleset(options["old_version"]), get_ruleset(options["new_version"])
+        except RulesetError as e:
+            raise CommandError(str(e))
+        qs = Assessment.objects.filter(completed_at__isnull=False)
+        if options["org_ids"]:
+            qs = qs.filter(organization_id__in=options["org_ids"])
+        report = compare_rulesets(old, new, qs)
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f"{report['assessments']} assessments; {report['changed']} scores change.")
+        for side, stats in report["rulesets"].items():
+            bands = ", ".join(f"{band} {n}" for band, n in sorted(stats["bands"].items()))
+            self.stdout.write(f"  {side} (v{stats['version']}): mean {stats['mean_score']}  bands: {bands}")
+        delta = report["score_delta"]
+        self.stdout.write(f"  score delta: mean {delta['mean']}, min {delta['min']}, max {delta['max']}")
+        for transition, n in report["band_transitions"].items():
+            self.stdout.write(f"  {transition}: {n}")
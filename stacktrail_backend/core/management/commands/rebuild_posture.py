@@ -0,0 +1,22 @@
+"""
+Recompute every org's OrgPosture row from its latest assessment and scan (backfill or repair).
+"""
+from django.core.management.base import BaseCommand
+
+from core.models import Organization
+from core.posture import REBUILD_CHUNK_SIZE, rebuild_postures
+
+
+class Command(BaseCommand):
+    help = "Rebuild the denormalized per-org posture table from assessments and scans."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--org-id", type=int, action="append", dest="org_ids", help="Only this org (repeatable).")
+        parser.add_argument("--chunk-size", type=int, default=REBUILD_CHUNK_SIZE, help="Orgs per bulk upsert.")
+
+    def handle(self, *args, **options):
+        orgs = Organization.objects.all()
+        if options["org_ids"]:
+            orgs = orgs.filter(pk__in=options["org_ids"])
+        written = rebuild_postures(orgs, chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt posture for {written} organizations."))
@@ -0,0 +1,34 @@
+"""
+Re-score completed assessments with a scoring ruleset (default: the active one), e.g. after adding a new version.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Assessment
+from guardrail.rulesets import RulesetError, get_ruleset
+from guardrail.scoring import DEFAULT_RESCORE_BATCH_SIZE, rescore_assessments
+
+
+class Command(BaseCommand):
+    help = "Re-score completed assessments in batches; only changed rows are written, one UPDATE per group of identical scores."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--org-id", type=int, action="append", dest="org_ids", help="Only this org's assessments (repeatable).")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_RESCORE_BATCH_SIZE, help="Rows per bulk write.")
+        parser.add_argument("--ruleset", type=int, help="Ruleset version (default: SCORING_RULESET_VERSION or the latest).")
+        parser.add_argument("--skip-findings", action="store_true", help="Only update scores; leave findings as they are.")
+
+    def handle(self, *args, **options):
+        try:
+            ruleset = get_ruleset(options["ruleset"])
+        except RulesetError as e:
+            raise CommandError(str(e))
+        qs = Assessment.objects.filter(completed_at__isnull=False)
+        if options["org_ids"]:
+            qs = qs.filter(organization_id__in=options["org_ids"])
+        started = time.monotonic()
+        stats = rescore_assessments(qs, batch_size=options["batch_size"], refresh_findings=not options["skip_findings"], ruleset=ruleset)
+        self.stdout.write(self.style.SUCCESS(
+            f"Re-scored {stats['scanned']} assessments with ruleset v{ruleset.version} in {time.monotonic() - started:.1f}s; {stats['updated']} changed."
+        ))
@@ -0,0 +1,112 @@
+"""
+Background worker: process queued scan jobs with a bounded thread pool, run queued fleet sweeps one at a
+time, and deliver the ticket outbox.
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.jobs import (
+    claim_next_scan_job,
+    claim_next_sweep,
+    max_concurrent_jobs,
+    requeue_stale_jobs,
+    requeue_stale_sweeps,
+    run_scan_job,
+    run_sweep_job,
+)
+from core.workflow import deliver_outbox, outbox_due, requeue_stale_outbox
+
+logger = logging.getLogger(__name__)
+
+
+def _run(job):
+    try:
+        run_scan_job(job)
+    finally:
+        close_old_connections()
+
+
+def _sweep(sweep):
+    try:
+        run_sweep_job(sweep)
+    finally:
+        close_old_connections()
+
+
+def _deliver():
+    # A failed batch must not stop the worker; its claimed items are requeued once their claim goes stale.
+    try:
+        return deliver_outbox()
+    except Exception:
+        logger.exception("Ticket outbox delivery failed")
+        return None
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = (
+        "Process queued scan jobs (POST /api/orgs/<pk>/scan) and sweeps (POST /api/scan-all), and deliver "
+        "queued tickets (POST /api/orgs/<pk>/create-ticket, run-workflow). Run alongside the web server."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=None, help="Jobs this worker runs at once (default: SCAN_JOB_MAX_CONCURRENT).")
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds to sleep when the queue is empty.")
+        parser.add_argument("--once", action="store_true", help="Drain the queue, then exit.")
+
+    def handle(self, *args, **options):
+        concurrency = options["concurrency"] or max_concurrent_jobs()
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale job(s)")
+        requeued = requeue_stale_sweeps()
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale sweep(s)")
+        requeued = requeue_stale_outbox()
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale ticket(s)")
+        self.stdout.write(f"Worker started (concurrency {concurrency})")
+
+        in_flight = set()
+        # Outbox deliveries run one batch at a time beside the scan pool (each batch parallelises its own calls).
+        delivery = None
+        # Sweeps also run one at a time; each keeps many scans in flight on its own event loop.
+        sweeping = None
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="scan-job") as pool, \
+                ThreadPoolExecutor(max_workers=1, thread_name_prefix="scan-sweep") as sweeps, \
+                ThreadPoolExecutor(max_workers=1, thread_name_prefix="ticket-outbox") as outbox:
+            while True:
+                in_flight = {f for f in in_flight if not f.done()}
+                if sweeping is not None and sweeping.done():
+                    sweeping = None
+                if sweeping is None:
+                    sweep = claim_next_sweep()
+                    if sweep:
+                        self.stdout.write(f"Sweeping {sweep.total_orgs or 'all matching'} org(s) (sweep {sweep.pk})")
+                        sweeping = sweeps.submit(_sweep, sweep)
+                if delivery is not None and delivery.done():
+                    counts = delivery.result()
+                    if counts:
+                        self.stdout.write(
+                            f"Tickets: {counts['delivered']} delivered, {counts['retrying']} to retry, {counts['failed']} failed"
+                        )
+                    delivery = None
+                if delivery is None and outbox_due():
+                    delivery = outbox.submit(_deliver)
+                job = claim_next_scan_job() if len(in_flight) < concurrency else None
+                if job:
+                    self.stdout.write(f"Scanning org {job.organization_id} (job {job.pk})")
+                    in_flight.add(pool.submit(_run, job))
+                    continue
+                if options["once"] and not in_flight and delivery is None and sweeping is None:
+                    break
+                time.sleep(options["poll_interval"])
+                requeue_stale_jobs()
+                requeue_stale_sweeps()
+                requeue_stale_outbox()
+        self.stdout.write(self.style.SUCCESS("Worker stopped: queues drained."))
@@ -0,0 +1,89 @@
+"""
+Scan every organization (or a filtered set) with bounded concurrency; resumable after a crash.
+"""
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from core.models import ScanSweep
+from guardrail.scanning import resolver_cache
+from guardrail.scanning.batch import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_CONCURRENCY,
+    DEFAULT_PER_HOST,
+    run_sweep,
+)
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Scan all organizations (or a filtered set) and store ScanRuns in chunks. Use --resume to continue a crashed sweep."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--org-id", type=int, action="append", dest="org_ids", help="Only scan this org (repeatable).")
+        parser.add_argument("--owner", help="Only scan orgs owned by this username.")
+        parser.add_argument("--business-type", help="Only scan orgs of this business type.")
+        parser.add_argument("--domain", help="Only scan orgs with this primary domain.")
+        parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Max orgs scanned at once.")
+        parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST, help="Max concurrent scans per domain.")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Orgs per bulk_create/checkpoint.")
+        parser.add_argument("--incremental", action="store_true", help="Only re-run probes that are due; carry the rest forward.")
+        parser.add_argument(
+            "--resume", nargs="?", const="latest", metavar="SWEEP_ID",
+            help="Resume a failed or crashed sweep (default: the most recent one). Sweeps queued through the API are left to run_worker.",
+        )
+
+    def handle(self, *args, **options):
+        if options["resume"]:
+            sweep = self._sweep_to_resume(options["resume"])
+            self.stdout.write(f"Resuming sweep {sweep.pk} after org {sweep.last_org_id} ({sweep.scanned_count}/{sweep.total_orgs} done)")
+        else:
+            filters = {}
+            if options["org_ids"]:
+                filters["org_ids"] = options["org_ids"]
+            if options["owner"]:
+                owner = User.objects.filter(username=options["owner"]).first()
+                if not owner:
+                    raise CommandError(f"No user named {options['owner']!r}")
+                filters["owner_id"] = owner.pk
+            if options["business_type"]:
+                filters["business_type"] = options["business_type"]
+            if options["domain"]:
+                filters["domain"] = options["domain"]
+            sweep = ScanSweep.objects.create(filters=filters, incremental=options["incremental"], claim_token=uuid.uuid4().hex)
+            self.stdout.write(f"Started sweep {sweep.pk}")
+
+        def progress(s):
+            self.stdout.write(f"  {s.scanned_count}/{s.total_orgs} orgs scanned (checkpoint: org {s.last_org_id})")
+
+        sweep = run_sweep(
+            sweep,
+            concurrency=options["concurrency"],
+            per_host=options["per_host"],
+            chunk_size=options["chunk_size"],
+            on_chunk=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Sweep {sweep.pk} complete: {sweep.scanned_count} orgs scanned."))
+        stats = resolver_cache.stats()
+        self.stdout.write(f"DNS cache: {stats['hits']} hits / {stats['misses']} misses (hit rate {stats['hit_rate']:.0%}), {stats['entries']} entries")
+
+    def _sweep_to_resume(self, value):
+        # Failed sweeps, and running ones without a heartbeat (a crashed scan_all); queued and heartbeating
+        # sweeps belong to run_worker.
+        qs = ScanSweep.objects.filter(
+            Q(status=ScanSweep.Status.FAILED) | Q(status=ScanSweep.Status.RUNNING, heartbeat_at__isnull=True)
+        )
+        sweep = qs.order_by("-started_at").first() if value == "latest" else qs.filter(pk=value).first()
+        if not sweep:
+            raise CommandError("No failed or crashed sweep to resume.")
+        token = uuid.uuid4().hex
+        claimed = ScanSweep.objects.filter(pk=sweep.pk, status=sweep.status, claim_token=sweep.claim_token).update(
+            status=ScanSweep.Status.RUNNING, error="", heartbeat_at=None, claim_token=token
+        )
+        if not claimed:
+            raise CommandError(f"Sweep {sweep.pk} was picked up by another process.")
+        sweep.refresh_from_db()
+        return sweep
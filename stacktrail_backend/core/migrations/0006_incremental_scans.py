@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_scanjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scanjob',
+            name='incremental',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='scanrun',
+            name='probe_state',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='scansweep',
+            name='incremental',
+            field=models.BooleanField(default=False),
+        ),
+    ]
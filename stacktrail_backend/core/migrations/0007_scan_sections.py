@@ -0,0 +1,85 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:22
+
+import django.db.models.deletion
+import hashlib
+import json
+
+from django.db import migrations, models
+
+SECTIONS = {
+    "dns_results": "dns_section",
+    "email_auth_results": "email_auth_section",
+    "tls_results": "tls_section",
+    "website_headers": "headers_section",
+}
+
+
+def move_results_to_sections(apps, schema_editor):
+    """Store each distinct result blob once and point existing runs at it."""
+    ScanRun = apps.get_model("core", "ScanRun")
+    ScanSection = apps.get_model("core", "ScanSection")
+    ids = {}
+    for run in ScanRun.objects.order_by("pk").iterator(chunk_size=500):
+        for field, fk in SECTIONS.items():
+            data = getattr(run, field) or {}
+            digest = hashlib.sha256(json.dumps(data, sort_keys=True, separators=(",", ":"), default=str).encode()).hexdigest()
+            if digest not in ids:
+                ids[digest] = ScanSection.objects.get_or_create(digest=digest, defaults={"data": data})[0].pk
+            setattr(run, f"{fk}_id", ids[digest])
+        run.save(update_fields=list(SECTIONS.values()))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_incremental_scans'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScanSection',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64, unique=True)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='scanrun',
+            name='dns_section',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='core.scansection'),
+        ),
+        migrations.AddField(
+            model_name='scanrun',
+            name='email_auth_section',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='core.scansection'),
+        ),
+        migrations.AddField(
+            model_name='scanrun',
+            name='headers_section',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='core.scansection'),
+        ),
+        migrations.AddField(
+            model_name='scanrun',
+            name='tls_section',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='core.scansection'),
+        ),
+        migrations.RunPython(move_results_to_sections, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='scanrun',
+            name='dns_results',
+        ),
+        migrations.RemoveField(
+            model_name='scanrun',
+            name='email_auth_results',
+        ),
+        migrations.RemoveField(
+            model_name='scanrun',
+            name='tls_results',
+        ),
+        migrations.RemoveField(
+            model_name='scanrun',
+            name='website_headers',
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:32
+
+from django.db import migrations, models
+
+
+def mark_scored_with_v1(apps, schema_editor):
+    """Assessments scored before rulesets existed used the rules now in guardrail/rulesets/v1.json."""
+    Assessment = apps.get_model("core", "Assessment")
+    Assessment.objects.filter(completed_at__isnull=False).update(ruleset_version=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_scan_sections'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessment',
+            name='ruleset_version',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(mark_scored_with_v1, migrations.RunPython.noop),
+    ]
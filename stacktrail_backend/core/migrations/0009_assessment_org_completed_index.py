@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_assessment_ruleset_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assessment',
+            index=models.Index(fields=['organization', 'completed_at'], name='assessment_org_completed'),
+        ),
+    ]
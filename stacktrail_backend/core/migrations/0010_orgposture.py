@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:35
+
+from datetime import datetime, timedelta, timezone
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_postures(apps, schema_editor):
+    """One row per org from its latest completed assessment and latest scan (same as rebuild_posture)."""
+    Organization = apps.get_model("core", "Organization")
+    OrgPosture = apps.get_model("core", "OrgPosture")
+    Finding = apps.get_model("core", "Finding")
+    for org in Organization.objects.iterator():
+        posture = OrgPosture(organization=org)
+        assessment = org.assessments.filter(completed_at__isnull=False).order_by("-completed_at").first()
+        if assessment:
+            posture.assessment = assessment
+            posture.assessed_at = assessment.completed_at
+            posture.score = assessment.score
+            posture.risk_band = assessment.risk_band
+            posture.insurance_readiness = assessment.insurance_readiness
+            posture.open_high_findings = Finding.objects.filter(assessment=assessment, severity="high").count()
+        scan = org.scan_runs.select_related("tls_section").order_by("-scanned_at").first()
+        if scan:
+            posture.scan_run = scan
+            posture.scanned_at = scan.scanned_at
+            posture.scan_status = scan.overall_scan_status
+            cert = ((scan.tls_section.data if scan.tls_section else {}) or {}).get("cert") or {}
+            try:
+                posture.cert_expires_at = datetime.strptime(cert["expires"], "%b %d %H:%M:%S %Y GMT").replace(tzinfo=timezone.utc)
+            except (KeyError, TypeError, ValueError):
+                if cert.get("days_until_expiry") is not None:
+                    posture.cert_expires_at = scan.scanned_at + timedelta(days=cert["days_until_expiry"])
+        posture.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_assessment_org_completed_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrgPosture',
+            fields=[
+                ('organization', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='posture', serialize=False, to='core.organization')),
+                ('assessed_at', models.DateTimeField(blank=True, null=True)),
+                ('score', models.PositiveIntegerField(blank=True, null=True)),
+                ('risk_band', models.CharField(blank=True, max_length=32)),
+                ('insurance_readiness', models.CharField(blank=True, max_length=32)),
+                ('open_high_findings', models.PositiveIntegerField(default=0)),
+                ('scanned_at', models.DateTimeField(blank=True, null=True)),
+                ('scan_status', models.CharField(blank=True, max_length=32)),
+                ('cert_expires_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='orgposture',
+            name='assessment',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.assessment'),
+        ),
+        migrations.AddField(
+            model_name='orgposture',
+            name='scan_run',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.scanrun'),
+        ),
+        migrations.RunPython(backfill_postures, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:43
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_aisuggestion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketLink',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('finding_key', models.CharField(max_length=64)),
+                ('provider', models.CharField(choices=[('trello', 'Trello'), ('jira', 'Jira'), ('google_tasks', 'Google Workspace (Tasks)')], max_length=32)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('created', 'Created')], default='pending', max_length=16)),
+                ('external_id', models.CharField(blank=True, max_length=255)),
+                ('url', models.URLField(blank=True, max_length=500)),
+                ('claim_token', models.CharField(blank=True, max_length=32)),
+                ('claimed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('created_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='ticketlink',
+            name='assessment',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ticket_links', to='core.assessment'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='ticketlink',
+            unique_together={('assessment', 'finding_key', 'provider')},
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:50
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_ticketlink'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketOutboxItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('finding_key', models.CharField(max_length=64)),
+                ('provider', models.CharField(choices=[('trello', 'Trello'), ('jira', 'Jira'), ('google_tasks', 'Google Workspace (Tasks)')], max_length=32)),
+                ('batch_id', models.CharField(db_index=True, max_length=32)),
+                ('title', models.CharField(max_length=500)),
+                ('description', models.TextField(blank=True)),
+                ('assignee_id', models.CharField(blank=True, max_length=255)),
+                ('include_ai', models.BooleanField(default=False)),
+                ('replace_existing', models.BooleanField(default=False)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('sending', 'Sending'), ('delivered', 'Delivered'), ('failed', 'Failed')], default='queued', max_length=16)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('claim_token', models.CharField(blank=True, max_length=32)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('external_id', models.CharField(blank=True, max_length=255)),
+                ('url', models.URLField(blank=True, max_length=500)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('delivered_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='ticketoutboxitem',
+            name='assessment',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ticket_outbox', to='core.assessment'),
+        ),
+        migrations.AddField(
+            model_name='ticketoutboxitem',
+            name='organization',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ticket_outbox', to='core.organization'),
+        ),
+        migrations.AddField(
+            model_name='ticketoutboxitem',
+            name='requested_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ticket_outbox', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='ticketoutboxitem',
+            index=models.Index(fields=['status', 'next_attempt_at'], name='core_ticket_status_048eb9_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='ticketoutboxitem',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['queued', 'sending'])), fields=('assessment', 'finding_key', 'provider'), name='ticket_outbox_one_active'),
+        ),
+    ]
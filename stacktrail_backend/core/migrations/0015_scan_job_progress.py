@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_ticket_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scanjob',
+            name='progress',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
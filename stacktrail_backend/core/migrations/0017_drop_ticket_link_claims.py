@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:16
+
+from django.db import migrations
+
+
+def delete_pending_links(apps, schema_editor):
+    # Claims the old inline workflow left behind without creating a ticket; without a status they
+    # would read as created tickets and make workflow re-runs skip those findings.
+    apps.get_model("core", "TicketLink").objects.filter(status="pending").delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_scan_sweep_queue'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_pending_links, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='ticketlink',
+            name='claim_token',
+        ),
+        migrations.RemoveField(
+            model_name='ticketlink',
+            name='claimed_at',
+        ),
+        migrations.RemoveField(
+            model_name='ticketlink',
+            name='status',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_drop_ticket_link_claims'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scansweep',
+            name='claim_token',
+            field=models.CharField(blank=True, max_length=32),
+        ),
+    ]
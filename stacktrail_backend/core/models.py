@@ -1,9 +1,13 @@
 """
 StackTrail – Data models.
-Organization, Assessment, ScanRun, ReportRun, Finding.
+Organization, Assessment, ScanSection, ScanRun, ScanSweep, ScanJob, ReportRun, Finding, OrgPosture, AISuggestion, TicketLink.
 """
+import hashlib
+import json
+from typing import Any, Dict, Iterable
+
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 
 
@@ -60,6 +64,8 @@ class Organization(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     # Optional: default assignee for tickets (Trello member ID or Jira account ID)
     default_assignee_id = models.CharField(max_length=128, blank=True)
+    # Bumped by every write that changes what the read endpoints return (see core.caching).
+    data_version = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self):
         return self.name
@@ -90,10 +96,22 @@ class Assessment(models.Model):
     )
     # Per-question notes: {"mfa_all": "Rolling out next quarter", ...}
     checklist_notes = models.JSONField(default=dict, blank=True)
+    # guardrail/rulesets version that produced score/findings (None until scored).
+    ruleset_version = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        # "Latest completed assessment per org" (dashboard, reports).
+        indexes = [models.Index(fields=["organization", "completed_at"], name="assessment_org_completed")]
 
     def mark_completed(self):
+        from .caching import bump_org_versions
+        from .posture import record_assessment
+
         self.completed_at = timezone.now()
-        self.save(update_fields=["completed_at"])
+        with transaction.atomic():
+            self.save(update_fields=["completed_at"])
+            record_assessment(self)
+            bump_org_versions([self.organization_id])
 
 
 class OrgIntegration(models.Model):
@@ -115,16 +133,207 @@ class OrgIntegration(models.Model):
         unique_together = [("organization", "provider")]
 
 
+class TicketLink(models.Model):
+    """The external ticket created for one finding in one provider; makes workflow re-runs skip existing tickets.
+    Written by outbox delivery (core.workflow)."""
+    assessment = models.ForeignKey(Assessment, on_delete=models.CASCADE, related_name="ticket_links")
+    finding_key = models.CharField(max_length=64)
+    provider = models.CharField(max_length=32, choices=OrgIntegration.Provider.choices)
+    external_id = models.CharField(max_length=255, blank=True)
+    url = models.URLField(max_length=500, blank=True)
+    created_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = [("assessment", "finding_key", "provider")]
+
+
+class TicketOutboxItem(models.Model):
+    """A ticket waiting to be created in a provider. The API writes it (in the request's transaction) and
+    manage.py run_worker delivers it, retrying with backoff; at most one active item per finding + provider."""
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        SENDING = "sending", "Sending"
+        DELIVERED = "delivered", "Delivered"
+        FAILED = "failed", "Failed"
+
+    ACTIVE_STATUSES = (Status.QUEUED, Status.SENDING)
+
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="ticket_outbox")
+    assessment = models.ForeignKey(Assessment, on_delete=models.CASCADE, related_name="ticket_outbox")
+    finding_key = models.CharField(max_length=64)
+    provider = models.CharField(max_length=32, choices=OrgIntegration.Provider.choices)
+    batch_id = models.CharField(max_length=32, db_index=True)
+    title = models.CharField(max_length=500)
+    description = models.TextField(blank=True)
+    assignee_id = models.CharField(max_length=255, blank=True)
+    include_ai = models.BooleanField(default=False)
+    replace_existing = models.BooleanField(default=False)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim_token = models.CharField(max_length=32, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    external_id = models.CharField(max_length=255, blank=True)
+    url = models.URLField(max_length=500, blank=True)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="ticket_outbox"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "next_attempt_at"])]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["assessment", "finding_key", "provider"],
+                condition=models.Q(status__in=["queued", "sending"]),
+                name="ticket_outbox_one_active",
+            )
+        ]
+
+
+class ScanSection(models.Model):
+    """Content-addressed scan result blob. Identical sections (an unchanged TLS result, the same
+    headers) are stored once and shared by every ScanRun that produced them."""
+    digest = models.CharField(max_length=64, unique=True)
+    data = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @staticmethod
+    def digest_for(data: Dict[str, Any]) -> str:
+        canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    @classmethod
+    def intern(cls, blobs: Iterable[Dict[str, Any]]) -> Dict[str, "ScanSection"]:
+        """Store each distinct blob once; returns {digest: ScanSection} for all of them."""
+        by_digest = {cls.digest_for(blob): blob for blob in blobs}
+        sections = {s.digest: s for s in cls.objects.filter(digest__in=list(by_digest))}
+        missing = [cls(digest=d, data=blob) for d, blob in by_digest.items() if d not in sections]
+        if missing:
+            # A concurrent scan may insert the same digest; ignore it and re-read.
+            cls.objects.bulk_create(missing, ignore_conflicts=True)
+            sections.update({s.digest: s for s in cls.objects.filter(digest__in=[m.digest for m in missing])})
+        return sections
+
+
+def _section_property(name: str, fk: str) -> property:
+    def get(self):
+        pending = self.__dict__.get("_pending_sections") or {}
+        if name in pending:
+            return pending[name]
+        section = getattr(self, fk)
+        return section.data if section is not None else {}
+
+    def set(self, value):
+        self.__dict__.setdefault("_pending_sections", {})[name] = value or {}
+
+    return property(get, set)
+
+
 class ScanRun(models.Model):
+    # Result sections exposed as attributes -> ScanSection foreign key holding the blob.
+    SECTIONS = {
+        "dns_results": "dns_section",
+        "email_auth_results": "email_auth_section",
+        "tls_results": "tls_section",
+        "website_headers": "headers_section",
+    }
+    # "Latest scan" everywhere (incremental scans, sweeps, posture rebuilds); id breaks scanned_at ties.
+    LATEST_FIRST = ("-scanned_at", "-id")
+
     organization = models.ForeignKey(
         Organization, on_delete=models.CASCADE, related_name="scan_runs"
     )
     scanned_at = models.DateTimeField(auto_now_add=True)
-    dns_results = models.JSONField(default=dict, blank=True)
-    email_auth_results = models.JSONField(default=dict, blank=True)
-    tls_results = models.JSONField(default=dict, blank=True)
-    website_headers = models.JSONField(default=dict, blank=True)
+    dns_section = models.ForeignKey(ScanSection, on_delete=models.PROTECT, null=True, blank=True, related_name="+")
+    email_auth_section = models.ForeignKey(ScanSection, on_delete=models.PROTECT, null=True, blank=True, related_name="+")
+    tls_section = models.ForeignKey(ScanSection, on_delete=models.PROTECT, null=True, blank=True, related_name="+")
+    headers_section = models.ForeignKey(ScanSection, on_delete=models.PROTECT, null=True, blank=True, related_name="+")
     overall_scan_status = models.CharField(max_length=32, default="pending")
+    # Per-probe fingerprint / checked_at / due_at; incremental rescans skip probes that are not due yet.
+    probe_state = models.JSONField(default=dict, blank=True)
+
+    dns_results = _section_property("dns_results", "dns_section")
+    email_auth_results = _section_property("email_auth_results", "email_auth_section")
+    tls_results = _section_property("tls_results", "tls_section")
+    website_headers = _section_property("website_headers", "headers_section")
+
+    @classmethod
+    def attach_sections(cls, runs: Iterable["ScanRun"]) -> None:
+        """Intern the sections set on unsaved runs and point the foreign keys at them (one
+        lookup for the whole batch, so sweeps can call this before bulk_create)."""
+        runs = [run for run in runs if run.__dict__.get("_pending_sections")]
+        if not runs:
+            return
+        sections = ScanSection.intern(blob for run in runs for blob in run._pending_sections.values())
+        for run in runs:
+            for name, blob in run.__dict__.pop("_pending_sections").items():
+                setattr(run, cls.SECTIONS[name], sections[ScanSection.digest_for(blob)])
+
+    def save(self, *args, **kwargs):
+        ScanRun.attach_sections([self])
+        super().save(*args, **kwargs)
+
+
+class ScanSweep(models.Model):
+    """Fleet-wide batch scan (manage.py scan_all, or POST /api/scan-all which queues it for run_worker).
+    Orgs are scanned in primary-key order; last_org_id is the resume checkpoint."""
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        RUNNING = "running", "Running"
+        COMPLETED = "completed", "Completed"
+        FAILED = "failed", "Failed"
+
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="scan_sweeps"
+    )
+    # Org filters the sweep was started with, e.g. {"business_type": "retail", "org_ids": [1, 2]}
+    filters = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.RUNNING)
+    incremental = models.BooleanField(default=False)
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    total_orgs = models.PositiveIntegerField(default=0)
+    scanned_count = models.PositiveIntegerField(default=0)
+    last_org_id = models.BigIntegerField(default=0)
+    error = models.TextField(blank=True)
+    # Set when run_worker claims the sweep and refreshed while it runs; a stale one is requeued and resumed.
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    # New for every run (worker claim, scan_all start or --resume); checkpoint and status writes require it,
+    # so a run whose sweep was taken over stops instead of writing over the new one.
+    claim_token = models.CharField(max_length=32, blank=True)
+
+
+class ScanJob(models.Model):
+    """A queued single-org scan. POST /orgs/<pk>/scan enqueues; manage.py run_worker processes."""
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    organization = models.ForeignKey(
+        Organization, on_delete=models.CASCADE, related_name="scan_jobs"
+    )
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="scan_jobs"
+    )
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.QUEUED)
+    incremental = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    scan_run = models.ForeignKey(
+        ScanRun, on_delete=models.SET_NULL, null=True, blank=True, related_name="jobs"
+    )
+    error = models.TextField(blank=True)
+    # Results of the probes finished so far ({probe name: result}), written as the scan runs.
+    progress = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "created_at"])]
 
 
 class ReportRun(models.Model):
@@ -175,3 +384,40 @@ class Finding(models.Model):
 
     class Meta:
         ordering = ["-priority_score"]
+
+
+class OrgPosture(models.Model):
+    """Current posture per org: latest completed assessment + latest scan, denormalized so read-heavy
+    views are a primary-key lookup. Maintained on write by core.posture; rebuild with manage.py rebuild_posture."""
+    organization = models.OneToOneField(
+        Organization, on_delete=models.CASCADE, primary_key=True, related_name="posture"
+    )
+    assessment = models.ForeignKey(Assessment, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    assessed_at = models.DateTimeField(null=True, blank=True)
+    score = models.PositiveIntegerField(null=True, blank=True)
+    risk_band = models.CharField(max_length=32, blank=True)
+    insurance_readiness = models.CharField(max_length=32, blank=True)
+    open_high_findings = models.PositiveIntegerField(default=0)
+    scan_run = models.ForeignKey(ScanRun, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    scanned_at = models.DateTimeField(null=True, blank=True)
+    scan_status = models.CharField(max_length=32, blank=True)
+    cert_expires_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def cert_days_until_expiry(self):
+        if self.cert_expires_at is None:
+            return None
+        return (self.cert_expires_at - timezone.now()).days
+
+
+class AISuggestion(models.Model):
+    """Persistent cache of AI suggestions, keyed by a hash of the prompt inputs and model (core.ai_suggestions).
+    Entries expire after AI_SUGGESTION_CACHE_TTL_SECONDS; past AI_SUGGESTION_CACHE_MAX_ENTRIES the least
+    recently used are evicted."""
+    key = models.CharField(max_length=64, unique=True)
+    model = models.CharField(max_length=64)
+    suggestions = models.JSONField(default=list)
+    tags = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now_add=True, db_index=True)
@@ -0,0 +1,200 @@
+"""
+Outbound HTTP scheduler for ticket providers (used by core.integrations).
+
+- Token bucket per (provider, credential): TICKET_PROVIDER_RATE_LIMITS calls/second, OUTBOUND_BURST burst.
+  Provider limits are per token/user, so two orgs with different credentials don't share a bucket.
+- Retries: 429/502/503/504 and failures to connect, with jittered exponential backoff. Retry-After
+  (seconds or HTTP date) is honoured and also pauses the bucket, so concurrent callers back off together.
+  Creates are not idempotent, so 500s, read timeouts and connections dropped after the request was written
+  (the provider may have acted) are not retried.
+- Circuit breaker per provider: after OUTBOUND_CIRCUIT_FAILURES consecutive failed calls, calls fail fast
+  with CircuitOpenError for OUTBOUND_CIRCUIT_COOLDOWN_SECONDS, then one trial call decides.
+"""
+import hashlib
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+
+import requests
+from django.conf import settings
+from urllib3.exceptions import NewConnectionError
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 502, 503, 504}
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+def _setting(name: str, default):
+    return type(default)(getattr(settings, name, default))
+
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is available (rate <= 0: unlimited)."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now >= self.paused_until:
+                    self.tokens = min(self.capacity, self.tokens + (now - max(self.updated, self.paused_until)) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+                else:
+                    wait = self.paused_until - now
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller for `seconds` (the provider said so via Retry-After)."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+
+class CircuitBreaker:
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self, provider: str) -> None:
+        with self._lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at < self.cooldown or self.trial_in_flight:
+                raise CircuitOpenError(f"{provider} is failing; calls paused for up to {self.cooldown:g}s")
+            self.trial_in_flight = True
+
+    def record(self, ok: bool, provider: str) -> None:
+        with self._lock:
+            self.trial_in_flight = False
+            if ok:
+                self.failures = 0
+                self.opened_at = None
+                return
+            self.failures += 1
+            if self.failures >= self.threshold:
+                if self.opened_at is None:
+                    logger.warning("Opening circuit for %s after %d consecutive failures", provider, self.failures)
+                self.opened_at = time.monotonic()
+
+
+def retry_after_seconds(response: requests.Response) -> Optional[float]:
+    value = (response.headers.get("Retry-After") or "").strip()
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - timezone.now()).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def never_sent(e: requests.ConnectionError) -> bool:
+    """True when the request cannot have reached the provider (connect timeout, refused, DNS failure).
+    Other ConnectionErrors, e.g. "Connection aborted" after the body was written, may have created something."""
+    if isinstance(e, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(e.args[0], "reason", None) if e.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def backoff_seconds(attempt: int) -> float:
+    """Full jitter: uniform(0, min(max, base * 2**attempt))."""
+    cap = min(_setting("OUTBOUND_BACKOFF_MAX_SECONDS", 8.0), _setting("OUTBOUND_BACKOFF_BASE_SECONDS", 0.5) * (2 ** attempt))
+    return random.uniform(0, cap)
+
+
+class OutboundScheduler:
+    def __init__(self):
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, provider: str, credential: str = "") -> TokenBucket:
+        key = (provider, hashlib.sha256(credential.encode()).hexdigest()[:16])
+        with self._lock:
+            if key not in self._buckets:
+                rate = float(getattr(settings, "TICKET_PROVIDER_RATE_LIMITS", {}).get(provider, 0))
+                self._buckets[key] = TokenBucket(rate, _setting("OUTBOUND_BURST", 5))
+            return self._buckets[key]
+
+    def breaker(self, provider: str) -> CircuitBreaker:
+        with self._lock:
+            if provider not in self._breakers:
+                self._breakers[provider] = CircuitBreaker(
+                    _setting("OUTBOUND_CIRCUIT_FAILURES", 5), _setting("OUTBOUND_CIRCUIT_COOLDOWN_SECONDS", 30.0)
+                )
+            return self._breakers[provider]
+
+    def request(self, session: requests.Session, provider: str, method: str, url: str, credential: str = "", **kwargs) -> requests.Response:
+        """Send one provider call under its rate limit, retrying what is safe to retry. Returns the last
+        response (callers still raise_for_status); raises CircuitOpenError or the final request error."""
+        breaker = self.breaker(provider)
+        bucket = self.bucket(provider, credential)
+        max_attempts = max(1, _setting("OUTBOUND_MAX_ATTEMPTS", 4))
+        max_retry_after = _setting("OUTBOUND_MAX_RETRY_AFTER_SECONDS", 30.0)
+        breaker.before_call(provider)
+        ok = False
+        # Every exit records the outcome, so a half-open trial that raises cannot leave the circuit stuck.
+        try:
+            for attempt in range(max_attempts):
+                bucket.acquire()
+                try:
+                    response = session.request(method, url, **kwargs)
+                except requests.ConnectionError as e:
+                    # Anything that may have reached the provider (and ReadTimeout, which is not a
+                    # ConnectionError) propagates unretried.
+                    if not never_sent(e) or attempt + 1 >= max_attempts:
+                        raise
+                    delay = backoff_seconds(attempt)
+                    logger.info("%s %s failed to connect (%s); retry %d in %.2fs", provider, method, e, attempt + 1, delay)
+                    time.sleep(delay)
+                    continue
+                if response.status_code not in RETRY_STATUSES:
+                    ok = response.status_code < 500
+                    return response
+                retry_after = retry_after_seconds(response)
+                if retry_after is not None and retry_after > max_retry_after:
+                    break
+                delay = retry_after if retry_after is not None else backoff_seconds(attempt)
+                if response.status_code == 429 or retry_after is not None:
+                    bucket.pause(delay)
+                if attempt + 1 >= max_attempts:
+                    break
+                logger.info("%s %s returned %s; retry %d in %.2fs", provider, method, response.status_code, attempt + 1, delay)
+                time.sleep(delay)
+            # Out of attempts (or the provider asked for a longer wait than we'll hold a request for).
+            ok = response.status_code == 429
+            return response
+        finally:
+            breaker.record(ok, provider)
+
+
+scheduler = OutboundScheduler()
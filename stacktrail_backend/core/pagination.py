@@ -0,0 +1,29 @@
+"""Pagination and field selection for the org history list endpoints (scan runs, assessments, reports)."""
+from typing import Optional, Set
+
+from rest_framework.pagination import CursorPagination
+
+FIELDS_QUERY_PARAM = "fields"
+
+
+def requested_fields(request) -> Optional[Set[str]]:
+    """Field names from ?fields=a,b, or None when the parameter is absent."""
+    if request is None or FIELDS_QUERY_PARAM not in request.query_params:
+        return None
+    return {name.strip() for name in request.query_params[FIELDS_QUERY_PARAM].split(",") if name.strip()}
+
+
+class HistoryCursorPagination(CursorPagination):
+    """Newest-first cursor pages: GET ?page_size=25, then follow `next`.
+    Opt-in: without ?cursor or ?page_size the endpoint still returns a plain list."""
+    page_size = 25
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        return getattr(view, "cursor_ordering", None) or super().get_ordering(request, queryset, view)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params and self.page_size_query_param not in request.query_params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
@@ -0,0 +1,162 @@
+"""Maintain OrgPosture rows: called inside the transactions that write assessments and scans."""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import Count, OuterRef, QuerySet, Subquery
+from django.db.models.functions import Coalesce
+
+from .caching import bump_org_versions
+from .models import Assessment, Finding, Organization, OrgPosture, ScanRun
+
+ASSESSMENT_FIELDS = ["assessment", "assessed_at", "score", "risk_band", "insurance_readiness", "open_high_findings"]
+SCAN_FIELDS = ["scan_run", "scanned_at", "scan_status", "cert_expires_at"]
+REBUILD_CHUNK_SIZE = 500
+
+
+def cert_expires_at(scan: ScanRun) -> Optional[datetime]:
+    cert = (scan.tls_results or {}).get("cert") or {}
+    if cert.get("expires"):
+        try:
+            return datetime.strptime(cert["expires"], "%b %d %H:%M:%S %Y GMT").replace(tzinfo=dt_timezone.utc)
+        except ValueError:
+            pass
+    if cert.get("days_until_expiry") is not None and scan.scanned_at:
+        return scan.scanned_at + timedelta(days=cert["days_until_expiry"])
+    return None
+
+
+def _assessment_values(assessment: Optional[Assessment], open_high: int) -> Dict[str, Any]:
+    if assessment is None:
+        return {"assessment": None, "assessed_at": None, "score": None, "risk_band": "", "insurance_readiness": "", "open_high_findings": 0}
+    return {
+        "assessment": assessment,
+        "assessed_at": assessment.completed_at,
+        "score": assessment.score,
+        "risk_band": assessment.risk_band,
+        "insurance_readiness": assessment.insurance_readiness,
+        "open_high_findings": open_high,
+    }
+
+
+def _scan_values(scan: Optional[ScanRun]) -> Dict[str, Any]:
+    if scan is None:
+        return {"scan_run": None, "scanned_at": None, "scan_status": "", "cert_expires_at": None}
+    return {
+        "scan_run": scan,
+        "scanned_at": scan.scanned_at,
+        "scan_status": scan.overall_scan_status,
+        "cert_expires_at": cert_expires_at(scan),
+    }
+
+
+def _high_findings(assessment_id: int) -> int:
+    return Finding.objects.filter(assessment_id=assessment_id, severity=Finding.Severity.HIGH).count()
+
+
+def record_assessment(assessment: Assessment) -> None:
+    """Make a completed assessment the org's posture unless a later-completed one is already recorded."""
+    if assessment.completed_at is None:
+        return
+    with transaction.atomic():
+        posture, _ = OrgPosture.objects.select_for_update().get_or_create(organization_id=assessment.organization_id)
+        if posture.assessment_id not in (None, assessment.pk) and posture.assessed_at and posture.assessed_at > assessment.completed_at:
+            return
+        for name, value in _assessment_values(assessment, _high_findings(assessment.pk)).items():
+            setattr(posture, name, value)
+        posture.save()
+
+
+def record_scans(scans: Iterable[ScanRun]) -> None:
+    """Upsert the scan half of the posture for each org's newest scan in `scans` (one statement), skipping
+    orgs whose posture already records a later scan (e.g. a single-org scan that finished during a sweep)."""
+    newest: Dict[int, ScanRun] = {}
+    for scan in scans:
+        current = newest.get(scan.organization_id)
+        if current is None or scan.scanned_at >= current.scanned_at:
+            newest[scan.organization_id] = scan
+    if not newest:
+        return
+    with transaction.atomic():
+        recorded = OrgPosture.objects.select_for_update().filter(organization_id__in=newest, scanned_at__isnull=False)
+        for org_id, scanned_at, scan_id in recorded.values_list("organization_id", "scanned_at", "scan_run_id"):
+            scan = newest[org_id]
+            # Same order as ScanRun.LATEST_FIRST.
+            if (scanned_at, scan_id or 0) > (scan.scanned_at, scan.pk or 0):
+                del newest[org_id]
+        if not newest:
+            return
+        OrgPosture.objects.bulk_create(
+            [OrgPosture(organization_id=org_id, **_scan_values(scan)) for org_id, scan in newest.items()],
+            update_conflicts=True,
+            unique_fields=["organization"],
+            update_fields=SCAN_FIELDS + ["updated_at"],
+        )
+
+
+def refresh_assessment_postures(assessment_ids: List[int]) -> None:
+    """Re-copy score columns and high-finding counts into postures that point at these assessments
+    (after a bulk re-score, which bypasses record_assessment)."""
+    if not assessment_ids:
+        return
+    latest = Assessment.objects.filter(pk=OuterRef("assessment_id"))
+    high = (
+        Finding.objects.filter(assessment_id=OuterRef("assessment_id"), severity=Finding.Severity.HIGH)
+        .order_by()
+        .values("assessment_id")
+        .annotate(n=Count("pk"))
+        .values("n")
+    )
+    OrgPosture.objects.filter(assessment_id__in=assessment_ids).update(
+        score=Subquery(latest.values("score")[:1]),
+        risk_band=Subquery(latest.values("risk_band")[:1]),
+        insurance_readiness=Subquery(latest.values("insurance_readiness")[:1]),
+        open_high_findings=Coalesce(Subquery(high[:1]), 0),
+    )
+
+
+def rebuild_postures(orgs: Optional[QuerySet] = None, chunk_size: int = REBUILD_CHUNK_SIZE) -> int:
+    """Recompute posture rows from the assessment and scan tables (backfill / repair). Returns rows written."""
+    orgs = orgs if orgs is not None else Organization.objects.all()
+    latest_assessment = (
+        Assessment.objects.filter(organization=OuterRef("pk"), completed_at__isnull=False)
+        .order_by("-completed_at")
+        .values("pk")[:1]
+    )
+    latest_scan = ScanRun.objects.filter(organization=OuterRef("pk")).order_by(*ScanRun.LATEST_FIRST).values("pk")[:1]
+    rows = list(
+        orgs.order_by("pk")
+        .annotate(assessment_id=Subquery(latest_assessment), scan_id=Subquery(latest_scan))
+        .values_list("pk", "assessment_id", "scan_id")
+    )
+    written = 0
+    for i in range(0, len(rows), chunk_size):
+        chunk = rows[i:i + chunk_size]
+        assessment_ids = [a for _, a, _ in chunk if a]
+        assessments = Assessment.objects.in_bulk(assessment_ids)
+        scans = ScanRun.objects.select_related("tls_section").in_bulk([s for _, _, s in chunk if s])
+        high = dict(
+            Finding.objects.filter(assessment_id__in=assessment_ids, severity=Finding.Severity.HIGH)
+            .order_by()
+            .values("assessment_id")
+            .annotate(n=Count("pk"))
+            .values_list("assessment_id", "n")
+        )
+        postures = [
+            OrgPosture(
+                organization_id=org_id,
+                **_assessment_values(assessments.get(a), high.get(a, 0)),
+                **_scan_values(scans.get(s)),
+            )
+            for org_id, a, s in chunk
+        ]
+        with transaction.atomic():
+            OrgPosture.objects.bulk_create(
+                postures,
+                update_conflicts=True,
+                unique_fields=["organization"],
+                update_fields=ASSESSMENT_FIELDS + SCAN_FIELDS + ["updated_at"],
+            )
+            bump_org_versions(org_id for org_id, _, _ in chunk)
+        written += len(postures)
+    return written
@@ -0,0 +1,63 @@
+"""Scan history as diffs between consecutive ScanRuns, read from the content-addressed ScanSections."""
+from typing import Any, Dict, List, Optional
+
+from .models import Organization, ScanRun, ScanSection
+
+_MISSING = object()
+
+
+def _flatten(data: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    out = {}
+    for key, value in data.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict) and value:
+            out.update(_flatten(value, path + "."))
+        else:
+            out[path] = value
+    return out
+
+
+def diff_sections(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """{"cert.expires": {"from": ..., "to": ...}} for every dotted path that differs (lists compare whole)."""
+    before, after = _flatten(old or {}), _flatten(new or {})
+    changes = {}
+    for path in sorted(before.keys() | after.keys()):
+        a, b = before.get(path, _MISSING), after.get(path, _MISSING)
+        if a != b:
+            changes[path] = {"from": None if a is _MISSING else a, "to": None if b is _MISSING else b}
+    return changes
+
+
+def scan_history(org: Organization, limit: int = 20, before: Optional[int] = None) -> Dict[str, Any]:
+    """Newest-first page of runs, each with only what changed since the run before it.
+    The oldest run of the org has no predecessor and carries its full sections as "snapshot"."""
+    fks = list(ScanRun.SECTIONS.values())
+    runs = org.scan_runs.order_by("-id")
+    if before is not None:
+        runs = runs.filter(id__lt=before)
+    # One extra row: the predecessor of the last run on this page.
+    rows: List[Dict[str, Any]] = list(runs.values("id", "scanned_at", "overall_scan_status", *[f"{fk}_id" for fk in fks])[: limit + 1])
+    page = rows[:limit]
+
+    needed = set()
+    for i, row in enumerate(page):
+        prev = rows[i + 1] if i + 1 < len(rows) else None
+        for fk in fks:
+            if prev is None or prev[f"{fk}_id"] != row[f"{fk}_id"]:
+                needed.update(filter(None, (row[f"{fk}_id"], prev and prev[f"{fk}_id"])))
+    data = dict(ScanSection.objects.filter(pk__in=needed).values_list("pk", "data"))
+
+    results = []
+    for i, row in enumerate(page):
+        prev = rows[i + 1] if i + 1 < len(rows) else None
+        item = {"id": row["id"], "scanned_at": row["scanned_at"], "overall_scan_status": row["overall_scan_status"]}
+        if prev is None:
+            item["snapshot"] = {name: data.get(row[f"{fk}_id"], {}) for name, fk in ScanRun.SECTIONS.items()}
+        else:
+            item["changes"] = {
+                name: diff_sections(data.get(prev[f"{fk}_id"], {}), data.get(row[f"{fk}_id"], {}))
+                for name, fk in ScanRun.SECTIONS.items()
+                if prev[f"{fk}_id"] != row[f"{fk}_id"]
+            }
+        results.append(item)
+    return {"results": results, "next_before": page[-1]["id"] if len(rows) > limit else None}
@@ -1,10 +1,22 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
-from .models import Assessment, Finding, Organization, OrgIntegration, ReportRun, ScanRun
+from .models import Assessment, Finding, Organization, OrgIntegration, OrgPosture, ReportRun, ScanJob, ScanRun, ScanSweep, TicketOutboxItem
+from .pagination import requested_fields
 
 User = get_user_model()
 
 
+class SparseFieldsMixin:
+    """Drop fields not named in the request's ?fields=a,b (id is always kept; unknown names are ignored)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        wanted = requested_fields(self.context.get("request"))
+        if wanted is not None:
+            for name in set(self.fields) - wanted - {"id"}:
+                self.fields.pop(name)
+
+
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=8)
 
@@ -21,8 +33,20 @@ class RegisterSerializer(serializers.ModelSerializer):
         return user
 
 
+class OrgPostureSerializer(serializers.ModelSerializer):
+    cert_days_until_expiry = serializers.ReadOnlyField()
+
+    class Meta:
+        model = OrgPosture
+        fields = (
+            "assessment", "assessed_at", "score", "risk_band", "insurance_readiness", "open_high_findings",
+            "scan_run", "scanned_at", "scan_status", "cert_days_until_expiry", "updated_at",
+        )
+        read_only_fields = fields
+
+
 class OrganizationSerializer(serializers.ModelSerializer):
-    owner = serializers.ReadOnlyField(source="owner.id")
+    owner = serializers.ReadOnlyField(source="owner_id")
 
     class Meta:
         model = Organization
@@ -34,6 +58,18 @@ class OrganizationSerializer(serializers.ModelSerializer):
         read_only_fields = ("created_at",)
 
 
+class OrganizationPostureSerializer(OrganizationSerializer):
+    """Organization + its current posture; use with select_related("posture")."""
+    posture = serializers.SerializerMethodField()
+
+    class Meta(OrganizationSerializer.Meta):
+        fields = OrganizationSerializer.Meta.fields + ("posture",)
+
+    def get_posture(self, obj):
+        posture = getattr(obj, "posture", None)
+        return OrgPostureSerializer(posture).data if posture else None
+
+
 class OrgIntegrationSerializer(serializers.ModelSerializer):
     class Meta:
         model = OrgIntegration
@@ -42,7 +78,7 @@ class OrgIntegrationSerializer(serializers.ModelSerializer):
         extra_kwargs = {"organization": {"read_only": True}}
 
 
-class AssessmentSerializer(serializers.ModelSerializer):
+class AssessmentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     organization = OrganizationSerializer(read_only=True)
 
     class Meta:
@@ -51,15 +87,27 @@ class AssessmentSerializer(serializers.ModelSerializer):
             "id", "organization", "created_at", "completed_at", "answers",
             "score", "risk_band", "breach_cost_low", "breach_cost_high",
             "downtime_days_low", "downtime_days_high", "insurance_readiness",
-            "checklist_notes",
+            "checklist_notes", "ruleset_version",
         )
         read_only_fields = (
             "created_at", "completed_at", "score", "risk_band",
             "breach_cost_low", "breach_cost_high", "downtime_days_low", "downtime_days_high",
-            "insurance_readiness",
+            "insurance_readiness", "ruleset_version",
         )
 
 
+class AssessmentSummarySerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """History row: organization as an id, no answers or checklist notes."""
+
+    class Meta:
+        model = Assessment
+        fields = (
+            "id", "organization", "created_at", "completed_at", "score", "risk_band",
+            "insurance_readiness", "ruleset_version",
+        )
+        read_only_fields = fields
+
+
 class FindingSerializer(serializers.ModelSerializer):
     class Meta:
         model = Finding
@@ -70,17 +118,58 @@ class FindingSerializer(serializers.ModelSerializer):
         )
 
 
-class ScanRunSerializer(serializers.ModelSerializer):
+class ScanRunSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = ScanRun
         fields = (
             "id", "organization", "scanned_at", "dns_results", "email_auth_results",
-            "tls_results", "website_headers", "overall_scan_status",
+            "tls_results", "website_headers", "overall_scan_status", "probe_state",
         )
         read_only_fields = ("scanned_at",)
 
 
-class ReportRunSerializer(serializers.ModelSerializer):
+class ScanRunSummarySerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """History row: status only; probe results stay in their sections (see scan-history for diffs)."""
+
+    class Meta:
+        model = ScanRun
+        fields = ("id", "organization", "scanned_at", "overall_scan_status")
+        read_only_fields = fields
+
+
+class ScanJobSerializer(serializers.ModelSerializer):
+    scan_run = ScanRunSerializer(read_only=True)
+
+    class Meta:
+        model = ScanJob
+        fields = (
+            "id", "organization", "status", "incremental", "created_at", "started_at", "finished_at",
+            "progress", "scan_run", "error",
+        )
+        read_only_fields = fields
+
+
+class TicketOutboxItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TicketOutboxItem
+        fields = (
+            "id", "organization", "assessment", "finding_key", "provider", "batch_id", "title", "status",
+            "attempts", "next_attempt_at", "last_error", "external_id", "url", "created_at", "delivered_at",
+        )
+        read_only_fields = fields
+
+
+class ScanSweepSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ScanSweep
+        fields = (
+            "id", "filters", "status", "incremental", "started_at", "finished_at",
+            "total_orgs", "scanned_count", "last_org_id", "error",
+        )
+        read_only_fields = fields
+
+
+class ReportRunSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = ReportRun
         fields = (
@@ -88,3 +177,12 @@ class ReportRunSerializer(serializers.ModelSerializer):
             "summary", "top_risks", "recommendations",
         )
         read_only_fields = ("generated_at",)
+
+
+class ReportRunSummarySerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """History row: summary text without top risks and recommendations."""
+
+    class Meta:
+        model = ReportRun
+        fields = ("id", "organization", "generated_at", "linked_assessment", "linked_scan", "summary")
+        read_only_fields = fields
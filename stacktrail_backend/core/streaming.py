@@ -0,0 +1,109 @@
+"""
+NDJSON streaming responses (?stream=1): one JSON object per line, sent as soon as each event is ready.
+
+Events carry an "event" field. Streams that follow work done by run_worker poll the database every
+STREAM_POLL_INTERVAL seconds, send {"event": "ping"} after STREAM_KEEPALIVE_SECONDS of quiet so proxies
+keep the connection open, and end with {"event": "timeout"} after STREAM_MAX_SECONDS (re-open to continue).
+
+Under ASGI, Django buffers a sync iterator completely before sending it (and under WSGI it buffers async
+ones), so streams pick their iterator with is_asgi(): stream() does this for watch() / awatch().
+"""
+import asyncio
+import json
+import time
+from typing import AsyncIterable, AsyncIterator, Callable, Iterable, Iterator, List, Tuple, Union
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+NDJSON = "application/x-ndjson"
+
+
+def wants_stream(request) -> bool:
+    return request.query_params.get("stream") in ("1", "true")
+
+
+def is_asgi(request) -> bool:
+    return isinstance(getattr(request, "_request", request), ASGIRequest)
+
+
+def _line(event: dict) -> str:
+    return json.dumps(event, cls=JSONEncoder) + "\n"
+
+
+def ndjson_response(events: Union[Iterable[dict], AsyncIterable[dict]]) -> StreamingHttpResponse:
+    """`events` may be an async iterable (for ASGI)."""
+    if hasattr(events, "__aiter__"):
+        async def lines():
+            async for event in events:
+                yield _line(event)
+    else:
+        def lines():
+            for event in events:
+                yield _line(event)
+
+    resp = StreamingHttpResponse(lines(), content_type=NDJSON)
+    resp["Cache-Control"] = "no-cache"
+    # nginx would otherwise buffer the whole response.
+    resp["X-Accel-Buffering"] = "no"
+    return resp
+
+
+Poll = Callable[[], Tuple[List[dict], bool]]
+
+
+class _Pacer:
+    """Keepalive and time limit shared by watch() and awatch()."""
+
+    def __init__(self):
+        self.interval = float(getattr(settings, "STREAM_POLL_INTERVAL", 0.5))
+        self.keepalive = float(getattr(settings, "STREAM_KEEPALIVE_SECONDS", 15))
+        self.limit = float(getattr(settings, "STREAM_MAX_SECONDS", 300))
+        self.start = self.last = time.monotonic()
+
+    def after(self, events: List[dict], finished: bool) -> Tuple[List[dict], bool]:
+        """Events to send after a poll's own events, and whether the stream ends."""
+        now = time.monotonic()
+        if events:
+            self.last = now
+        if finished:
+            return [], True
+        if now - self.start >= self.limit:
+            return [{"event": "timeout"}], True
+        if now - self.last >= self.keepalive:
+            self.last = now
+            return [{"event": "ping"}], False
+        return [], False
+
+
+def watch(poll: Poll) -> Iterator[dict]:
+    """Call poll() until it reports finished, yielding the events it returns. poll() returns (events, finished)."""
+    pacer = _Pacer()
+    while True:
+        events, finished = poll()
+        extra, done = pacer.after(events, finished)
+        yield from events + extra
+        if done:
+            return
+        time.sleep(pacer.interval)
+
+
+async def awatch(poll: Poll) -> AsyncIterator[dict]:
+    """watch() for ASGI: poll() runs through sync_to_async and the wait between polls holds no thread."""
+    pacer = _Pacer()
+    poll = sync_to_async(poll)
+    while True:
+        events, finished = await poll()
+        extra, done = pacer.after(events, finished)
+        for event in events + extra:
+            yield event
+        if done:
+            return
+        await asyncio.sleep(pacer.interval)
+
+
+def stream(request, poll: Poll) -> StreamingHttpResponse:
+    return ndjson_response(awatch(poll) if is_asgi(request) else watch(poll))
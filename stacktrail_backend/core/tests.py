@@ -0,0 +1,265 @@
+import asyncio
+from unittest import mock
+
+import requests
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from urllib3.exceptions import MaxRetryError, NewConnectionError, ProtocolError
+
+from guardrail.rulesets import get_ruleset
+from guardrail.scanning.batch import SweepLostError, _commit_chunk, _complete, _fail, arun_sweep
+from guardrail.scoring import compare_rulesets, rescore_assessments
+
+from .integrations import Failure, ItemResult, failure_for_exception
+from .jobs import claim_next_sweep, enqueue_sweep, requeue_stale_sweeps
+from .models import Assessment, Finding, OrgIntegration, Organization, ScanRun, ScanSweep, TicketLink, TicketOutboxItem
+from .outbound import CircuitOpenError, OutboundScheduler
+from .workflow import deliver_outbox
+
+
+class FakeSession:
+    """Replays `outcomes` in order: an exception is raised, anything else is returned as the response."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def response(status_code):
+    r = requests.Response()
+    r.status_code = status_code
+    return r
+
+
+def refused():
+    return requests.ConnectionError(MaxRetryError(None, "/", NewConnectionError(None, "refused")))
+
+
+def http_error(status_code):
+    return requests.HTTPError(f"{status_code} Error", response=response(status_code))
+
+
+@override_settings(OUTBOUND_CIRCUIT_FAILURES=1, OUTBOUND_CIRCUIT_COOLDOWN_SECONDS=0.0, OUTBOUND_MAX_ATTEMPTS=3)
+@mock.patch("core.outbound.time.sleep")
+class OutboundSchedulerTests(SimpleTestCase):
+    def test_trial_call_that_raises_does_not_leave_the_circuit_stuck(self, sleep):
+        scheduler = OutboundScheduler()
+        session = FakeSession(
+            requests.ConnectionError(ProtocolError("Connection aborted.")),
+            requests.ReadTimeout("read timed out"),
+            response(201),
+        )
+        with self.assertRaises(requests.ConnectionError):
+            scheduler.request(session, "trello", "POST", "https://api.test/cards")
+        self.assertIsNotNone(scheduler.breaker("trello").opened_at)
+        # Cooldown is over: the half-open trial raises ReadTimeout ...
+        with self.assertRaises(requests.ReadTimeout):
+            scheduler.request(session, "trello", "POST", "https://api.test/cards")
+        self.assertFalse(scheduler.breaker("trello").trial_in_flight)
+        # ... and the next trial is still allowed through, and closes the circuit.
+        self.assertEqual(scheduler.request(session, "trello", "POST", "https://api.test/cards").status_code, 201)
+        self.assertIsNone(scheduler.breaker("trello").opened_at)
+
+    def test_open_circuit_fails_fast(self, sleep):
+        scheduler = OutboundScheduler()
+        with override_settings(OUTBOUND_CIRCUIT_COOLDOWN_SECONDS=60.0):
+            with self.assertRaises(requests.ReadTimeout):
+                scheduler.request(FakeSession(requests.ReadTimeout()), "jira", "POST", "https://api.test/issue")
+            session = FakeSession(response(201))
+            with self.assertRaises(CircuitOpenError):
+                scheduler.request(session, "jira", "POST", "https://api.test/issue")
+        self.assertEqual(session.calls, 0)
+
+    def test_connection_dropped_after_sending_is_not_retried(self, sleep):
+        session = FakeSession(requests.ConnectionError(ProtocolError("Connection aborted.")), response(201))
+        with self.assertRaises(requests.ConnectionError):
+            OutboundScheduler().request(session, "trello", "POST", "https://api.test/cards")
+        self.assertEqual(session.calls, 1)
+
+    def test_failures_before_sending_are_retried(self, sleep):
+        session = FakeSession(refused(), requests.ConnectTimeout("connect timed out"), response(201))
+        self.assertEqual(OutboundScheduler().request(session, "trello", "POST", "https://api.test/cards").status_code, 201)
+        self.assertEqual(session.calls, 3)
+
+
+class FailureClassTests(SimpleTestCase):
+    def test_failures_that_never_reached_the_provider_are_retried(self):
+        for e in (refused(), requests.ConnectTimeout("connect timed out"), CircuitOpenError("jira is failing")):
+            self.assertEqual(failure_for_exception(e), Failure.RETRY, e)
+
+    def test_throttling_and_unavailable_are_retried(self):
+        for status in (429, 503):
+            self.assertEqual(failure_for_exception(http_error(status)), Failure.RETRY, status)
+
+    def test_failures_after_sending_are_unknown(self):
+        for e in (
+            requests.ReadTimeout("read timed out"),
+            requests.ConnectionError(ProtocolError("Connection aborted.")),
+            http_error(500),
+            http_error(502),
+            ValueError("bad JSON in a 201"),
+        ):
+            self.assertEqual(failure_for_exception(e), Failure.UNKNOWN, e)
+
+    def test_rejections_are_permanent(self):
+        for status in (400, 401, 403, 404):
+            self.assertEqual(failure_for_exception(http_error(status)), Failure.PERMANENT, status)
+
+
+class FakeClient:
+    max_batch = 50
+
+    def __init__(self, outcome):
+        self.outcome = outcome
+
+    def create_many(self, items):
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return [self.outcome for _ in items]
+
+
+@override_settings(TICKET_OUTBOX_MAX_ATTEMPTS=10)
+class DeliverOutboxTests(TestCase):
+    def setUp(self):
+        owner = get_user_model().objects.create_user(username="owner", password="x")
+        org = Organization.objects.create(owner=owner, name="Acme")
+        OrgIntegration.objects.create(organization=org, provider="jira", config={"project_key": "SEC"})
+        self.item = TicketOutboxItem.objects.create(
+            organization=org, assessment=Assessment.objects.create(organization=org),
+            finding_key="mfa", provider="jira", batch_id="b", title="Turn on MFA",
+        )
+
+    def deliver(self, outcome):
+        with mock.patch("core.workflow.provider_client", return_value=FakeClient(outcome)):
+            counts = deliver_outbox()
+        self.item.refresh_from_db()
+        return counts
+
+    def test_retryable_failures_are_requeued(self):
+        for outcome in (refused(), http_error(429), http_error(503), CircuitOpenError("jira is failing")):
+            self.item.status = TicketOutboxItem.Status.QUEUED
+            self.item.next_attempt_at = self.item.created_at
+            self.item.save()
+            self.assertEqual(self.deliver(outcome)["retrying"], 1, outcome)
+            self.assertEqual(self.item.status, TicketOutboxItem.Status.QUEUED)
+
+    def test_possibly_created_tickets_are_not_resent(self):
+        for outcome in (requests.ReadTimeout("read timed out"), requests.ConnectionError(ProtocolError("Connection aborted.")), http_error(500)):
+            self.item.status = TicketOutboxItem.Status.QUEUED
+            self.item.save()
+            self.assertEqual(self.deliver(outcome)["failed"], 1, outcome)
+            self.assertEqual(self.item.status, TicketOutboxItem.Status.FAILED)
+            self.assertIn("may have been created in jira", self.item.last_error)
+
+    def test_rejected_tickets_fail_at_once(self):
+        for outcome in (http_error(400), http_error(401), http_error(403), ItemResult(error="summary: required", failure=Failure.PERMANENT)):
+            self.item.status = TicketOutboxItem.Status.QUEUED
+            self.item.save()
+            self.assertEqual(self.deliver(outcome)["failed"], 1, outcome)
+            self.assertEqual(self.item.status, TicketOutboxItem.Status.FAILED)
+            self.assertNotIn("may have been created", self.item.last_error)
+
+    def test_delivered_ticket_is_linked(self):
+        self.assertEqual(self.deliver(ItemResult({"key": "SEC-1", "url": "x/browse/SEC-1"}))["delivered"], 1)
+        self.assertEqual(TicketLink.objects.get(finding_key="mfa").external_id, "SEC-1")
+
+
+class CompareRulesetsTests(TestCase):
+    def test_same_version_counts_each_assessment_once_per_side(self):
+        owner = get_user_model().objects.create_user(username="owner", password="x")
+        org = Organization.objects.create(owner=owner, name="Acme")
+        for _ in range(3):
+            Assessment.objects.create(organization=org, completed_at=timezone.now())
+        report = compare_rulesets(get_ruleset(1), get_ruleset(1))
+        self.assertEqual(report["assessments"], 3)
+        self.assertEqual(set(report["rulesets"]), {"old", "new"})
+        for stats in report["rulesets"].values():
+            self.assertEqual(stats["version"], 1)
+            self.assertEqual(sum(stats["bands"].values()), 3)
+            self.assertEqual(sum(stats["score_histogram"].values()), 3)
+        self.assertEqual(report["changed"], 0)
+
+
+class SweepOwnershipTests(TestCase):
+    def setUp(self):
+        self.owner = get_user_model().objects.create_user(username="owner", password="x")
+        self.orgs = [Organization.objects.create(owner=self.owner, name=f"Org {i}", primary_domain="example.com") for i in range(2)]
+
+    def test_taken_over_run_writes_nothing(self):
+        enqueue_sweep(self.owner, {})
+        first = claim_next_sweep()
+        # The heartbeat went stale and another worker claimed the sweep.
+        with override_settings(SCAN_JOB_STALE_SECONDS=-1):
+            self.assertEqual(requeue_stale_sweeps(), 1)
+        second = claim_next_sweep()
+        self.assertNotEqual(first.claim_token, second.claim_token)
+
+        with self.assertRaises(SweepLostError):
+            _commit_chunk(first, self.orgs, [], 200)
+        with self.assertRaises(SweepLostError):
+            _complete(first)
+        _fail(first, RuntimeError("boom"))
+        second.refresh_from_db()
+        self.assertEqual((second.status, second.last_org_id, second.error), (ScanSweep.Status.RUNNING, 0, ""))
+
+        _commit_chunk(second, self.orgs, [], 200)
+        _complete(second)
+        second.refresh_from_db()
+        self.assertEqual((second.status, second.last_org_id), (ScanSweep.Status.COMPLETED, self.orgs[-1].pk))
+
+    @override_settings(SCAN_JOB_STALE_SECONDS=4)
+    def test_heartbeat_is_refreshed_during_a_slow_chunk(self):
+        enqueue_sweep(self.owner, {})
+        sweep = claim_next_sweep()
+        claimed_at = sweep.heartbeat_at
+        beats = []
+
+        async def slow_scan(orgs, *args, **kwargs):
+            await asyncio.sleep(1.5)
+            beats.append(await ScanSweep.objects.values_list("heartbeat_at", flat=True).aget(pk=sweep.pk))
+            return []
+
+        with mock.patch("guardrail.scanning.batch.ascan_organizations", slow_scan):
+            async_to_sync(arun_sweep)(sweep)
+        self.assertGreater(beats[0], claimed_at)
+        self.assertEqual(ScanSweep.objects.get(pk=sweep.pk).status, ScanSweep.Status.COMPLETED)
+        self.assertFalse(ScanRun.objects.exists())
+
+    def test_resume_leaves_queued_and_worker_sweeps_alone(self):
+        queued = enqueue_sweep(self.owner, {})
+        with self.assertRaises(CommandError):
+            call_command("scan_all", resume="latest")
+        with self.assertRaises(CommandError):
+            call_command("scan_all", resume=str(queued.pk))
+        claim_next_sweep()
+        with self.assertRaises(CommandError):
+            call_command("scan_all", resume="latest")
+        self.assertEqual(ScanSweep.objects.get(pk=queued.pk).status, ScanSweep.Status.RUNNING)
+
+
+class RescoreChunkingTests(TestCase):
+    def test_id_lists_stay_within_the_chunk_size(self):
+        owner = get_user_model().objects.create_user(username="owner", password="x")
+        orgs = [Organization.objects.create(owner=owner, name=f"Org {i}") for i in range(5)]
+        for org in orgs:
+            Assessment.objects.create(organization=org, completed_at=timezone.now())
+        with mock.patch("guardrail.scoring.UPDATE_CHUNK_SIZE", 2), CaptureQueriesContext(connection) as queries:
+            stats = rescore_assessments(batch_size=5)
+        self.assertEqual(stats["scanned"], 5)
+        self.assertTrue(Finding.objects.exists())
+        for query in queries.captured_queries:
+            if " IN (" in query["sql"]:
+                in_list = query["sql"].split(" IN (", 1)[1].split(")", 1)[0]
+                self.assertLessEqual(in_list.count(",") + 1, 2, query["sql"])
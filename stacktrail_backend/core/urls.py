@@ -17,10 +17,18 @@ from .views import (
     OrganizationListCreateView,
     OrganizationReportRunsView,
     OrganizationScanView,
+    OrganizationScanHistoryView,
     OrganizationScanRunsView,
+    OrganizationTicketOutboxStreamView,
+    OrganizationTicketOutboxView,
     RegisterView,
     RunWorkflowView,
+    ScanAllView,
+    ScanJobDetailView,
+    ScanJobStreamView,
+    ScanSweepDetailView,
     SeedDemoView,
+    TicketOutboxDetailView,
 )
 
 urlpatterns = [
@@ -29,16 +37,24 @@ urlpatterns = [
     path("auth/login", LoginView.as_view(), name="auth-login"),
     path("seed-demo", SeedDemoView.as_view(), name="seed-demo"),
     path("dashboard", DashboardSummaryView.as_view(), name="dashboard-summary"),
+    path("scan-all", ScanAllView.as_view(), name="scan-all"),
+    path("scan-jobs/<int:pk>", ScanJobDetailView.as_view(), name="scan-job-detail"),
+    path("scan-jobs/<int:pk>/stream", ScanJobStreamView.as_view(), name="scan-job-stream"),
+    path("scan-sweeps/<int:pk>", ScanSweepDetailView.as_view(), name="scan-sweep-detail"),
+    path("ticket-outbox/<int:pk>", TicketOutboxDetailView.as_view(), name="ticket-outbox-detail"),
     path("orgs", OrganizationListCreateView.as_view(), name="org-list-create"),
     path("orgs/<int:pk>", OrganizationDetailView.as_view(), name="org-detail"),
     path("orgs/<int:pk>/scan", OrganizationScanView.as_view(), name="org-scan"),
     path("orgs/<int:pk>/generate-report", OrganizationGenerateReportView.as_view(), name="org-generate-report"),
     path("orgs/<int:pk>/assessments", OrganizationAssessmentsView.as_view(), name="org-assessments"),
     path("orgs/<int:pk>/scan-runs", OrganizationScanRunsView.as_view(), name="org-scan-runs"),
+    path("orgs/<int:pk>/scan-history", OrganizationScanHistoryView.as_view(), name="org-scan-history"),
     path("orgs/<int:pk>/reports", OrganizationReportRunsView.as_view(), name="org-reports"),
     path("orgs/<int:pk>/integrations", OrganizationIntegrationsView.as_view(), name="org-integrations"),
     path("orgs/<int:pk>/create-ticket", CreateTicketView.as_view(), name="org-create-ticket"),
     path("orgs/<int:pk>/run-workflow", RunWorkflowView.as_view(), name="org-run-workflow"),
+    path("orgs/<int:pk>/ticket-outbox", OrganizationTicketOutboxView.as_view(), name="org-ticket-outbox"),
+    path("orgs/<int:pk>/ticket-outbox/stream", OrganizationTicketOutboxStreamView.as_view(), name="org-ticket-outbox-stream"),
     path("orgs/<int:pk>/mock-google-workspace-tag", MockGoogleWorkspaceTagView.as_view(), name="org-mock-google-workspace-tag"),
     path("assessments/start", AssessmentStartView.as_view(), name="assessment-start"),
     path("assessments/<int:pk>/submit", AssessmentSubmitView.as_view(), name="assessment-submit"),
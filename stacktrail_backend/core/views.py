@@ -1,27 +1,42 @@
 from django.contrib.auth import get_user_model
-from django.shortcuts import get_object_or_404
-from rest_framework import generics, permissions, response, status, views
+from django.core.exceptions import FieldDoesNotExist
+from django.db import transaction
+from django.shortcuts import aget_object_or_404, get_object_or_404
+from rest_framework import generics, permissions, response, serializers, status, views
+from rest_framework.pagination import LimitOffsetPagination
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from guardrail.scoring import score_assessment
-from guardrail.scanning import run_scan
 
-from .ai_suggestions import get_ai_suggestions_for_finding
+from .ai_suggestions import SuggestionRequest, aget_ai_suggestions_many, aiter_ai_suggestions, iter_ai_suggestions
+from .async_views import AsyncAPIView
+from .caching import assessment_pk_version, bump_org_versions, org_pk_version, user_dashboard_version, versioned_get
 from .demo_data import seed_demo_for_user
-from .integrations import create_google_task, create_jira_issue, create_trello_card
-from .models import Assessment, Finding, Organization, OrgIntegration, ReportRun, ScanRun
+from .jobs import enqueue_scan, enqueue_sweep
+from .pagination import HistoryCursorPagination
+from .scan_history import scan_history
+from .streaming import is_asgi, ndjson_response, stream, wants_stream
+from .workflow import TicketConfigError, check_config, enqueue_ticket, enqueue_workflow, ticket_description
+from .models import Assessment, Finding, Organization, OrgIntegration, OrgPosture, ReportRun, ScanJob, ScanRun, ScanSweep, TicketOutboxItem
 
 User = get_user_model()
 DEMO_PASSWORD = "demo1234!"
 from .serializers import (
     AssessmentSerializer,
+    AssessmentSummarySerializer,
     FindingSerializer,
+    OrganizationPostureSerializer,
     OrganizationSerializer,
     OrgIntegrationSerializer,
     RegisterSerializer,
     ReportRunSerializer,
+    ReportRunSummarySerializer,
+    ScanJobSerializer,
     ScanRunSerializer,
+    ScanRunSummarySerializer,
+    ScanSweepSerializer,
+    TicketOutboxItemSerializer,
 )
 
 
@@ -59,33 +74,41 @@ class SeedDemoView(views.APIView):
 
 
 class DashboardSummaryView(views.APIView):
-    """Return orgs with latest assessment (score, risk_band, answers) for dashboard charts."""
+    """Return orgs with latest assessment (score, risk_band, answers) and posture for dashboard charts.
+    One query: orgs joined to their OrgPosture row and its assessment. Pass ?limit=&offset= to paginate.
+    Served from the response cache (or 304) until one of the user's orgs changes."""
 
+    @versioned_get(user_dashboard_version)
     def get(self, request):
-        orgs = Organization.objects.filter(owner=request.user).order_by("-created_at")
-        out = []
-        for org in orgs:
-            latest = (
-                Assessment.objects.filter(organization=org, completed_at__isnull=False)
-                .order_by("-completed_at")
-                .first()
+        orgs = (
+            Organization.objects.filter(owner=request.user)
+            .order_by("-created_at")
+            .values(
+                "id", "name", "primary_domain", "business_type",
+                "posture__assessment_id", "posture__score", "posture__risk_band", "posture__assessment__answers",
+                "posture__insurance_readiness", "posture__open_high_findings", "posture__scan_status", "posture__cert_expires_at",
             )
-            item = {
-                "id": org.id,
-                "name": org.name,
-                "primary_domain": org.primary_domain,
-                "business_type": org.business_type,
-            }
-            if latest:
+        )
+        paginator = LimitOffsetPagination()
+        page = paginator.paginate_queryset(orgs, request, view=self)
+        out = []
+        for row in page if page is not None else orgs:
+            item = {key: row[key] for key in ("id", "name", "primary_domain", "business_type")}
+            item["latest_assessment"] = None
+            if row["posture__assessment_id"] is not None:
                 item["latest_assessment"] = {
-                    "score": latest.score,
-                    "risk_band": latest.risk_band,
-                    "answers": latest.answers or {},
+                    "score": row["posture__score"],
+                    "risk_band": row["posture__risk_band"],
+                    "answers": row["posture__assessment__answers"] or {},
                 }
-            else:
-                item["latest_assessment"] = None
+            item["posture"] = {
+                "insurance_readiness": row["posture__insurance_readiness"] or None,
+                "open_high_findings": row["posture__open_high_findings"] or 0,
+                "scan_status": row["posture__scan_status"] or None,
+                "cert_days_until_expiry": OrgPosture(cert_expires_at=row["posture__cert_expires_at"]).cert_days_until_expiry,
+            }
             out.append(item)
-        return response.Response(out)
+        return paginator.get_paginated_response(out) if page is not None else response.Response(out)
 
 
 class LoginView(TokenObtainPairView):
@@ -113,37 +136,116 @@ class LoginView(TokenObtainPairView):
 
 
 class OrganizationListCreateView(generics.ListCreateAPIView):
-    serializer_class = OrganizationSerializer
+    serializer_class = OrganizationPostureSerializer
 
     def get_queryset(self):
-        return Organization.objects.filter(owner=self.request.user).order_by("-created_at")
+        return Organization.objects.filter(owner=self.request.user).select_related("posture").order_by("-created_at")
 
     def perform_create(self, serializer):
-        serializer.save(owner=self.request.user)
+        with transaction.atomic():
+            org = serializer.save(owner=self.request.user)
+            bump_org_versions([org.pk])
 
 
 class OrganizationDetailView(generics.RetrieveUpdateAPIView):
-    serializer_class = OrganizationSerializer
+    serializer_class = OrganizationPostureSerializer
 
     def get_queryset(self):
-        return Organization.objects.filter(owner=self.request.user)
+        return Organization.objects.filter(owner=self.request.user).select_related("posture")
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            org = serializer.save()
+            bump_org_versions([org.pk])
 
 
 class OrganizationScanView(views.APIView):
+    """Queue a scan; poll GET /api/scan-jobs/<job_id> for status and the resulting ScanRun.
+    {"incremental": true} only re-runs probes that are due and carries the rest forward."""
+
     def post(self, request, pk):
         org = get_object_or_404(Organization, pk=pk, owner=request.user)
-        scan = run_scan(org)
+        job = enqueue_scan(org, user=request.user, incremental=bool(request.data.get("incremental")))
         return response.Response(
-            ScanRunSerializer(scan).data,
-            status=status.HTTP_201_CREATED,
+            {
+                "job_id": job.id,
+                "status": job.status,
+                "status_url": f"/api/scan-jobs/{job.id}",
+                "stream_url": f"/api/scan-jobs/{job.id}/stream",
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class ScanJobDetailView(generics.RetrieveAPIView):
+    serializer_class = ScanJobSerializer
+
+    def get_queryset(self):
+        return ScanJob.objects.filter(organization__owner=self.request.user).select_related(
+            "scan_run", *(f"scan_run__{fk}" for fk in ScanRun.SECTIONS.values())
         )
 
 
+class ScanJobStreamView(ScanJobDetailView):
+    """NDJSON progress of a scan job: {"event": "status"} on each status change, {"event": "probe"} as each
+    probe finishes, then {"event": "done", "job": ...} with the resulting ScanRun."""
+
+    def get(self, request, *args, **kwargs):
+        job = self.get_object()
+        seen = {"status": None, "probes": set()}
+
+        def poll():
+            current = ScanJob.objects.filter(pk=job.pk).values("status", "progress").first()
+            events = []
+            if current["status"] != seen["status"]:
+                seen["status"] = current["status"]
+                events.append({"event": "status", "status": current["status"]})
+            for name, result in (current["progress"] or {}).items():
+                if name not in seen["probes"]:
+                    seen["probes"].add(name)
+                    events.append({"event": "probe", "probe": name, "result": result})
+            finished = current["status"] in (ScanJob.Status.DONE, ScanJob.Status.FAILED)
+            if finished:
+                events.append({"event": "done", "job": self.get_serializer(self.get_object()).data})
+            return events, finished
+
+        return stream(request, poll)
+
+
+class ScanAllView(views.APIView):
+    """Queue a scan of all of the current user's orgs (optionally filtered by org_ids / business_type / domain).
+    manage.py run_worker runs it; poll GET /api/scan-sweeps/<sweep_id> for progress."""
+
+    def post(self, request):
+        filters = {"owner_id": request.user.pk}
+        org_ids = request.data.get("org_ids")
+        if org_ids is not None:
+            if not isinstance(org_ids, list):
+                return response.Response({"detail": "org_ids must be a list"}, status=status.HTTP_400_BAD_REQUEST)
+            filters["org_ids"] = org_ids
+        for key in ("business_type", "domain"):
+            if request.data.get(key):
+                filters[key] = request.data[key]
+        sweep = enqueue_sweep(request.user, filters, incremental=bool(request.data.get("incremental")))
+        return response.Response(
+            {"sweep_id": sweep.id, "status": sweep.status, "status_url": f"/api/scan-sweeps/{sweep.id}"},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class ScanSweepDetailView(generics.RetrieveAPIView):
+    serializer_class = ScanSweepSerializer
+
+    def get_queryset(self):
+        return ScanSweep.objects.filter(requested_by=self.request.user)
+
+
 class OrganizationGenerateReportView(views.APIView):
     def post(self, request, pk):
         org = get_object_or_404(Organization, pk=pk, owner=request.user)
-        latest_assessment = org.assessments.filter(completed_at__isnull=False).order_by("-completed_at").first()
-        latest_scan = org.scan_runs.order_by("-scanned_at").first()
+        posture = OrgPosture.objects.select_related("assessment").filter(organization=org).first()
+        latest_assessment = posture.assessment if posture else None
+        latest_scan_id = posture.scan_run_id if posture else None
 
         summary_parts = []
         top_risks = []
@@ -156,17 +258,19 @@ class OrganizationGenerateReportView(views.APIView):
             recommendations = []
             for f in top_findings:
                 recommendations.append({"title": f.title, "steps": f.remediation_steps})
-        if latest_scan:
-            summary_parts.append(f"Domain scan: {latest_scan.overall_scan_status}. SPF/DMARC/TLS checked.")
-
-        report = ReportRun.objects.create(
-            organization=org,
-            linked_assessment=latest_assessment,
-            linked_scan=latest_scan,
-            summary=" ".join(summary_parts) or "No assessment or scan data yet.",
-            top_risks=top_risks,
-            recommendations=recommendations,
-        )
+        if latest_scan_id:
+            summary_parts.append(f"Domain scan: {posture.scan_status}. SPF/DMARC/TLS checked.")
+
+        with transaction.atomic():
+            report = ReportRun.objects.create(
+                organization=org,
+                linked_assessment=latest_assessment,
+                linked_scan_id=latest_scan_id,
+                summary=" ".join(summary_parts) or "No assessment or scan data yet.",
+                top_risks=top_risks,
+                recommendations=recommendations,
+            )
+            bump_org_versions([org.pk])
         return response.Response(
             ReportRunSerializer(report).data,
             status=status.HTTP_201_CREATED,
@@ -207,16 +311,22 @@ class AssessmentDetailView(generics.RetrieveUpdateAPIView):
         return Assessment.objects.filter(organization__owner=self.request.user)
 
     def perform_update(self, serializer):
-        # Only allow updating checklist_notes
-        if "checklist_notes" in self.request.data:
-            serializer.save(checklist_notes=self.request.data["checklist_notes"])
-        else:
-            serializer.save()
+        # Answers and notes feed the org's cached reads (dashboard, assessment detail).
+        with transaction.atomic():
+            if "checklist_notes" in self.request.data:
+                assessment = serializer.save(checklist_notes=self.request.data["checklist_notes"])
+            else:
+                assessment = serializer.save()
+            bump_org_versions([assessment.organization_id])
 
 
 class AssessmentFindingsView(generics.ListAPIView):
     serializer_class = FindingSerializer
 
+    @versioned_get(assessment_pk_version)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def get_queryset(self):
         return Finding.objects.filter(
             assessment_id=self.kwargs["pk"],
@@ -224,11 +334,13 @@ class AssessmentFindingsView(generics.ListAPIView):
         )
 
 
-class AssessmentAISuggestionsView(views.APIView):
-    """Generate AI suggestions and tags for one or all checklist items (findings or question label)."""
+class AssessmentAISuggestionsView(AsyncAPIView):
+    """Generate AI suggestions and tags for one or all checklist items (findings or question label).
+    With ?stream=1, all-findings results are sent as NDJSON, one {"event": "suggestion"} line per finding
+    as soon as it is ready, then {"event": "done"}. Async: prompts run on the async OpenAI client."""
 
-    def post(self, request, pk):
-        assessment = get_object_or_404(
+    async def post(self, request, pk):
+        assessment = await aget_object_or_404(
             Assessment, pk=pk, organization__owner=request.user
         )
         finding_key = request.data.get("finding_key")
@@ -236,66 +348,120 @@ class AssessmentAISuggestionsView(views.APIView):
         findings = Finding.objects.filter(assessment=assessment).order_by("-priority_score")
         if finding_key:
             findings = findings.filter(key=finding_key)
-        results = []
-        for f in findings:
-            note = (assessment.checklist_notes or {}).get(f.key, "")
-            out = get_ai_suggestions_for_finding(
+        keys = []
+        items = []
+        async for f in findings:
+            keys.append(f.key)
+            items.append(SuggestionRequest(
                 title=f.title,
                 explanation=f.explanation or "",
-                remediation_steps=f.remediation_steps or [],
-                extra_context=note,
-            )
-            results.append({
-                "finding_key": f.key,
-                "suggestions": out.get("suggestions") or [],
-                "tags": out.get("tags") or [],
-            })
+                remediation_steps=tuple(f.remediation_steps or ()),
+                extra_context=(assessment.checklist_notes or {}).get(f.key, ""),
+                key=f.key,
+            ))
         # Single checklist item with no finding: generate from question_label
-        if finding_key and not results and question_label:
-            out = get_ai_suggestions_for_finding(
-                title=question_label,
-                explanation="General cyber hygiene checklist item.",
-                remediation_steps=[],
-                extra_context="",
-            )
-            results.append({
-                "finding_key": finding_key,
-                "suggestions": out.get("suggestions") or [],
-                "tags": out.get("tags") or [],
-            })
+        if finding_key and not items and question_label:
+            keys.append(finding_key)
+            items.append(SuggestionRequest(title=question_label, explanation="General cyber hygiene checklist item."))
+        if wants_stream(request) and not finding_key:
+            return ndjson_response(self._astream(keys, items) if is_asgi(request) else self._stream(keys, items))
+        results = [
+            {"finding_key": key, "suggestions": out.get("suggestions") or [], "tags": out.get("tags") or []}
+            for key, out in zip(keys, await aget_ai_suggestions_many(items))
+        ]
         return response.Response(
             results[0] if finding_key and results else {"findings": results}
         )
 
-
-class OrganizationAssessmentsView(generics.ListAPIView):
-    serializer_class = AssessmentSerializer
-
-    def get_queryset(self):
-        return Assessment.objects.filter(
+    @staticmethod
+    def _stream(keys, items):
+        for index, out in iter_ai_suggestions(items):
+            yield {"event": "suggestion", "finding_key": keys[index], "suggestions": out.get("suggestions") or [], "tags": out.get("tags") or []}
+        yield {"event": "done", "count": len(items)}
+
+    @staticmethod
+    async def _astream(keys, items):
+        async for index, out in aiter_ai_suggestions(items):
+            yield {"event": "suggestion", "finding_key": keys[index], "suggestions": out.get("suggestions") or [], "tags": out.get("tags") or []}
+        yield {"event": "done", "count": len(items)}
+
+
+class OrgHistoryListView(generics.ListAPIView):
+    """An org's history, newest first. ?view=summary returns slim rows, ?fields=a,b picks fields,
+    ?page_size=N (then ?cursor=) pages. Only the columns and joins the chosen fields need are loaded."""
+    pagination_class = HistoryCursorPagination
+    summary_serializer_class = None
+    cursor_ordering = ()
+
+    def get_serializer_class(self):
+        if self.request.query_params.get("view") == "summary":
+            return self.summary_serializer_class
+        return self.serializer_class
+
+    def history_queryset(self):
+        return self.serializer_class.Meta.model.objects.filter(
             organization_id=self.kwargs["pk"],
             organization__owner=self.request.user,
-        ).order_by("-created_at")
+        )
+
+    def get_queryset(self):
+        queryset = self.history_queryset().order_by(*self.cursor_ordering)
+        model = queryset.model
+        sections = getattr(model, "SECTIONS", {})
+        columns = {name.lstrip("-") for name in self.cursor_ordering}
+        joins = []
+        for field in self.get_serializer().fields.values():
+            if field.source in sections:
+                columns.add(sections[field.source])
+                joins.append(sections[field.source])
+                continue
+            try:
+                model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                # Computed field: can't tell which columns it reads, so load the whole row.
+                return queryset.select_related(*joins) if joins else queryset
+            columns.add(field.source)
+            if isinstance(field, serializers.BaseSerializer):
+                joins.append(field.source)
+        # select_related() with no arguments would follow every foreign key.
+        return (queryset.select_related(*joins) if joins else queryset).only(*columns)
+
+
+class OrganizationAssessmentsView(OrgHistoryListView):
+    serializer_class = AssessmentSerializer
+    summary_serializer_class = AssessmentSummarySerializer
+    cursor_ordering = ("-created_at", "-id")
 
 
-class OrganizationScanRunsView(generics.ListAPIView):
+class OrganizationScanRunsView(OrgHistoryListView):
     serializer_class = ScanRunSerializer
+    summary_serializer_class = ScanRunSummarySerializer
+    cursor_ordering = ("-scanned_at", "-id")
 
-    def get_queryset(self):
-        return ScanRun.objects.filter(
-            organization_id=self.kwargs["pk"],
-            organization__owner=self.request.user,
-        ).order_by("-scanned_at")
+    @versioned_get(org_pk_version)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
 
 
-class OrganizationReportRunsView(generics.ListAPIView):
-    serializer_class = ReportRunSerializer
+class OrganizationScanHistoryView(views.APIView):
+    """Changes between consecutive scans, newest first: GET ?limit=20&before=<scan_id>.
+    Only sections whose content changed are loaded and diffed."""
 
-    def get_queryset(self):
-        return ReportRun.objects.filter(
-            organization_id=self.kwargs["pk"],
-            organization__owner=self.request.user,
-        ).order_by("-generated_at")
+    def get(self, request, pk):
+        org = get_object_or_404(Organization, pk=pk, owner=request.user)
+        try:
+            limit = min(max(int(request.query_params.get("limit", 20)), 1), 100)
+            before = request.query_params.get("before")
+            before = int(before) if before else None
+        except ValueError:
+            return response.Response({"detail": "limit and before must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+        return response.Response(scan_history(org, limit=limit, before=before))
+
+
+class OrganizationReportRunsView(OrgHistoryListView):
+    serializer_class = ReportRunSerializer
+    summary_serializer_class = ReportRunSummarySerializer
+    cursor_ordering = ("-generated_at", "-id")
 
 
 class OrganizationIntegrationsView(views.APIView):
@@ -327,6 +493,8 @@ class OrganizationIntegrationsView(views.APIView):
 
 
 class CreateTicketView(views.APIView):
+    """Queue a ticket for one finding; poll GET /api/ticket-outbox/<outbox_id> for delivery and the ticket URL."""
+
     def post(self, request, pk):
         org = get_object_or_404(Organization, pk=pk, owner=request.user)
         provider = request.data.get("provider")
@@ -341,75 +509,23 @@ class CreateTicketView(views.APIView):
         finding = Finding.objects.filter(assessment=assessment, key=finding_key).first()
         if not finding:
             return response.Response({"detail": "finding not found"}, status=status.HTTP_404_NOT_FOUND)
-        title = finding.title
-        steps = list(finding.remediation_steps) if finding.remediation_steps else []
         note = (assessment.checklist_notes or {}).get(finding_key, "")
-        desc = finding.explanation or ""
-        if steps:
-            desc += "\n\nTo-do:\n" + "\n".join(f"- {s}" for s in steps)
-        if note:
-            desc += "\n\nNotes: " + note
         ai_suggestions = request.data.get("ai_suggestions")
-        if isinstance(ai_suggestions, list) and ai_suggestions:
-            desc += "\n\nAI suggestions:\n" + "\n".join(f"- {s}" for s in ai_suggestions)
+        desc = ticket_description(finding, note, ai_suggestions if isinstance(ai_suggestions, list) else ())
 
         integration = get_object_or_404(OrgIntegration, organization=org, provider=provider)
         config = integration.config or {}
         assignee = org.default_assignee_id or config.get("assignee_id") or config.get("member_id")
-
         try:
-            if provider == "trello":
-                list_id = config.get("list_id")
-                if not list_id:
-                    return response.Response({"detail": "Trello list_id required in integration config"}, status=status.HTTP_400_BAD_REQUEST)
-                card = create_trello_card(
-                    api_key=config.get("api_key", ""),
-                    token=config.get("token", ""),
-                    list_id=list_id,
-                    name=title,
-                    desc=desc,
-                    member_id=assignee,
-                )
-                return response.Response({"url": card.get("url"), "id": card.get("id")}, status=status.HTTP_201_CREATED)
-            if provider == "jira":
-                project_key = config.get("project_key")
-                if not project_key:
-                    return response.Response({"detail": "Jira project_key required in integration config"}, status=status.HTTP_400_BAD_REQUEST)
-                issue = create_jira_issue(
-                    domain=config.get("domain", "").rstrip("/"),
-                    email=config.get("email", ""),
-                    api_token=config.get("api_token", ""),
-                    project_key=project_key,
-                    summary=title,
-                    description=desc,
-                    assignee_id=assignee,
-                )
-                key = issue.get("key")
-                return response.Response(
-                    {"key": key, "url": f"{config.get('domain', '').rstrip('/')}/browse/{key}"},
-                    status=status.HTTP_201_CREATED,
-                )
-            if provider == "google_tasks":
-                task_list_id = config.get("task_list_id")
-                access_token = config.get("access_token")
-                if not task_list_id or not access_token:
-                    return response.Response(
-                        {"detail": "Google Tasks task_list_id and access_token required in integration config"},
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-                task = create_google_task(
-                    access_token=access_token,
-                    task_list_id=task_list_id,
-                    title=title,
-                    notes=desc,
-                )
-                return response.Response(
-                    {"id": task.get("id"), "url": task.get("self")},
-                    status=status.HTTP_201_CREATED,
-                )
-            return response.Response({"detail": "unknown provider"}, status=status.HTTP_400_BAD_REQUEST)
-        except Exception as e:
-            return response.Response({"detail": str(e)}, status=status.HTTP_502_BAD_GATEWAY)
+            check_config(provider, config)
+        except TicketConfigError as e:
+            return response.Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        item = enqueue_ticket(assessment, finding, provider, desc, assignee, user=request.user)
+        return response.Response(
+            {"outbox_id": item.id, "status": item.status, "status_url": f"/api/ticket-outbox/{item.id}"},
+            status=status.HTTP_202_ACCEPTED,
+        )
 
 
 class MockGoogleWorkspaceTagView(views.APIView):
@@ -435,7 +551,8 @@ class MockGoogleWorkspaceTagView(views.APIView):
 
 
 class RunWorkflowView(views.APIView):
-    """Workflow automation: create tickets/cards for all findings across connected integrations."""
+    """Workflow automation: queue tickets/cards for all findings across connected integrations.
+    Findings that already have a ticket in a provider are skipped; poll status_url for delivery."""
 
     def post(self, request, pk):
         org = get_object_or_404(Organization, pk=pk, owner=request.user)
@@ -446,10 +563,9 @@ class RunWorkflowView(views.APIView):
                 {"detail": "assessment_id is required"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        assessment = get_object_or_404(Assessment, id=assessment_id, organization=org)
-        findings = list(Finding.objects.filter(assessment=assessment).order_by("-priority_score"))
-        if not findings:
-            return response.Response({"created": [], "errors": [], "message": "No findings for this assessment."})
+        assessment = get_object_or_404(Assessment.objects.select_related("organization"), id=assessment_id, organization=org)
+        if not Finding.objects.filter(assessment=assessment).exists():
+            return response.Response({"queued": [], "skipped": [], "errors": [], "message": "No findings for this assessment."})
 
         integrations = list(OrgIntegration.objects.filter(organization=org))
         if not integrations:
@@ -457,78 +573,59 @@ class RunWorkflowView(views.APIView):
                 {"detail": "Connect at least one integration (Trello, Jira, or Google Workspace) first."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        result = enqueue_workflow(assessment, integrations, include_ai=bool(include_ai), user=request.user)
+        result["queued"] = TicketOutboxItemSerializer(result["queued"], many=True).data
+        result["status_url"] = f"/api/orgs/{org.pk}/ticket-outbox?batch={result['batch_id']}"
+        result["stream_url"] = f"/api/orgs/{org.pk}/ticket-outbox/stream?batch={result['batch_id']}"
+        return response.Response(result, status=status.HTTP_202_ACCEPTED)
+
 
-        created = []
-        errors = []
-        configs = {i.provider: (i, i.config or {}) for i in integrations}
-        assignee = org.default_assignee_id
-
-        for finding in findings:
-            steps = list(finding.remediation_steps or [])
-            note = (assessment.checklist_notes or {}).get(finding.key, "")
-            desc = finding.explanation or ""
-            if steps:
-                desc += "\n\nTo-do:\n" + "\n".join(f"- {s}" for s in steps)
-            if note:
-                desc += "\n\nNotes: " + note
-            if include_ai:
-                out = get_ai_suggestions_for_finding(
-                    title=finding.title,
-                    explanation=finding.explanation or "",
-                    remediation_steps=steps,
-                    extra_context=note,
-                )
-                ai_list = out.get("suggestions") or []
-                if ai_list:
-                    desc += "\n\nAI suggestions:\n" + "\n".join(f"- {s}" for s in ai_list)
-
-            for provider, (integration, config) in configs.items():
-                assignee_id = assignee or config.get("assignee_id") or config.get("member_id")
-                try:
-                    if provider == "trello":
-                        list_id = config.get("list_id")
-                        if not list_id:
-                            errors.append({"provider": provider, "finding_key": finding.key, "detail": "list_id required"})
-                            continue
-                        card = create_trello_card(
-                            api_key=config.get("api_key", ""),
-                            token=config.get("token", ""),
-                            list_id=list_id,
-                            name=finding.title,
-                            desc=desc,
-                            member_id=assignee_id,
-                        )
-                        created.append({"provider": provider, "finding_key": finding.key, "url": card.get("url"), "id": card.get("id")})
-                    elif provider == "jira":
-                        project_key = config.get("project_key")
-                        if not project_key:
-                            errors.append({"provider": provider, "finding_key": finding.key, "detail": "project_key required"})
-                            continue
-                        issue = create_jira_issue(
-                            domain=config.get("domain", "").rstrip("/"),
-                            email=config.get("email", ""),
-                            api_token=config.get("api_token", ""),
-                            project_key=project_key,
-                            summary=finding.title,
-                            description=desc,
-                            assignee_id=assignee_id,
-                        )
-                        key = issue.get("key")
-                        created.append({"provider": provider, "finding_key": finding.key, "key": key, "url": f"{config.get('domain', '').rstrip('/')}/browse/{key}"})
-                    elif provider == "google_tasks":
-                        task_list_id = config.get("task_list_id")
-                        access_token = config.get("access_token")
-                        if not task_list_id or not access_token:
-                            errors.append({"provider": provider, "finding_key": finding.key, "detail": "task_list_id and access_token required"})
-                            continue
-                        task = create_google_task(
-                            access_token=access_token,
-                            task_list_id=task_list_id,
-                            title=finding.title,
-                            notes=desc,
-                        )
-                        created.append({"provider": provider, "finding_key": finding.key, "id": task.get("id")})
-                except Exception as e:
-                    errors.append({"provider": provider, "finding_key": finding.key, "detail": str(e)})
-
-        return response.Response({"created": created, "errors": errors}, status=status.HTTP_200_OK)
+class TicketOutboxDetailView(generics.RetrieveAPIView):
+    serializer_class = TicketOutboxItemSerializer
+
+    def get_queryset(self):
+        return TicketOutboxItem.objects.filter(organization__owner=self.request.user)
+
+
+class OrganizationTicketOutboxView(generics.ListAPIView):
+    """Outbox items for an org, newest first; ?batch=<batch_id> for one workflow run, ?status=queued|sending|delivered|failed."""
+    serializer_class = TicketOutboxItemSerializer
+    pagination_class = HistoryCursorPagination
+    cursor_ordering = ("-created_at", "-id")
+
+    def get_queryset(self):
+        org = get_object_or_404(Organization, pk=self.kwargs["pk"], owner=self.request.user)
+        qs = TicketOutboxItem.objects.filter(organization=org).order_by(*self.cursor_ordering)
+        if self.request.query_params.get("batch"):
+            qs = qs.filter(batch_id=self.request.query_params["batch"])
+        if self.request.query_params.get("status"):
+            qs = qs.filter(status=self.request.query_params["status"])
+        return qs
+
+
+class OrganizationTicketOutboxStreamView(OrganizationTicketOutboxView):
+    """NDJSON delivery progress of a workflow run (?batch=<batch_id> required): {"event": "ticket"} whenever an
+    item changes status or is retried, then {"event": "done"} with counts once none is queued or sending."""
+    pagination_class = None
+
+    def get(self, request, *args, **kwargs):
+        if not request.query_params.get("batch"):
+            return response.Response({"detail": "batch is required"}, status=status.HTTP_400_BAD_REQUEST)
+        queryset = self.get_queryset()
+        seen = {}
+
+        def poll():
+            events = []
+            items = list(queryset.all())
+            for item in items:
+                state = (item.status, item.attempts)
+                if seen.get(item.pk) != state:
+                    seen[item.pk] = state
+                    events.append({"event": "ticket", "item": self.get_serializer(item).data})
+            finished = not any(item.status in TicketOutboxItem.ACTIVE_STATUSES for item in items)
+            if finished:
+                counts = {value: sum(1 for item in items if item.status == value) for value in TicketOutboxItem.Status.values}
+                events.append({"event": "done", "counts": counts})
+            return events, finished
+
+        return stream(request, poll)
@@ -0,0 +1,325 @@
+"""
+Workflow automation: one ticket per finding per connected integration, delivered through an outbox.
+
+The API only writes TicketOutboxItem rows (enqueue_workflow, enqueue_ticket) and returns; manage.py
+run_worker delivers them (deliver_outbox). Delivery sends per-org, per-provider chunks through the batch
+clients in core.integrations (Jira bulk create, Google batch requests, one call per Trello card),
+concurrently (TICKET_WORKFLOW_CONCURRENCY); core.outbound paces, retries and circuit-breaks each HTTP call.
+An item whose call never reached the provider (or got 429/503, or hit an open circuit) is retried later
+with exponential backoff up to TICKET_OUTBOX_MAX_ATTEMPTS, so provider outages delay tickets instead of
+losing them. Rejections (other 4xx) fail at once, and so do failures after the request was sent (read
+timeouts, dropped connections, 5xx): the provider may have created the ticket, so resending could duplicate
+it and the item is left failed for someone to check. Items left sending by a crashed worker are requeued
+after TICKET_CLAIM_STALE_SECONDS (at-least-once: a crash between the provider call and the write can repeat
+that ticket). Delivered tickets are recorded as TicketLinks; workflow items whose pair already has one are
+skipped, and a partial unique constraint keeps one active item per finding + provider.
+"""
+import logging
+import random
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .ai_suggestions import SuggestionRequest, get_ai_suggestions_many
+from .integrations import Failure, ItemResult, TicketItem, provider_client
+from .models import Assessment, Finding, OrgIntegration, TicketLink, TicketOutboxItem
+
+logger = logging.getLogger(__name__)
+
+
+class TicketConfigError(ValueError):
+    """The integration config is missing what the provider needs."""
+
+
+def ticket_description(finding: Finding, note: str = "", ai_suggestions: Sequence[str] = ()) -> str:
+    desc = finding.explanation or ""
+    steps = list(finding.remediation_steps or [])
+    if steps:
+        desc += "\n\nTo-do:\n" + "\n".join(f"- {s}" for s in steps)
+    if note:
+        desc += "\n\nNotes: " + note
+    return with_ai_suggestions(desc, ai_suggestions)
+
+
+def with_ai_suggestions(description: str, ai_suggestions: Sequence[str]) -> str:
+    if not ai_suggestions:
+        return description
+    return description + "\n\nAI suggestions:\n" + "\n".join(f"- {s}" for s in ai_suggestions)
+
+
+def check_config(provider: str, config: Dict[str, Any]) -> None:
+    if provider not in OrgIntegration.Provider.values:
+        raise TicketConfigError("unknown provider")
+    if provider == "trello" and not config.get("list_id"):
+        raise TicketConfigError("Trello list_id required in integration config")
+    if provider == "jira" and not config.get("project_key"):
+        raise TicketConfigError("Jira project_key required in integration config")
+    if provider == "google_tasks" and not (config.get("task_list_id") and config.get("access_token")):
+        raise TicketConfigError("Google Tasks task_list_id and access_token required in integration config")
+
+
+def record_ticket(assessment_id: int, finding_key: str, provider: str, result: Dict[str, Any]) -> None:
+    """Store a created ticket so later workflow runs skip its finding + provider."""
+    TicketLink.objects.update_or_create(
+        assessment_id=assessment_id,
+        finding_key=finding_key,
+        provider=provider,
+        defaults={
+            "external_id": str(result.get("key") or result.get("id") or ""),
+            "url": result.get("url") or "",
+            "created_at": timezone.now(),
+        },
+    )
+
+
+def _enqueue(items: List[TicketOutboxItem]) -> Tuple[str, List[TicketOutboxItem]]:
+    """Insert items under a new batch id; returns the id and the items inserted (pairs that already
+    have an active item are left out by the unique constraint)."""
+    batch_id = uuid.uuid4().hex
+    for item in items:
+        item.batch_id = batch_id
+    TicketOutboxItem.objects.bulk_create(items, ignore_conflicts=True)
+    return batch_id, list(TicketOutboxItem.objects.filter(batch_id=batch_id).order_by("pk"))
+
+
+def enqueue_ticket(assessment: Assessment, finding: Finding, provider: str, description: str, assignee_id: str = "", user=None) -> TicketOutboxItem:
+    """Queue one ticket (always created, even if the finding already has one). Returns the active item
+    for this finding + provider, which is an earlier one if it is still queued."""
+    item = TicketOutboxItem(
+        organization_id=assessment.organization_id,
+        assessment=assessment,
+        finding_key=finding.key,
+        provider=provider,
+        title=finding.title,
+        description=description,
+        assignee_id=assignee_id or "",
+        replace_existing=True,
+        requested_by=user,
+    )
+    with transaction.atomic():
+        _, inserted = _enqueue([item])
+        if inserted:
+            return inserted[0]
+        return TicketOutboxItem.objects.get(
+            assessment=assessment, finding_key=finding.key, provider=provider, status__in=TicketOutboxItem.ACTIVE_STATUSES
+        )
+
+
+def enqueue_workflow(assessment: Assessment, integrations: Sequence[OrgIntegration], include_ai: bool = True, user=None) -> Dict[str, Any]:
+    """Queue a ticket for every finding x integration without one. Returns batch_id plus queued, skipped and errors lists.
+    AI suggestions (include_ai) are generated by the worker at delivery."""
+    findings = list(Finding.objects.filter(assessment=assessment).order_by("-priority_score"))
+    existing = {
+        (link.finding_key, link.provider): link
+        for link in TicketLink.objects.filter(assessment=assessment, finding_key__in=[f.key for f in findings])
+    }
+    notes = assessment.checklist_notes or {}
+    assignee = assessment.organization.default_assignee_id
+    skipped: List[Dict[str, Any]] = []
+    errors: List[Dict[str, Any]] = []
+
+    items = []
+    for finding in findings:
+        for integration in integrations:
+            provider, config = integration.provider, integration.config or {}
+            link = existing.get((finding.key, provider))
+            if link:
+                skipped.append({"provider": provider, "finding_key": finding.key, "id": link.external_id, "url": link.url})
+                continue
+            try:
+                check_config(provider, config)
+            except TicketConfigError as e:
+                errors.append({"provider": provider, "finding_key": finding.key, "detail": str(e)})
+                continue
+            items.append(TicketOutboxItem(
+                organization_id=assessment.organization_id,
+                assessment=assessment,
+                finding_key=finding.key,
+                provider=provider,
+                title=finding.title,
+                description=ticket_description(finding, notes.get(finding.key, "")),
+                assignee_id=assignee or config.get("assignee_id") or config.get("member_id") or "",
+                include_ai=include_ai,
+                requested_by=user,
+            ))
+
+    with transaction.atomic():
+        batch_id, queued = _enqueue(items) if items else (uuid.uuid4().hex, [])
+    inserted = {(item.finding_key, item.provider) for item in queued}
+    for item in items:
+        if (item.finding_key, item.provider) not in inserted:
+            skipped.append({"provider": item.provider, "finding_key": item.finding_key, "detail": "already queued"})
+    return {"batch_id": batch_id, "queued": queued, "skipped": skipped, "errors": errors}
+
+
+# Delivery (manage.py run_worker).
+
+def outbox_batch_size() -> int:
+    return int(getattr(settings, "TICKET_OUTBOX_BATCH_SIZE", 200))
+
+
+def outbox_due() -> bool:
+    return TicketOutboxItem.objects.filter(status=TicketOutboxItem.Status.QUEUED, next_attempt_at__lte=timezone.now()).exists()
+
+
+def requeue_stale_outbox() -> int:
+    """Put items left sending by a crashed worker back in the queue."""
+    cutoff = timezone.now() - timedelta(seconds=int(getattr(settings, "TICKET_CLAIM_STALE_SECONDS", 300)))
+    return TicketOutboxItem.objects.filter(status=TicketOutboxItem.Status.SENDING, claimed_at__lt=cutoff).update(
+        status=TicketOutboxItem.Status.QUEUED, claim_token="", claimed_at=None
+    )
+
+
+def claim_outbox(limit: int) -> List[TicketOutboxItem]:
+    """Atomically move up to `limit` due items to sending (safe with several workers)."""
+    token = uuid.uuid4().hex
+    now = timezone.now()
+    candidates = list(
+        TicketOutboxItem.objects.filter(status=TicketOutboxItem.Status.QUEUED, next_attempt_at__lte=now)
+        .order_by("next_attempt_at", "pk")
+        .values_list("pk", flat=True)[:limit]
+    )
+    if not candidates:
+        return []
+    TicketOutboxItem.objects.filter(pk__in=candidates, status=TicketOutboxItem.Status.QUEUED).update(
+        status=TicketOutboxItem.Status.SENDING, claim_token=token, claimed_at=now, attempts=F("attempts") + 1
+    )
+    return list(TicketOutboxItem.objects.filter(status=TicketOutboxItem.Status.SENDING, claim_token=token).order_by("pk"))
+
+
+def _retry_delay(attempts: int) -> float:
+    base = float(getattr(settings, "TICKET_OUTBOX_RETRY_BASE_SECONDS", 30))
+    cap = float(getattr(settings, "TICKET_OUTBOX_RETRY_MAX_SECONDS", 3600))
+    return min(cap, base * 2 ** max(0, attempts - 1)) * random.uniform(0.5, 1.0)
+
+
+def _delivered(item: TicketOutboxItem, data: Dict[str, Any]) -> None:
+    item.status = TicketOutboxItem.Status.DELIVERED
+    item.external_id = str(data.get("key") or data.get("id") or "")
+    item.url = data.get("url") or ""
+    item.last_error = ""
+    item.delivered_at = timezone.now()
+    item.save(update_fields=["status", "external_id", "url", "last_error", "delivered_at", "description", "include_ai"])
+
+
+def _failed(item: TicketOutboxItem, error: str, permanent: bool = False) -> str:
+    """Schedule a retry, or give up once attempts are exhausted. Returns the new status."""
+    item.last_error = error
+    if permanent or item.attempts >= int(getattr(settings, "TICKET_OUTBOX_MAX_ATTEMPTS", 10)):
+        item.status = TicketOutboxItem.Status.FAILED
+    else:
+        item.status = TicketOutboxItem.Status.QUEUED
+        item.next_attempt_at = timezone.now() + timedelta(seconds=_retry_delay(item.attempts))
+    item.claim_token = ""
+    item.save(update_fields=["status", "last_error", "next_attempt_at", "claim_token", "description", "include_ai"])
+    return item.status
+
+
+def _add_ai_suggestions(items: List[TicketOutboxItem]) -> None:
+    """Append AI suggestions to include_ai items, as one cached batch (kept on the item for retries)."""
+    wanted = [item for item in items if item.include_ai]
+    if not wanted:
+        return
+    findings = {
+        (f.assessment_id, f.key): f
+        for f in Finding.objects.filter(assessment_id__in={i.assessment_id for i in wanted}, key__in={i.finding_key for i in wanted})
+    }
+    notes = dict(Assessment.objects.filter(pk__in={i.assessment_id for i in wanted}).values_list("pk", "checklist_notes"))
+    prompts = {}
+    for item in wanted:
+        finding = findings.get((item.assessment_id, item.finding_key))
+        if finding is not None:
+            prompts[(item.assessment_id, item.finding_key)] = SuggestionRequest(
+                title=finding.title,
+                explanation=finding.explanation or "",
+                remediation_steps=tuple(finding.remediation_steps or ()),
+                extra_context=(notes.get(item.assessment_id) or {}).get(item.finding_key, ""),
+                key=finding.key,
+            )
+    ai = dict(zip(prompts, get_ai_suggestions_many(list(prompts.values()))))
+    for item in wanted:
+        item.description = with_ai_suggestions(item.description, (ai.get((item.assessment_id, item.finding_key)) or {}).get("suggestions") or ())
+        item.include_ai = False
+
+
+def _run_chunk(provider: str, config: Dict[str, Any], chunk: List[TicketOutboxItem]) -> List[ItemResult]:
+    """One provider HTTP call for a chunk of same-org, same-provider tickets (a whole-call failure fails every item)."""
+    try:
+        return provider_client(provider, config).create_many(
+            [TicketItem(item.title, item.description, item.assignee_id or None) for item in chunk]
+        )
+    except Exception as e:
+        return [ItemResult.raised(e) for _ in chunk]
+
+
+def deliver_outbox(limit: Optional[int] = None) -> Dict[str, int]:
+    """Claim due outbox items and create their tickets. Returns counts by outcome."""
+    counts = {"delivered": 0, "retrying": 0, "failed": 0}
+    items = claim_outbox(limit or outbox_batch_size())
+    if not items:
+        return counts
+
+    links = {
+        (link.assessment_id, link.finding_key, link.provider): link
+        for link in TicketLink.objects.filter(
+            assessment_id__in={i.assessment_id for i in items}, finding_key__in={i.finding_key for i in items}
+        )
+    }
+    configs = {
+        (i.organization_id, i.provider): i.config or {}
+        for i in OrgIntegration.objects.filter(organization_id__in={i.organization_id for i in items})
+    }
+    groups: Dict[Tuple[int, str], List[TicketOutboxItem]] = {}
+    for item in items:
+        link = links.get((item.assessment_id, item.finding_key, item.provider))
+        if link and not item.replace_existing:
+            _delivered(item, {"id": link.external_id, "url": link.url})
+            counts["delivered"] += 1
+            continue
+        config = configs.get((item.organization_id, item.provider))
+        try:
+            if config is None:
+                raise TicketConfigError(f"{item.provider} is no longer connected")
+            check_config(item.provider, config)
+        except TicketConfigError as e:
+            _failed(item, str(e), permanent=True)
+            counts["failed"] += 1
+            continue
+        groups.setdefault((item.organization_id, item.provider), []).append(item)
+    if not groups:
+        return counts
+
+    _add_ai_suggestions([item for group in groups.values() for item in group])
+    chunks = []
+    for (org_id, provider), group in groups.items():
+        config = configs[(org_id, provider)]
+        size = provider_client(provider, config).max_batch
+        chunks.extend((provider, config, group[i:i + size]) for i in range(0, len(group), size))
+    workers = max(1, min(len(chunks), int(getattr(settings, "TICKET_WORKFLOW_CONCURRENCY", 8))))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ticket-outbox") as pool:
+        futures = {pool.submit(_run_chunk, *chunk): chunk[2] for chunk in chunks}
+        # Written as each call returns, so a crash loses at most the calls in flight.
+        for future in as_completed(futures):
+            for item, result in zip(futures[future], future.result()):
+                if result.ok:
+                    with transaction.atomic():
+                        _delivered(item, result.data)
+                        record_ticket(item.assessment_id, item.finding_key, item.provider, result.data)
+                    counts["delivered"] += 1
+                    continue
+                logger.warning(
+                    "Ticket %s/%s (outbox %s, attempt %d) failed (%s): %s",
+                    item.provider, item.finding_key, item.pk, item.attempts, result.failure, result.error,
+                )
+                error = result.error
+                if result.failure == Failure.UNKNOWN:
+                    error = f"may have been created in {item.provider}; check before sending again: {error}"
+                status = _failed(item, error, permanent=result.failure != Failure.RETRY)
+                counts["retrying" if status == TicketOutboxItem.Status.QUEUED else "failed"] += 1
+    return counts
@@ -0,0 +1,134 @@
+"""
+Versioned scoring rulesets. Each vN.json in this directory is parsed and validated once per process
+into an immutable Ruleset; SCORING_RULESET_VERSION picks the active one (default: the highest version).
+To change weights, add a new file with the next version instead of editing a published one.
+"""
+import json
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Mapping, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+
+RULESET_DIR = Path(__file__).resolve().parent
+
+SEVERITIES = ("low", "medium", "high")
+CATEGORIES = ("identity", "email", "backups", "devices", "training", "data_access", "planning", "payments")
+
+
+class RulesetError(ValueError):
+    pass
+
+
+class FindingDef(NamedTuple):
+    title: str
+    severity: str
+    category: str
+    impact: str
+    time_to_fix_minutes: int
+    estimated_risk_reduction_pct: int
+    explanation: str
+    remediation_steps: Tuple[str, ...]
+
+
+class Ruleset(NamedTuple):
+    version: int
+    description: str
+    penalties: Mapping[str, int]
+    industry_multipliers: Mapping[str, FrozenSet[str]]
+    industry_multiplier_bonus: float
+    downtime_multiplier_keys: FrozenSet[str]
+    downtime_multiplier_bonus: float
+    findings: Mapping[str, FindingDef]
+
+
+def _require(cond: bool, source: str, message: str) -> None:
+    if not cond:
+        raise RulesetError(f"{source}: {message}")
+
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def parse_ruleset(doc: Dict[str, Any], source: str = "<ruleset>") -> Ruleset:
+    """Validate a decoded ruleset document and freeze it."""
+    _require(isinstance(doc, dict), source, "top level must be an object")
+    version = doc.get("version")
+    _require(_is_int(version) and version > 0, source, "version must be a positive integer")
+
+    penalties = doc.get("penalties")
+    _require(isinstance(penalties, dict) and penalties, source, "penalties must be a non-empty object")
+    for key, weight in penalties.items():
+        _require(_is_int(weight) and weight >= 0, source, f"penalty {key!r} must be a non-negative integer")
+
+    industry = doc.get("industry_multipliers", {})
+    _require(isinstance(industry, dict), source, "industry_multipliers must be an object")
+    for business_type, keys in industry.items():
+        _require(isinstance(keys, list), source, f"industry_multipliers[{business_type!r}] must be a list")
+        unknown = set(keys) - set(penalties)
+        _require(not unknown, source, f"industry_multipliers[{business_type!r}] has unknown keys {sorted(unknown)}")
+    downtime = doc.get("downtime_multiplier_keys", [])
+    _require(isinstance(downtime, list) and set(downtime) <= set(penalties), source, "downtime_multiplier_keys must list penalty keys")
+    bonuses = {}
+    for name in ("industry_multiplier_bonus", "downtime_multiplier_bonus"):
+        value = doc.get(name, 0.3)
+        _require(isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0, source, f"{name} must be a non-negative number")
+        bonuses[name] = float(value)
+
+    findings = doc.get("findings")
+    _require(isinstance(findings, dict), source, "findings must be an object")
+    parsed_findings = {}
+    for key, spec in findings.items():
+        where = f"findings[{key!r}]"
+        _require(isinstance(spec, dict), source, f"{where} must be an object")
+        missing = [name for name in FindingDef._fields if name not in spec]
+        _require(not missing, source, f"{where} is missing {missing}")
+        _require(spec["severity"] in SEVERITIES, source, f"{where}.severity must be one of {SEVERITIES}")
+        _require(spec["category"] in CATEGORIES, source, f"{where}.category must be one of {CATEGORIES}")
+        for name in ("time_to_fix_minutes", "estimated_risk_reduction_pct"):
+            _require(_is_int(spec[name]) and spec[name] >= 0, source, f"{where}.{name} must be a non-negative integer")
+        _require(
+            isinstance(spec["remediation_steps"], list) and all(isinstance(s, str) for s in spec["remediation_steps"]),
+            source, f"{where}.remediation_steps must be a list of strings",
+        )
+        parsed_findings[key] = FindingDef(**{**{name: spec[name] for name in FindingDef._fields}, "remediation_steps": tuple(spec["remediation_steps"])})
+
+    return Ruleset(
+        version=version,
+        description=str(doc.get("description", "")),
+        penalties=MappingProxyType(dict(penalties)),
+        industry_multipliers=MappingProxyType({bt: frozenset(keys) for bt, keys in industry.items()}),
+        downtime_multiplier_keys=frozenset(downtime),
+        findings=MappingProxyType(parsed_findings),
+        **bonuses,
+    )
+
+
+def load_rulesets(directory: Path = RULESET_DIR) -> Mapping[int, Ruleset]:
+    rulesets = {}
+    for path in sorted(directory.glob("v*.json")):
+        try:
+            doc = json.loads(path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError as e:
+            raise RulesetError(f"{path.name}: invalid JSON: {e}") from e
+        ruleset = parse_ruleset(doc, source=path.name)
+        _require(path.stem == f"v{ruleset.version}", path.name, f"file name does not match version {ruleset.version}")
+        rulesets[ruleset.version] = ruleset
+    if not rulesets:
+        raise RulesetError(f"no rulesets found in {directory}")
+    return MappingProxyType(rulesets)
+
+
+# Parsed once per process, on first import (core.apps imports this at startup so a bad file fails fast).
+RULESETS: Mapping[int, Ruleset] = load_rulesets()
+
+
+def get_ruleset(version: Optional[int] = None) -> Ruleset:
+    """The given version, or the active one (SCORING_RULESET_VERSION, else the latest)."""
+    if version is None:
+        version = getattr(settings, "SCORING_RULESET_VERSION", None) or max(RULESETS)
+    try:
+        return RULESETS[int(version)]
+    except KeyError:
+        raise RulesetError(f"unknown ruleset version {version}; available: {sorted(RULESETS)}") from None
@@ -1,3 +1,4 @@
+from .dns_scan import resolver_cache
 from .scanner import run_scan
 
-__all__ = ["run_scan"]
+__all__ = ["resolver_cache", "run_scan"]
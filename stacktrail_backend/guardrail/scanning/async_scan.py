@@ -0,0 +1,173 @@
+"""asyncio version of scanner.run_probes() for async views and arun_sweep: DNS via dns.asyncresolver, the
+HTTP->HTTPS redirect walk via httpx.AsyncClient, TLS handshakes on a small thread pool (pyOpenSSL has no
+asyncio API). Planning, carry-forward, fingerprints and recheck times are shared with scanner.py, so both
+paths store identical ScanRuns."""
+import asyncio
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Any, Awaitable, Callable, Dict, Optional
+from urllib.parse import urljoin
+
+from django.conf import settings
+
+from core.models import ScanRun
+from .dns_scan import HAS_DNS, TXT_CHECKS, AsyncRecordSets, analyze_dkim, analyze_mx, analyze_txt
+from .http import POOL_HOSTS, POOL_PER_HOST
+from .scanner import ProbeCallback, ProbeRun, plan_probes, scan_deadline, settle_probes, timed_out
+from .tls_probe import TLSProbeError, TLSProbeResult, probe_tls
+from .tls_scan import _http_redirects_to_https
+from .web_headers import analyze_headers
+
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+
+_tls_pool: Optional[ThreadPoolExecutor] = None
+
+# httpx pools connections on the event loop that created them, so clients are kept per loop.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+
+
+def tls_pool() -> ThreadPoolExecutor:
+    global _tls_pool
+    if _tls_pool is None:
+        _tls_pool = ThreadPoolExecutor(max_workers=int(getattr(settings, "SCAN_TLS_THREADS", 32)), thread_name_prefix="scan-tls")
+    return _tls_pool
+
+
+def http_client() -> "httpx.AsyncClient":
+    loop = asyncio.get_running_loop()
+    if loop not in _clients:
+        _clients[loop] = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=POOL_HOSTS * POOL_PER_HOST, max_keepalive_connections=POOL_HOSTS),
+            # Scans must not influence each other through cookies set by a previous response.
+            cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+        )
+    return _clients[loop]
+
+
+async def redirects_to_https(domain: str, timeout: float = 5.0, max_hops: int = 10) -> bool:
+    """tls_scan._http_redirects_to_https() without holding a thread."""
+    if not HAS_HTTPX:
+        return await asyncio.to_thread(_http_redirects_to_https, domain, timeout, max_hops)
+    url = f"http://{domain}"
+    for _ in range(max_hops):
+        r = await http_client().get(url, timeout=timeout, follow_redirects=False)
+        location = r.headers.get("location")
+        if not r.is_redirect or not location:
+            return False
+        url = urljoin(url, location)
+        if url.startswith("https://"):
+            return True
+    return False
+
+
+class AsyncScanContext:
+    """ScanContext for one async scan: DNS record sets and the TLS handshake are fetched once and shared."""
+
+    def __init__(self, previous: Optional[Dict[str, Dict[str, Any]]] = None, etag: Optional[str] = None):
+        self.dns = AsyncRecordSets()
+        self._tls: Dict[str, "asyncio.Future[TLSProbeResult]"] = {}
+        self.previous = previous or {}
+        self.etag = etag
+
+    async def tls(self, domain: str) -> TLSProbeResult:
+        if domain not in self._tls:
+            self._tls[domain] = asyncio.get_running_loop().run_in_executor(tls_pool(), lambda: probe_tls(domain, etag=self.etag))
+        return await asyncio.shield(self._tls[domain])
+
+    async def https(self, domain: str):
+        result = await self.tls(domain)
+        if result.response is None:
+            raise TLSProbeError(result.response_error)
+        return result.response
+
+
+AsyncProbe = Callable[[str, AsyncScanContext], Awaitable[Dict[str, Any]]]
+
+
+def _dns_probe(name: Callable[[str], str], rtype: str, analyze: Callable[[Any], Dict[str, Any]], empty: Dict[str, Any]) -> AsyncProbe:
+    async def run(domain: str, ctx: AsyncScanContext) -> Dict[str, Any]:
+        if not HAS_DNS:
+            return {**empty, "error": "dnspython not installed"}
+        return analyze(await ctx.dns.get(name(domain), rtype))
+    return run
+
+
+def _txt_probe(check: str) -> AsyncProbe:
+    to_name, prefix = TXT_CHECKS[check]
+    return _dns_probe(to_name, "TXT", lambda answer: analyze_txt(answer, prefix), {"present": False, "records": []})
+
+
+async def _run_cert(domain: str, ctx: AsyncScanContext) -> Dict[str, Any]:
+    return (await ctx.tls(domain)).cert
+
+
+async def _run_redirect(domain: str, ctx: AsyncScanContext) -> Dict[str, Any]:
+    out = {"https_ok": False, "redirects_to_https": False, "error": None}
+    try:
+        out["https_ok"] = (await ctx.https(domain)).url.startswith("https://")
+        out["redirects_to_https"] = await redirects_to_https(domain)
+    except Exception as e:
+        out["error"] = str(e)
+    return out
+
+
+async def _run_headers(domain: str, ctx: AsyncScanContext) -> Dict[str, Any]:
+    try:
+        r = await ctx.https(domain)
+    except Exception as e:
+        return {"hsts": False, "x_content_type_options": False, "headers": {}, "error": str(e)}
+    if r.status_code == 304 and "headers" in ctx.previous:
+        return ctx.previous["headers"]
+    return analyze_headers(r)
+
+
+# Same names and results as scanner.PROBES (whose recheck_after rules are reused).
+ASYNC_PROBES: Dict[str, AsyncProbe] = {
+    "mx": _dns_probe(lambda domain: domain, "MX", analyze_mx, {"present": False, "hosts": []}),
+    "spf": _txt_probe("spf"),
+    "dmarc": _txt_probe("dmarc"),
+    "dkim_heuristic": _dns_probe(
+        lambda domain: f"default._domainkey.{domain}", "TXT",
+        lambda answer: analyze_dkim(answer, "default"), {"present": False, "selector": "default"},
+    ),
+    "cert": _run_cert,
+    "redirect": _run_redirect,
+    "headers": _run_headers,
+}
+
+
+async def arun_probes(
+    domain: str,
+    deadline: Optional[float] = None,
+    previous_scan: Optional[ScanRun] = None,
+    on_result: Optional[ProbeCallback] = None,
+) -> ProbeRun:
+    """run_probes() on the event loop: same deadline, partial results and incremental carry-forward."""
+    deadline = scan_deadline() if deadline is None else deadline
+    plan = plan_probes(previous_scan, on_result)
+    ctx = AsyncScanContext(previous=plan.previous, etag=plan.etag)
+    tasks = {asyncio.ensure_future(ASYNC_PROBES[name](domain, ctx)): name for name in plan.due}
+    loop = asyncio.get_running_loop()
+    stop = loop.time() + deadline
+    pending = set(tasks)
+    while pending and loop.time() < stop:
+        done, pending = await asyncio.wait(pending, timeout=stop - loop.time(), return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            name = tasks[task]
+            try:
+                plan.results[name] = task.result()
+            except Exception as e:
+                plan.results[name] = {"error": str(e)}
+            if on_result:
+                on_result(name, plan.results[name])
+    for task in pending:
+        task.cancel()
+        plan.results[tasks[task]] = timed_out(deadline)
+        if on_result:
+            on_result(tasks[task], plan.results[tasks[task]])
+    return settle_probes(domain, ctx, plan)
@@ -0,0 +1,224 @@
+"""Fleet-wide batch scanning: bounded global concurrency, per-host politeness, chunked bulk_create, resumable.
+arun_sweep() is the asyncio version (async_scan.arun_probes), for hundreds of scans in flight on one thread."""
+import asyncio
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, OuterRef, QuerySet, Subquery
+from django.utils import timezone
+
+from core.caching import bump_org_versions
+from core.models import Organization, ScanRun, ScanSweep
+from core.posture import record_scans
+from .async_scan import arun_probes
+from .scanner import build_scan_run, org_domain, run_probes
+
+DEFAULT_CONCURRENCY = 16
+DEFAULT_ASYNC_CONCURRENCY = 100
+DEFAULT_PER_HOST = 2
+DEFAULT_CHUNK_SIZE = 200
+
+
+class SweepLostError(RuntimeError):
+    """The sweep was taken over by another run (requeued after a stale heartbeat, or resumed); this run stops."""
+
+
+class HostLimiter:
+    """At most `per_host` scans in flight against the same domain (demo orgs all share example.com)."""
+
+    def __init__(self, per_host: int = DEFAULT_PER_HOST):
+        self._lock = threading.Lock()
+        self._sems = defaultdict(lambda: threading.BoundedSemaphore(max(1, per_host)))
+
+    def semaphore(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            return self._sems[host.lower()]
+
+
+class AsyncHostLimiter:
+    """HostLimiter for arun_sweep (asyncio semaphores, one event loop)."""
+
+    def __init__(self, per_host: int = DEFAULT_PER_HOST):
+        self._sems = defaultdict(lambda: asyncio.Semaphore(max(1, per_host)))
+
+    def semaphore(self, host: str) -> asyncio.Semaphore:
+        return self._sems[host.lower()]
+
+
+def _scan_one(org: Organization, limiter: HostLimiter, previous: Optional[ScanRun]) -> ScanRun:
+    domain = org_domain(org)
+    with limiter.semaphore(domain):
+        return build_scan_run(org, run_probes(domain, previous_scan=previous))
+
+
+def latest_scans(orgs: List[Organization]) -> Dict[int, ScanRun]:
+    """Most recent ScanRun per org (same order as scanner.latest_scan), in two queries for the whole chunk."""
+    latest = ScanRun.objects.filter(organization=OuterRef("pk")).order_by(*ScanRun.LATEST_FIRST).values("pk")[:1]
+    ids = (
+        Organization.objects.filter(pk__in=[org.pk for org in orgs])
+        .annotate(latest_id=Subquery(latest))
+        .values_list("latest_id", flat=True)
+    )
+    return {scan.organization_id: scan for scan in ScanRun.objects.filter(pk__in=list(ids)).select_related(*ScanRun.SECTIONS.values())}
+
+
+def scan_organizations(
+    orgs: List[Organization],
+    pool: ThreadPoolExecutor,
+    limiter: HostLimiter,
+    incremental: bool = False,
+) -> List[ScanRun]:
+    """Scan orgs on `pool` (its size is the global concurrency cap). Returns unsaved ScanRuns in input order."""
+    previous = latest_scans(orgs) if incremental else {}
+    return list(pool.map(lambda org: _scan_one(org, limiter, previous.get(org.pk)), orgs))
+
+
+async def ascan_organizations(
+    orgs: List[Organization],
+    limit: asyncio.Semaphore,
+    limiter: AsyncHostLimiter,
+    incremental: bool = False,
+) -> List[ScanRun]:
+    """scan_organizations() on the event loop; `limit` is the global concurrency cap."""
+    previous = await sync_to_async(latest_scans)(orgs) if incremental else {}
+
+    async def scan_one(org: Organization) -> ScanRun:
+        domain = org_domain(org)
+        # Host first, so scans queued behind a busy host don't hold global slots.
+        async with limiter.semaphore(domain), limit:
+            return build_scan_run(org, await arun_probes(domain, previous_scan=previous.get(org.pk)))
+
+    return list(await asyncio.gather(*(scan_one(org) for org in orgs)))
+
+
+def sweep_queryset(filters: Dict[str, Any]) -> QuerySet:
+    qs = Organization.objects.all()
+    if filters.get("owner_id"):
+        qs = qs.filter(owner_id=filters["owner_id"])
+    if filters.get("org_ids"):
+        qs = qs.filter(pk__in=filters["org_ids"])
+    if filters.get("business_type"):
+        qs = qs.filter(business_type=filters["business_type"])
+    if filters.get("domain"):
+        qs = qs.filter(primary_domain__iexact=filters["domain"])
+    return qs.order_by("pk")
+
+
+def run_sweep(
+    sweep: ScanSweep,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    per_host: int = DEFAULT_PER_HOST,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    on_chunk: Optional[Callable[[ScanSweep], None]] = None,
+) -> ScanSweep:
+    """Scan every org matching sweep.filters with pk > sweep.last_org_id.
+    Each chunk's ScanRuns and the checkpoint are committed together, so a crashed sweep resumes where it stopped."""
+    qs = _start(sweep)
+    limiter = HostLimiter(per_host)
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="scan-sweep") as pool:
+            while True:
+                chunk = list(qs.filter(pk__gt=sweep.last_org_id)[:chunk_size])
+                if not chunk:
+                    break
+                _commit_chunk(sweep, chunk, scan_organizations(chunk, pool, limiter, incremental=sweep.incremental), chunk_size)
+                if on_chunk:
+                    on_chunk(sweep)
+    except Exception as e:
+        _fail(sweep, e)
+        raise
+    _complete(sweep)
+    return sweep
+
+
+async def arun_sweep(
+    sweep: ScanSweep,
+    concurrency: int = DEFAULT_ASYNC_CONCURRENCY,
+    per_host: int = DEFAULT_PER_HOST,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    on_chunk: Optional[Callable[[ScanSweep], None]] = None,
+) -> ScanSweep:
+    """run_sweep() on the event loop; the database work of each chunk runs through sync_to_async.
+    A sweep claimed by run_worker (heartbeat_at set) also refreshes its heartbeat on a timer while chunks run."""
+    qs = await sync_to_async(_start)(sweep)
+    limit = asyncio.Semaphore(max(1, concurrency))
+    limiter = AsyncHostLimiter(per_host)
+    beating = asyncio.ensure_future(_heartbeat(sweep)) if sweep.heartbeat_at else None
+    try:
+        while True:
+            chunk = [org async for org in qs.filter(pk__gt=sweep.last_org_id)[:chunk_size]]
+            if not chunk:
+                break
+            scans = await ascan_organizations(chunk, limit, limiter, incremental=sweep.incremental)
+            await sync_to_async(_commit_chunk)(sweep, chunk, scans, chunk_size)
+            if on_chunk:
+                on_chunk(sweep)
+    except Exception as e:
+        await sync_to_async(_fail)(sweep, e)
+        raise
+    finally:
+        if beating:
+            beating.cancel()
+    await sync_to_async(_complete)(sweep)
+    return sweep
+
+
+def heartbeat_interval() -> float:
+    """A few beats per SCAN_JOB_STALE_SECONDS, so a slow chunk is never mistaken for a dead worker."""
+    return max(1.0, int(getattr(settings, "SCAN_JOB_STALE_SECONDS", 300)) / 4)
+
+
+async def _heartbeat(sweep: ScanSweep) -> None:
+    while True:
+        await asyncio.sleep(heartbeat_interval())
+        if not await sync_to_async(_owned(sweep).update)(heartbeat_at=timezone.now()):
+            return
+
+
+def _owned(sweep: ScanSweep) -> QuerySet:
+    """The sweep's row, if this run still owns it."""
+    return ScanSweep.objects.filter(pk=sweep.pk, status=ScanSweep.Status.RUNNING, claim_token=sweep.claim_token)
+
+
+def _start(sweep: ScanSweep) -> QuerySet:
+    qs = sweep_queryset(sweep.filters or {})
+    if not sweep.total_orgs:
+        sweep.total_orgs = qs.count()
+        _owned(sweep).update(total_orgs=sweep.total_orgs)
+    return qs
+
+
+def _commit_chunk(sweep: ScanSweep, chunk: List[Organization], scans: List[ScanRun], chunk_size: int) -> None:
+    """A chunk's ScanRuns and the checkpoint are committed together, and only while this run owns the sweep."""
+    with transaction.atomic():
+        checkpoint = {"last_org_id": chunk[-1].pk, "scanned_count": F("scanned_count") + len(scans)}
+        if sweep.heartbeat_at:
+            checkpoint["heartbeat_at"] = sweep.heartbeat_at = timezone.now()
+        if not _owned(sweep).update(**checkpoint):
+            raise SweepLostError(f"Sweep {sweep.pk} was taken over by another run")
+        ScanRun.attach_sections(scans)
+        ScanRun.objects.bulk_create(scans, batch_size=chunk_size)
+        record_scans(scans)
+        bump_org_versions(scan.organization_id for scan in scans)
+    sweep.last_org_id = chunk[-1].pk
+    sweep.scanned_count += len(scans)
+
+
+def _fail(sweep: ScanSweep, e: Exception) -> None:
+    """Mark the sweep failed, unless another run owns it by now."""
+    if _owned(sweep).update(status=ScanSweep.Status.FAILED, error=str(e)):
+        sweep.status = ScanSweep.Status.FAILED
+        sweep.error = str(e)
+
+
+def _complete(sweep: ScanSweep) -> None:
+    finished_at = timezone.now()
+    if not _owned(sweep).update(status=ScanSweep.Status.COMPLETED, finished_at=finished_at):
+        raise SweepLostError(f"Sweep {sweep.pk} was taken over by another run")
+    sweep.status = ScanSweep.Status.COMPLETED
+    sweep.finished_at = finished_at
@@ -0,0 +1,70 @@
+"""Process-wide DNS answer cache: honors record TTLs, LRU-bounded, caches negative answers, counts hits."""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+
+class CachedAnswer(NamedTuple):
+    """Parsed records for one (name, rtype), or the error string of a negative answer."""
+    records: Tuple[str, ...]
+    error: Optional[str] = None
+    # Seconds the answer remains valid (remaining TTL when served from the cache).
+    ttl: int = 0
+
+
+class DNSCache:
+    def __init__(self, max_entries: int = 10_000, negative_ttl: int = 300):
+        self.max_entries = max(1, max_entries)
+        self.negative_ttl = negative_ttl
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, CachedAnswer]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(name: str, rtype: str) -> Tuple[str, str]:
+        return name.lower().rstrip("."), rtype.upper()
+
+    def get(self, name: str, rtype: str) -> Optional[CachedAnswer]:
+        key = self._key(name, rtype)
+        with self._lock:
+            entry = self._entries.get(key)
+            now = time.monotonic()
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]._replace(ttl=int(entry[0] - now))
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, name: str, rtype: str, answer: CachedAnswer) -> None:
+        ttl = answer.ttl
+        if ttl <= 0:
+            return
+        key = self._key(name, rtype)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, answer)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
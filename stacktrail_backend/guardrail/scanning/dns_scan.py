@@ -1,72 +1,189 @@
-"""DNS and email auth: MX, SPF, DMARC, optional DKIM heuristic."""
-from typing import Any, Dict
+"""DNS and email auth: MX, SPF, DMARC, optional DKIM heuristic.
+alookup() / AsyncRecordSets are the asyncio versions (dns.asyncresolver) used by async_scan."""
+import asyncio
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+
+from .dns_cache import CachedAnswer, DNSCache
+from .shared import OnceMap
 
 try:
+    import dns.asyncresolver
     import dns.resolver
     import dns.exception
     HAS_DNS = True
 except ImportError:
     HAS_DNS = False
 
+# Shared by every scan in this process (demo and fleet orgs often share an apex domain).
+resolver_cache = DNSCache(
+    max_entries=getattr(settings, "DNS_CACHE_MAX_ENTRIES", 10_000),
+    negative_ttl=getattr(settings, "DNS_CACHE_NEGATIVE_TTL", 300),
+)
+
+
+def _parse(rdata, rtype: str) -> str:
+    if rtype == "MX":
+        return str(rdata.exchange).rstrip(".")
+    if rtype == "TXT":
+        return "".join(chunk.decode() if isinstance(chunk, bytes) else str(chunk) for chunk in rdata.strings)
+    return rdata.to_text()
+
+
+def _answered(name: str, rtype: str, answers) -> CachedAnswer:
+    ttl = answers.rrset.ttl if answers.rrset is not None else 0
+    answer = CachedAnswer(records=tuple(_parse(r, rtype) for r in answers), ttl=ttl)
+    resolver_cache.put(name, rtype, answer)
+    return answer
+
+
+def _failed(name: str, rtype: str, e: "dns.exception.DNSException") -> CachedAnswer:
+    if isinstance(e, (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer)):
+        answer = CachedAnswer(records=(), error=str(e), ttl=resolver_cache.negative_ttl)
+        resolver_cache.put(name, rtype, answer)
+        return answer
+    return CachedAnswer(records=(), error=str(e))
+
+
+def lookup(name: str, rtype: str) -> CachedAnswer:
+    """Resolve through resolver_cache. Positive answers live for their record TTL;
+    NXDOMAIN/NoAnswer live for DNS_CACHE_NEGATIVE_TTL. Timeouts and server failures are not cached."""
+    cached = resolver_cache.get(name, rtype)
+    if cached is not None:
+        return cached
+    try:
+        return _answered(name, rtype, dns.resolver.resolve(name, rtype))
+    except dns.exception.DNSException as e:
+        return _failed(name, rtype, e)
+
+
+async def alookup(name: str, rtype: str) -> CachedAnswer:
+    """lookup() on dns.asyncresolver; shares resolver_cache with the sync path."""
+    cached = resolver_cache.get(name, rtype)
+    if cached is not None:
+        return cached
+    try:
+        return _answered(name, rtype, await dns.asyncresolver.resolve(name, rtype))
+    except dns.exception.DNSException as e:
+        return _failed(name, rtype, e)
+
+
+class RecordSets:
+    """Per-scan fetch layer: each (name, rtype) is fetched at most once per scan and its parsed
+    records are shared by every analyzer, even when probes run concurrently."""
+
+    def __init__(self):
+        self._fetches = OnceMap()
+
+    @staticmethod
+    def _key(name: str, rtype: str) -> Tuple[str, str]:
+        return name.lower().rstrip("."), rtype.upper()
+
+    def get(self, name: str, rtype: str) -> CachedAnswer:
+        return self._fetches.get(self._key(name, rtype), lambda: lookup(name, rtype))
+
+    def ttl(self, name: str, rtype: str) -> int:
+        """TTL of an answer already fetched in this scan (0 if not fetched or not cacheable)."""
+        answer = self._fetches.peek(self._key(name, rtype))
+        return answer.ttl if answer is not None else 0
+
+
+class AsyncRecordSets:
+    """RecordSets for one async scan: concurrent probes asking for the same (name, rtype) await one query."""
+
+    def __init__(self):
+        self._fetches: Dict[Tuple[str, str], "asyncio.Task[CachedAnswer]"] = {}
+
+    async def get(self, name: str, rtype: str) -> CachedAnswer:
+        key = RecordSets._key(name, rtype)
+        if key not in self._fetches:
+            self._fetches[key] = asyncio.ensure_future(alookup(name, rtype))
+        # shield: one probe being cancelled must not cancel the query other probes are waiting on.
+        return await asyncio.shield(self._fetches[key])
+
+    def ttl(self, name: str, rtype: str) -> int:
+        task = self._fetches.get(RecordSets._key(name, rtype))
+        if task is None or not task.done() or task.cancelled() or task.exception() is not None:
+            return 0
+        return task.result().ttl
 
-def check_mx(domain: str) -> Dict[str, Any]:
+
+# Analyzers: turn fetched records into a check result, no I/O.
+
+def analyze_mx(answer: CachedAnswer) -> Dict[str, Any]:
+    out = {"present": False, "hosts": [], "error": None}
+    if answer.error:
+        out["error"] = answer.error
+    else:
+        out["present"] = True
+        out["hosts"] = list(answer.records)
+    return out
+
+
+def analyze_txt(answer: CachedAnswer, prefix: str) -> Dict[str, Any]:
+    out = {"present": False, "records": [], "error": answer.error}
+    for s in answer.records:
+        if s.strip().startswith(prefix):
+            out["present"] = True
+            out["records"].append(s[:500])
+    return out
+
+
+def analyze_dkim(answer: CachedAnswer, selector: str) -> Dict[str, Any]:
+    return {"present": bool(answer.records), "selector": selector, "error": None}
+
+
+# TXT-based checks: (name for the domain, record prefix). Checks on the same name share one fetch,
+# so adding e.g. ("google-site-verification", lambda d: d, "google-site-verification=") costs no extra query.
+TXT_CHECKS: Dict[str, Tuple[Callable[[str], str], str]] = {
+    "spf": (lambda domain: domain, "v=spf1"),
+    "dmarc": (lambda domain: f"_dmarc.{domain}", "v=DMARC1"),
+}
+
+
+def check_mx(domain: str, records: Optional[RecordSets] = None) -> Dict[str, Any]:
     out = {"present": False, "hosts": [], "error": None}
     if not HAS_DNS:
         out["error"] = "dnspython not installed"
         return out
-    try:
-        answers = dns.resolver.resolve(domain, "MX")
-        out["present"] = True
-        out["hosts"] = [str(r.exchange).rstrip(".") for r in answers]
-    except dns.exception.DNSException as e:
-        out["error"] = str(e)
-    return out
+    return analyze_mx((records or RecordSets()).get(domain, "MX"))
 
 
-def check_txt(domain: str, prefix: str) -> Dict[str, Any]:
+def check_txt(domain: str, prefix: str, records: Optional[RecordSets] = None) -> Dict[str, Any]:
     out = {"present": False, "records": [], "error": None}
     if not HAS_DNS:
         out["error"] = "dnspython not installed"
         return out
-    try:
-        answers = dns.resolver.resolve(domain, "TXT")
-        for r in answers:
-            s = "".join(chunk.decode() if isinstance(chunk, bytes) else str(chunk) for chunk in r.strings)
-            if s.strip().startswith(prefix):
-                out["present"] = True
-                out["records"].append(s[:500])
-    except dns.exception.DNSException as e:
-        out["error"] = str(e)
-    return out
+    return analyze_txt((records or RecordSets()).get(domain, "TXT"), prefix)
+
+
+def run_txt_check(name: str, domain: str, records: Optional[RecordSets] = None) -> Dict[str, Any]:
+    to_name, prefix = TXT_CHECKS[name]
+    return check_txt(to_name(domain), prefix, records)
 
 
-def check_spf(domain: str) -> Dict[str, Any]:
-    return check_txt(domain, "v=spf1")
+def check_spf(domain: str, records: Optional[RecordSets] = None) -> Dict[str, Any]:
+    return run_txt_check("spf", domain, records)
 
 
-def check_dmarc(domain: str) -> Dict[str, Any]:
-    return check_txt(f"_dmarc.{domain}", "v=DMARC1")
+def check_dmarc(domain: str, records: Optional[RecordSets] = None) -> Dict[str, Any]:
+    return run_txt_check("dmarc", domain, records)
 
 
-def check_dkim_heuristic(domain: str, selector: str = "default") -> Dict[str, Any]:
-    sub = f"{selector}._domainkey.{domain}"
+def check_dkim_heuristic(domain: str, selector: str = "default", records: Optional[RecordSets] = None) -> Dict[str, Any]:
     out = {"present": False, "selector": selector, "error": None}
     if not HAS_DNS:
         out["error"] = "dnspython not installed"
         return out
-    try:
-        answers = dns.resolver.resolve(sub, "TXT")
-        if answers:
-            out["present"] = True
-    except dns.exception.DNSException:
-        pass
-    return out
+    return analyze_dkim((records or RecordSets()).get(f"{selector}._domainkey.{domain}", "TXT"), selector)
 
 
-def run_dns_scan(domain: str) -> Dict[str, Any]:
+def run_dns_scan(domain: str, records: Optional[RecordSets] = None) -> Dict[str, Any]:
+    records = records or RecordSets()
     return {
-        "mx": check_mx(domain),
-        "spf": check_spf(domain),
-        "dmarc": check_dmarc(domain),
-        "dkim_heuristic": check_dkim_heuristic(domain),
+        "mx": check_mx(domain, records),
+        "spf": check_spf(domain, records),
+        "dmarc": check_dmarc(domain, records),
+        "dkim_heuristic": check_dkim_heuristic(domain, records=records),
     }
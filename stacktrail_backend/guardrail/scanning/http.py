@@ -0,0 +1,31 @@
+"""Shared, connection-pooled HTTP session for scanning probes (keep-alive across probes and scans)."""
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+POOL_HOSTS = 100
+POOL_PER_HOST = 10
+
+_session = None
+_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    global _session
+    with _lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_PER_HOST)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            # Scans must not influence each other through cookies set by a previous response.
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            _session = session
+        return _session
+
+
+def fetch(url: str, timeout: float = 5.0, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+    return get_session().get(url, timeout=timeout, allow_redirects=True, headers=headers)
@@ -1,16 +1,252 @@
-"""Run DNS + TLS + headers; create ScanRun."""
+"""Run DNS + TLS + headers probes concurrently; create ScanRun.
+Incremental scans re-run only the probes whose previous result is due (record TTL, cert validity,
+HTTP recheck interval) and carry the rest forward from the previous ScanRun."""
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout, as_completed
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.caching import bump_org_versions
 from core.models import Organization, ScanRun
-from .dns_scan import run_dns_scan
-from .tls_scan import run_tls_scan
+from core.posture import record_scans
+from .dns_scan import TXT_CHECKS, RecordSets, check_dkim_heuristic, check_dmarc, check_mx, check_spf
+from .shared import OnceMap
+from .tls_probe import TLSProbeError, TLSProbeResult, probe_tls
+from .tls_scan import check_https_redirect
 from .web_headers import run_headers_scan
 
+MIN_RECHECK_SECONDS = 300
+MAX_RECHECK_SECONDS = 24 * 3600
+CERT_RECHECK_SECONDS = 7 * 24 * 3600
+CERT_RENEWAL_WINDOW_DAYS = 30
+HTTP_RECHECK_SECONDS = 24 * 3600
+
+
+class ScanContext:
+    """State shared by the probes of one scan (e.g. DNS record sets fetched once, used by several checks)."""
+
+    def __init__(self, previous: Optional[Dict[str, Dict[str, Any]]] = None, etag: Optional[str] = None):
+        self.dns = RecordSets()
+        self._tls = OnceMap()
+        # Previous scan's probe results (incremental scans only).
+        self.previous = previous or {}
+        self.etag = etag
+
+    def tls(self, domain: str) -> TLSProbeResult:
+        """One handshake per scan: certificate details and the HTTPS response come from the same connection."""
+        return self._tls.get(domain, lambda: probe_tls(domain, etag=self.etag))
+
+    def https(self, domain: str):
+        """The https://domain response, shared by the redirect check and the header capture."""
+        def get():
+            result = self.tls(domain)
+            if result.response is None:
+                raise TLSProbeError(result.response_error)
+            return result.response
+        return get
+
+
+class Probe(NamedTuple):
+    run: Callable[[str, ScanContext], Dict[str, Any]]
+    # Seconds until the result is worth checking again; 0 means always re-run.
+    recheck_after: Callable[[str, ScanContext, Dict[str, Any]], int]
+
+
+def _dns_probe(check: Callable[[str, RecordSets], Dict[str, Any]], record: Callable[[str], Tuple[str, str]]) -> Probe:
+    def recheck_after(domain: str, ctx: ScanContext, result: Dict[str, Any]) -> int:
+        ttl = ctx.dns.ttl(*record(domain))
+        return max(MIN_RECHECK_SECONDS, min(MAX_RECHECK_SECONDS, ttl)) if ttl else 0
+
+    return Probe(run=lambda domain, ctx: check(domain, ctx.dns), recheck_after=recheck_after)
+
+
+def _cert_recheck_after(domain: str, ctx: ScanContext, result: Dict[str, Any]) -> int:
+    days = result.get("days_until_expiry")
+    if not result.get("valid") or days is None:
+        return 0
+    if days <= CERT_RENEWAL_WINDOW_DAYS:
+        return MAX_RECHECK_SECONDS
+    return min(CERT_RECHECK_SECONDS, (days - CERT_RENEWAL_WINDOW_DAYS) * 24 * 3600)
+
+
+def _http_recheck_after(domain: str, ctx: ScanContext, result: Dict[str, Any]) -> int:
+    return 0 if result.get("error") else HTTP_RECHECK_SECONDS
+
+
+def _run_headers(domain: str, ctx: ScanContext) -> Dict[str, Any]:
+    try:
+        not_modified = ctx.https(domain)().status_code == 304
+    except Exception:
+        not_modified = False
+    if not_modified and "headers" in ctx.previous:
+        return ctx.previous["headers"]
+    return run_headers_scan(domain, https=ctx.https(domain))
+
+
+# Every probe is independent, so a scan costs roughly the slowest one instead of the sum.
+PROBES: Dict[str, Probe] = {
+    "mx": _dns_probe(check_mx, lambda domain: (domain, "MX")),
+    "spf": _dns_probe(check_spf, lambda domain: (TXT_CHECKS["spf"][0](domain), "TXT")),
+    "dmarc": _dns_probe(check_dmarc, lambda domain: (TXT_CHECKS["dmarc"][0](domain), "TXT")),
+    "dkim_heuristic": _dns_probe(
+        lambda domain, records: check_dkim_heuristic(domain, records=records),
+        lambda domain: (f"default._domainkey.{domain}", "TXT"),
+    ),
+    "cert": Probe(run=lambda domain, ctx: ctx.tls(domain).cert, recheck_after=_cert_recheck_after),
+    "redirect": Probe(
+        run=lambda domain, ctx: check_https_redirect(domain, https=ctx.https(domain)),
+        recheck_after=_http_recheck_after,
+    ),
+    "headers": Probe(run=_run_headers, recheck_after=_http_recheck_after),
+}
+
+# Where each probe's result lives on ScanRun: (field, key within the field or None for the whole field).
+PROBE_FIELDS: Dict[str, Tuple[str, Optional[str]]] = {
+    "mx": ("dns_results", "mx"),
+    "spf": ("dns_results", "spf"),
+    "dmarc": ("dns_results", "dmarc"),
+    "dkim_heuristic": ("dns_results", "dkim_heuristic"),
+    "cert": ("tls_results", "cert"),
+    "redirect": ("tls_results", "redirect"),
+    "headers": ("website_headers", None),
+}
+
+
+class ProbeRun(NamedTuple):
+    results: Dict[str, Dict[str, Any]]
+    # Per-probe fingerprint and due time, stored on ScanRun.probe_state for the next incremental scan.
+    state: Dict[str, Dict[str, Any]]
+
+
+def fingerprint(name: str, result: Dict[str, Any]) -> str:
+    if name == "cert" and result.get("serial"):
+        return f"serial:{result['serial']}:{result.get('expires')}"
+    if name == "headers" and (result.get("headers") or {}).get("etag"):
+        return f"etag:{result['headers']['etag']}"
+    return "sha256:" + hashlib.sha256(json.dumps(result, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def probe_results(scan: ScanRun) -> Dict[str, Dict[str, Any]]:
+    """Split a stored ScanRun back into per-probe results."""
+    out = {}
+    for name, (field, key) in PROBE_FIELDS.items():
+        value = getattr(scan, field) or {}
+        value = value.get(key) if key else value
+        if value:
+            out[name] = value
+    return out
 
-def run_scan(org: Organization) -> ScanRun:
-    domain = (org.primary_domain or "example.com").strip()
-    dns_results = run_dns_scan(domain)
-    tls_results = run_tls_scan(domain)
-    website_headers = run_headers_scan(domain)
 
+def _is_due(name: str, previous: Dict[str, Dict[str, Any]], previous_state: Dict[str, Dict[str, Any]], now: datetime) -> bool:
+    state = previous_state.get(name) or {}
+    if name not in previous or previous[name].get("timed_out") or not state.get("due_at"):
+        return True
+    return datetime.fromisoformat(state["due_at"]) <= now
+
+
+def scan_deadline() -> float:
+    return float(getattr(settings, "SCAN_DEADLINE_SECONDS", 12.0))
+
+
+ProbeCallback = Callable[[str, Dict[str, Any]], None]
+
+
+class ProbePlan(NamedTuple):
+    """What one scan has to do: probes that are due, and the results carried forward for the rest."""
+    now: datetime
+    previous: Dict[str, Dict[str, Any]]
+    previous_state: Dict[str, Dict[str, Any]]
+    due: List[str]
+    results: Dict[str, Dict[str, Any]]
+    state: Dict[str, Dict[str, Any]]
+
+    @property
+    def etag(self) -> Optional[str]:
+        return (self.previous_state.get("headers") or {}).get("etag")
+
+
+def plan_probes(previous_scan: Optional[ScanRun] = None, on_result: Optional[ProbeCallback] = None) -> ProbePlan:
+    now = timezone.now()
+    previous = probe_results(previous_scan) if previous_scan else {}
+    previous_state = (previous_scan.probe_state or {}) if previous_scan else {}
+    due = [name for name in PROBES if _is_due(name, previous, previous_state, now)]
+    plan = ProbePlan(now, previous, previous_state, due, results={}, state={})
+    for name in PROBES:
+        if name not in plan.due:
+            plan.results[name] = previous[name]
+            plan.state[name] = {**previous_state[name], "carried": True, "changed": False}
+            if on_result:
+                on_result(name, plan.results[name])
+    return plan
+
+
+def timed_out(deadline: float) -> Dict[str, Any]:
+    return {"error": f"timed out after {deadline:g}s", "timed_out": True}
+
+
+def settle_probes(domain: str, ctx: Any, plan: ProbePlan) -> ProbeRun:
+    """Fingerprint and schedule the probes that ran (ctx is a ScanContext or async_scan.AsyncScanContext)."""
+    for name in plan.due:
+        result = plan.results[name]
+        recheck = 0 if result.get("timed_out") else PROBES[name].recheck_after(domain, ctx, result)
+        fp = fingerprint(name, result)
+        plan.state[name] = {
+            "fingerprint": fp,
+            "checked_at": plan.now.isoformat(),
+            "due_at": (plan.now + timedelta(seconds=recheck)).isoformat(),
+            "changed": (plan.previous_state.get(name) or {}).get("fingerprint") != fp,
+        }
+        if name == "headers" and (result.get("headers") or {}).get("etag"):
+            plan.state[name]["etag"] = result["headers"]["etag"]
+    return ProbeRun(results=plan.results, state=plan.state)
+
+
+def run_probes(
+    domain: str,
+    deadline: Optional[float] = None,
+    previous_scan: Optional[ScanRun] = None,
+    on_result: Optional[ProbeCallback] = None,
+) -> ProbeRun:
+    """Fan out every probe for one domain and wait at most `deadline` seconds.
+    Probes that have not finished by then are reported as timed out (partial results).
+    With previous_scan, probes that are not yet due are skipped and their previous result reused.
+    on_result(name, result) is called (on this thread) as each probe's result becomes available."""
+    deadline = scan_deadline() if deadline is None else deadline
+    plan = plan_probes(previous_scan, on_result)
+    due, results = plan.due, plan.results
+
+    ctx = ScanContext(previous=plan.previous, etag=plan.etag)
+    if due:
+        pool = ThreadPoolExecutor(max_workers=len(due), thread_name_prefix="scan-probe")
+        futures = {pool.submit(PROBES[name].run, domain, ctx): name for name in due}
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                name = futures[future]
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    results[name] = {"error": str(e)}
+                if on_result:
+                    on_result(name, results[name])
+        except FuturesTimeout:
+            pass
+        # Don't block on stragglers; they finish on their own socket/resolver timeouts.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+        for name in due:
+            if name not in results:
+                results[name] = timed_out(deadline)
+                if on_result:
+                    on_result(name, results[name])
+    return settle_probes(domain, ctx, plan)
+
+
+def overall_status(dns_results: Dict[str, Any], tls_results: Dict[str, Any], website_headers: Dict[str, Any]) -> str:
     issues = []
     if not dns_results.get("spf", {}).get("present") and not dns_results.get("spf", {}).get("error"):
         issues.append("no_spf")
@@ -24,18 +260,45 @@ def run_scan(org: Organization) -> ScanRun:
         issues.append("no_hsts")
 
     if not issues:
-        overall_scan_status = "ok"
-    elif "tls_invalid" in issues or "no_spf" in issues:
-        overall_scan_status = "error"
-    else:
-        overall_scan_status = "warning"
+        return "ok"
+    if "tls_invalid" in issues or "no_spf" in issues:
+        return "error"
+    return "warning"
+
 
-    scan = ScanRun.objects.create(
+def build_scan_run(org: Organization, probes: ProbeRun) -> ScanRun:
+    """Assemble probe results into an unsaved ScanRun."""
+    fields: Dict[str, Dict[str, Any]] = {"dns_results": {}, "tls_results": {}, "website_headers": {}}
+    for name, (field, key) in PROBE_FIELDS.items():
+        if key:
+            fields[field][key] = probes.results[name]
+        else:
+            fields[field] = probes.results[name]
+    dns_results, tls_results, website_headers = fields["dns_results"], fields["tls_results"], fields["website_headers"]
+    return ScanRun(
         organization=org,
         dns_results=dns_results,
         email_auth_results={"spf": dns_results.get("spf"), "dmarc": dns_results.get("dmarc"), "dkim": dns_results.get("dkim_heuristic")},
         tls_results=tls_results,
         website_headers=website_headers,
-        overall_scan_status=overall_scan_status,
+        overall_scan_status=overall_status(dns_results, tls_results, website_headers),
+        probe_state=probes.state,
     )
+
+
+def org_domain(org: Organization) -> str:
+    return (org.primary_domain or "example.com").strip()
+
+
+def latest_scan(org: Organization) -> Optional[ScanRun]:
+    return org.scan_runs.select_related(*ScanRun.SECTIONS.values()).order_by(*ScanRun.LATEST_FIRST).first()
+
+
+def run_scan(org: Organization, incremental: bool = False, on_probe: Optional[ProbeCallback] = None) -> ScanRun:
+    previous = latest_scan(org) if incremental else None
+    scan = build_scan_run(org, run_probes(org_domain(org), previous_scan=previous, on_result=on_probe))
+    with transaction.atomic():
+        scan.save()
+        record_scans([scan])
+        bump_org_versions([org.pk])
     return scan
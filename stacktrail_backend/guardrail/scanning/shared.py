@@ -0,0 +1,44 @@
+"""Per-scan memoization shared by concurrently running probes."""
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+
+class OnceMap:
+    """Compute each key at most once; concurrent callers for the same key wait for the first one.
+    A raised exception is remembered and re-raised to every caller, like a returned value."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._done: Dict[Hashable, tuple] = {}
+        self._pending: Dict[Hashable, threading.Event] = {}
+
+    def get(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._done:
+                owner, event = False, None
+            elif key in self._pending:
+                owner, event = False, self._pending[key]
+            else:
+                owner, event = True, threading.Event()
+                self._pending[key] = event
+        if owner:
+            try:
+                outcome = (True, compute())
+            except Exception as e:
+                outcome = (False, e)
+            with self._lock:
+                self._done[key] = outcome
+                del self._pending[key]
+            event.set()
+        elif event is not None:
+            event.wait()
+        ok, value = self._done[key]
+        if not ok:
+            raise value
+        return value
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Value already computed for key, without computing or waiting."""
+        with self._lock:
+            ok, value = self._done.get(key, (False, None))
+        return value if ok else default
@@ -0,0 +1,238 @@
+"""Single-handshake TLS probe: certificate chain, protocol/cipher, ALPN and OCSP stapling are read from
+one connection to port 443, and the HTTPS request for the header/redirect checks is sent on that same
+connection. Falls back to separate stdlib/requests calls when pyOpenSSL is not installed."""
+import selectors
+import socket
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, NamedTuple, Optional, Union
+from urllib.parse import urljoin
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .http import fetch
+from .tls_scan import get_cert_info
+
+try:
+    from OpenSSL import SSL
+    from cryptography import x509
+    HAS_PYOPENSSL = True
+except ImportError:
+    HAS_PYOPENSSL = False
+
+try:
+    import certifi
+except ImportError:
+    certifi = None
+
+MAX_HEADER_BYTES = 64 * 1024
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+
+class HTTPSResult(NamedTuple):
+    """Header-only view of the first HTTPS response (quacks like requests.Response for .url/.headers)."""
+    url: str
+    status_code: int
+    headers: CaseInsensitiveDict
+
+
+class TLSProbeResult(NamedTuple):
+    cert: Dict[str, Any]
+    # Final HTTPS response (after redirects), or None with response_error set.
+    response: Optional[Union[HTTPSResult, requests.Response]]
+    response_error: Optional[str] = None
+
+
+class TLSProbeError(Exception):
+    pass
+
+
+def _wait(sock: socket.socket, deadline: float, events: int) -> None:
+    remaining = deadline - time.monotonic()
+    with selectors.DefaultSelector() as sel:
+        sel.register(sock, events)
+        if remaining <= 0 or not sel.select(remaining):
+            raise socket.timeout("TLS probe timed out")
+
+
+def _io(sock: socket.socket, deadline: float, op):
+    """Run a pyOpenSSL call on a non-blocking socket until it completes or the deadline passes."""
+    while True:
+        try:
+            return op()
+        except SSL.WantReadError:
+            _wait(sock, deadline, selectors.EVENT_READ)
+        except SSL.WantWriteError:
+            _wait(sock, deadline, selectors.EVENT_WRITE)
+
+
+def _not_after(cert: "x509.Certificate") -> datetime:
+    dt = getattr(cert, "not_valid_after_utc", None)
+    return dt if dt is not None else cert.not_valid_after.replace(tzinfo=timezone.utc)
+
+
+def _hostname_matches(cert: "x509.Certificate", hostname: str) -> bool:
+    try:
+        names = cert.extensions.get_extension_for_class(x509.SubjectAlternativeName).value.get_values_for_type(x509.DNSName)
+    except x509.ExtensionNotFound:
+        return False
+    hostname = hostname.lower().rstrip(".")
+    for name in names:
+        name = name.lower().rstrip(".")
+        if name == hostname:
+            return True
+        # Wildcard covers exactly one left-most label.
+        if name.startswith("*.") and "." in hostname and hostname.split(".", 1)[1] == name[2:]:
+            return True
+    return False
+
+
+def _describe(cert: "x509.Certificate") -> Dict[str, Any]:
+    return {
+        "subject": cert.subject.rfc4514_string(),
+        "issuer": cert.issuer.rfc4514_string(),
+        "expires": _not_after(cert).strftime("%b %d %H:%M:%S %Y GMT"),
+    }
+
+
+def _cert_info(conn, hostname: str, verify_errors: List[str], ocsp: Dict[str, bool]) -> Dict[str, Any]:
+    out = {"valid": False, "expires": None, "issuer": None, "error": None}
+    chain = [c.to_cryptography() for c in (conn.get_peer_cert_chain() or [])]
+    if not chain:
+        out["error"] = "no peer certificate"
+        return out
+    leaf = chain[0]
+    expires = _not_after(leaf)
+    out.update({
+        "expires": expires.strftime("%b %d %H:%M:%S %Y GMT"),
+        "days_until_expiry": (expires - datetime.now(timezone.utc)).days,
+        "issuer": leaf.issuer.rfc4514_string(),
+        "subject": leaf.subject.rfc4514_string(),
+        "serial": format(leaf.serial_number, "x"),
+        "chain": [_describe(c) for c in chain],
+        "protocol": conn.get_protocol_version_name(),
+        "cipher": conn.get_cipher_name(),
+        "alpn": (conn.get_alpn_proto_negotiated() or b"").decode() or None,
+        "ocsp_stapled": ocsp["stapled"],
+    })
+    if verify_errors:
+        out["error"] = "certificate verify failed: " + "; ".join(verify_errors)
+    elif not _hostname_matches(leaf, hostname):
+        out["error"] = f"certificate verify failed: hostname mismatch for {hostname!r}"
+    else:
+        out["valid"] = True
+    return out
+
+
+def _read_response_head(sock: socket.socket, conn, deadline: float) -> bytes:
+    buf = b""
+    while b"\r\n\r\n" not in buf and len(buf) < MAX_HEADER_BYTES:
+        try:
+            chunk = _io(sock, deadline, lambda: conn.recv(16384))
+        except (SSL.ZeroReturnError, SSL.SysCallError):
+            break
+        if not chunk:
+            break
+        buf += chunk
+    if b"\r\n\r\n" not in buf:
+        raise TLSProbeError("incomplete HTTP response")
+    return buf.split(b"\r\n\r\n", 1)[0]
+
+
+def _parse_head(head: bytes) -> tuple:
+    lines = head.decode("iso-8859-1").split("\r\n")
+    parts = lines[0].split(" ", 2)
+    if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+        raise TLSProbeError(f"malformed status line: {lines[0][:100]!r}")
+    headers = CaseInsensitiveDict()
+    for line in lines[1:]:
+        name, sep, value = line.partition(":")
+        if not sep:
+            continue
+        name, value = name.strip(), value.strip()
+        headers[name] = f"{headers[name]}, {value}" if name in headers else value
+    return int(parts[1]), headers
+
+
+def probe_tls(hostname: str, port: int = 443, timeout: float = 5.0, etag: Optional[str] = None) -> TLSProbeResult:
+    """`etag` makes the HTTPS request conditional (If-None-Match); a 304 means the headers are unchanged."""
+    conditional = {"If-None-Match": etag} if etag else {}
+    if not HAS_PYOPENSSL:
+        cert = get_cert_info(hostname, port=port, timeout=timeout)
+        try:
+            return TLSProbeResult(cert=cert, response=fetch(f"https://{hostname}", timeout=timeout, headers=conditional))
+        except Exception as e:
+            return TLSProbeResult(cert=cert, response=None, response_error=str(e))
+
+    deadline = time.monotonic() + timeout
+    verify_errors: List[str] = []
+    ocsp = {"stapled": False}
+
+    def on_verify(conn, cert, errnum, depth, ok):
+        if not ok:
+            verify_errors.append(f"error {errnum} at depth {depth} ({cert.to_cryptography().subject.rfc4514_string()})")
+        return True  # keep going so the chain can still be reported
+
+    def on_ocsp(conn, data, _):
+        ocsp["stapled"] = bool(data)
+        return True
+
+    ctx = SSL.Context(SSL.TLS_CLIENT_METHOD)
+    ctx.set_verify(SSL.VERIFY_PEER, on_verify)
+    ctx.set_default_verify_paths()
+    if certifi is not None:
+        ctx.load_verify_locations(certifi.where())
+    # Only HTTP/1.1 is offered: the header request below is written on this connection.
+    ctx.set_alpn_protos([b"http/1.1"])
+    ctx.set_ocsp_client_callback(on_ocsp)
+
+    try:
+        sock = socket.create_connection((hostname, port), timeout=timeout)
+    except Exception as e:
+        return TLSProbeResult(cert={"valid": False, "expires": None, "issuer": None, "error": str(e)}, response=None, response_error=str(e))
+
+    sock.setblocking(False)
+    conn = SSL.Connection(ctx, sock)
+    try:
+        conn.set_tlsext_host_name(hostname.encode("idna"))
+        conn.request_ocsp()
+        conn.set_connect_state()
+        try:
+            _io(sock, deadline, conn.do_handshake)
+        except Exception as e:
+            return TLSProbeResult(cert={"valid": False, "expires": None, "issuer": None, "error": str(e)}, response=None, response_error=str(e))
+
+        cert = _cert_info(conn, hostname, verify_errors, ocsp)
+        if not cert["valid"]:
+            return TLSProbeResult(cert=cert, response=None, response_error=cert["error"])
+
+        try:
+            request = (
+                f"GET / HTTP/1.1\r\nHost: {hostname}\r\nUser-Agent: {requests.utils.default_user_agent()}\r\n"
+                "Accept: */*\r\nConnection: close\r\n"
+                + "".join(f"{k}: {v}\r\n" for k, v in conditional.items())
+                + "\r\n"
+            ).encode("latin-1")
+            while request:
+                sent = _io(sock, deadline, lambda: conn.send(request))
+                request = request[sent:]
+            status, headers = _parse_head(_read_response_head(sock, conn, deadline))
+        except Exception as e:
+            return TLSProbeResult(cert=cert, response=None, response_error=str(e))
+    finally:
+        try:
+            conn.shutdown()
+        except Exception:
+            pass
+        sock.close()
+
+    url = f"https://{hostname}/"
+    if status in REDIRECT_STATUSES and headers.get("location"):
+        # Only a redirect needs another connection; follow it with the pooled session. The stored ETag
+        # belongs to the final response, so the conditional header goes along for it to answer 304.
+        try:
+            return TLSProbeResult(cert=cert, response=fetch(urljoin(url, headers["location"]), timeout=timeout, headers=conditional))
+        except Exception as e:
+            return TLSProbeResult(cert=cert, response=None, response_error=str(e))
+    return TLSProbeResult(cert=cert, response=HTTPSResult(url=url, status_code=status, headers=headers))
@@ -2,9 +2,12 @@
 import ssl
 import socket
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urljoin
 import requests
 
+from .http import fetch, get_session
+
 
 def get_cert_info(hostname: str, port: int = 443, timeout: float = 5.0) -> Dict[str, Any]:
     out = {"valid": False, "expires": None, "issuer": None, "error": None}
@@ -32,13 +35,27 @@ def get_cert_info(hostname: str, port: int = 443, timeout: float = 5.0) -> Dict[
     return out
 
 
-def check_https_redirect(domain: str, timeout: float = 5.0) -> Dict[str, Any]:
+def _http_redirects_to_https(domain: str, timeout: float = 5.0, max_hops: int = 10) -> bool:
+    """Follow http:// redirects only until one points at https:// (no TLS handshake needed to know)."""
+    url = f"http://{domain}"
+    for _ in range(max_hops):
+        r = get_session().get(url, timeout=timeout, allow_redirects=False)
+        location = r.headers.get("location")
+        if not r.is_redirect or not location:
+            return False
+        url = urljoin(url, location)
+        if url.startswith("https://"):
+            return True
+    return False
+
+
+def check_https_redirect(domain: str, timeout: float = 5.0, https: Optional[Callable[[], requests.Response]] = None) -> Dict[str, Any]:
+    """`https` returns the (shared) response for https://domain; by default it is fetched here."""
     out = {"https_ok": False, "redirects_to_https": False, "error": None}
     try:
-        r = requests.get(f"https://{domain}", timeout=timeout, allow_redirects=True)
+        r = https() if https else fetch(f"https://{domain}", timeout=timeout)
         out["https_ok"] = r.url.startswith("https://")
-        r2 = requests.get(f"http://{domain}", timeout=timeout, allow_redirects=True)
-        out["redirects_to_https"] = r2.url.startswith("https://")
+        out["redirects_to_https"] = _http_redirects_to_https(domain, timeout=timeout)
     except Exception as e:
         out["error"] = str(e)
     return out
@@ -1,16 +1,32 @@
 """Security headers: HSTS, X-Content-Type-Options."""
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Optional
 import requests
 
+from .http import fetch
 
-def run_headers_scan(domain: str, timeout: float = 5.0) -> Dict[str, Any]:
+# Per-response values (timestamps, request IDs, cookies) that would make every stored result unique.
+VOLATILE_HEADERS = frozenset({
+    "age", "cf-ray", "date", "expires", "last-modified", "nel", "report-to", "server-timing",
+    "set-cookie", "x-amz-cf-id", "x-amzn-requestid", "x-cache-hits", "x-request-id",
+    "x-runtime", "x-served-by", "x-timer",
+})
+
+
+def analyze_headers(r: requests.Response) -> Dict[str, Any]:
+    h = {k.lower(): v for k, v in r.headers.items() if k.lower() not in VOLATILE_HEADERS}
+    return {
+        "hsts": "strict-transport-security" in h,
+        "x_content_type_options": h.get("x-content-type-options", "").lower() == "nosniff",
+        "headers": h,
+        "error": None,
+    }
+
+
+def run_headers_scan(domain: str, timeout: float = 5.0, https: Optional[Callable[[], requests.Response]] = None) -> Dict[str, Any]:
+    """`https` returns the (shared) response for https://domain; by default it is fetched here."""
     out = {"hsts": False, "x_content_type_options": False, "headers": {}, "error": None}
     try:
-        r = requests.get(f"https://{domain}", timeout=timeout)
-        h = {k.lower(): v for k, v in r.headers.items()}
-        out["headers"] = h
-        out["hsts"] = "strict-transport-security" in h
-        out["x_content_type_options"] = h.get("x-content-type-options", "").lower() == "nosniff"
+        return analyze_headers(https() if https else fetch(f"https://{domain}", timeout=timeout))
     except Exception as e:
         out["error"] = str(e)
     return out
@@ -1,65 +1,36 @@
 """
 Guardrail scoring engine. Start at 100, subtract weighted penalties.
-Apply business-type and downtime multipliers. Risk bands 85–100 Low, 70–84 Moderate, 50–69 High, <50 Critical.
+Apply business-type and downtime multipliers. Weights, multipliers and findings come from a versioned ruleset
+(guardrail/rulesets/vN.json); every Assessment records the ruleset_version that scored it. Risk bands 85–100 Low, 70–84 Moderate, 50–69 High, <50 Critical.
 Insurance: Not Ready if MFA=no OR backups=no OR no incident plan; Baseline if MFA+backups; Strong if + no shared + restore test + incident plan.
+Rules are compiled per (business_type, downtime_impact) into a cached ScoringPlan; rescore_assessments()
+re-scores stored assessments in batches after the rules change.
 """
 from __future__ import annotations
 
-from typing import Any, Dict, List, Tuple
+import functools
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
 
-from core.models import Assessment, Finding, Organization
-
-
-PENALTIES: Dict[str, int] = {
-    "mfa_all": 15,
-    "admin_protection": 8,
-    "shared_logins": 12,
-    "mfa_payments": 10,
-    "email_forwarding": 6,
-    "file_sharing_limited": 8,
-    "access_review": 6,
-    "independent_backups": 12,
-    "restore_tested": 8,
-    "phishing_training": 6,
-    "incident_plan": 10,
-    "domain_email_protection": 10,
-}
+from django.db import transaction
+from django.db.models import QuerySet
 
-INDUSTRY_MULTIPLIERS: Dict[str, List[str]] = {
-    "law_firm": ["mfa_all", "domain_email_protection", "independent_backups", "access_review"],
-    "medical": ["mfa_all", "independent_backups", "access_review", "domain_email_protection"],
-    "retail": ["mfa_payments", "shared_logins", "independent_backups"],
-}
-
-DOWNTIME_MULTIPLIER_KEYS: List[str] = ["independent_backups", "restore_tested", "incident_plan"]
+from core.caching import bump_org_versions
+from core.models import Assessment, Finding, Organization
+from core.posture import record_assessment, refresh_assessment_postures
+from guardrail.rulesets import Ruleset, get_ruleset
 
 
-def _multiplier(org: Organization, key: str) -> float:
+def _multiplier_for(ruleset: Ruleset, business_type: str, downtime_impact: str, key: str) -> float:
     m = 1.0
-    keys = INDUSTRY_MULTIPLIERS.get(org.business_type, [])
+    keys = ruleset.industry_multipliers.get(business_type, ())
     if key in keys:
-        m += 0.3
-    if org.downtime_impact == Organization.DowntimeImpact.CANT_OPERATE and key in DOWNTIME_MULTIPLIER_KEYS:
-        m += 0.3
+        m += ruleset.industry_multiplier_bonus
+    if downtime_impact == Organization.DowntimeImpact.CANT_OPERATE and key in ruleset.downtime_multiplier_keys:
+        m += ruleset.downtime_multiplier_bonus
     return m
 
 
-def _score_answers(org: Organization, answers: Dict[str, Any]) -> Tuple[int, Dict[str, float]]:
-    total_penalty = 0.0
-    multipliers_used = {}
-    for key, weight in PENALTIES.items():
-        mult = _multiplier(org, key)
-        multipliers_used[key] = mult
-        val = answers.get(key)
-        if val in ("yes", "enforced", "partial"):
-            if val == "partial":
-                total_penalty += weight * mult * 0.5
-        else:
-            total_penalty += weight * mult
-    raw = max(0, 100 - int(total_penalty))
-    return min(100, raw), multipliers_used
-
-
 def _risk_band(score: int) -> str:
     if score >= 85:
         return "Low"
@@ -93,64 +64,155 @@ def _downtime_days(risk_band: str, downtime_impact: str) -> Tuple[int, int]:
 
 
 def _daily_revenue(org: Organization) -> float:
+    return _daily_revenue_for(org.revenue_range)
+
+
+def _daily_revenue_for(revenue_range: str) -> float:
     annual = {"lt_250k": 150_000, "250k_1m": 500_000, "1m_5m": 2_000_000, "gt_5m": 6_000_000}.get(
-        org.revenue_range, 150_000
+        revenue_range, 150_000
     )
     return annual / 260.0
 
 
 def _breach_cost(org: Organization, risk_band: str) -> Tuple[int, int, int, int]:
-    days_low, days_high = _downtime_days(risk_band, org.downtime_impact)
-    daily = _daily_revenue(org)
+    return _breach_cost_for(org.revenue_range, org.employee_count, org.downtime_impact, risk_band)
+
+
+def _breach_cost_for(revenue_range: str, employee_count: int, downtime_impact: str, risk_band: str) -> Tuple[int, int, int, int]:
+    days_low, days_high = _downtime_days(risk_band, downtime_impact)
+    daily = _daily_revenue_for(revenue_range)
     fixed = 10_000
-    if org.employee_count > 15:
+    if employee_count > 15:
         fixed = 30_000
     cost_low = int(daily * days_low + fixed)
     cost_high = int(daily * days_high + fixed * 1.5)
     return cost_low, cost_high, days_low, days_high
 
 
-FINDING_DEFS: Dict[str, tuple] = {
-    "mfa_all": ("2-step login (MFA) for everyone", "high", "identity", "Account takeover risk", 120, 60, "MFA greatly reduces account takeover.", ["Enable MFA in your identity provider.", "Require it for all users."]),
-    "admin_protection": ("Admin accounts protected", "high", "identity", "Privilege escalation risk", 90, 50, "Admins need extra protection.", ["Use separate admin accounts.", "Require MFA for admins."]),
-    "shared_logins": ("No shared logins for critical systems", "high", "identity", "Unauditable access", 180, 55, "Shared logins prevent accountability.", ["Issue individual accounts.", "Use SSO or password manager for teams."]),
-    "mfa_payments": ("MFA on payment platforms", "high", "payments", "Payment fraud risk", 60, 50, "Payment dashboards are high-value targets.", ["Turn on MFA in Stripe/Square/QuickBooks.", "Require for all approvers."]),
-    "email_forwarding": ("Email forwarding restricted", "medium", "email", "Data exfiltration risk", 90, 35, "Unrestricted forwarding can leak mail.", ["Review forwarding rules in Google/Microsoft admin.", "Restrict or disable automatic forwarding."]),
-    "file_sharing_limited": ("File sharing limited to organization", "medium", "data_access", "Data exposure", 120, 40, "External sharing increases leak risk.", ["Set sharing defaults to internal only.", "Review existing shared links."]),
-    "access_review": ("Regular access review", "medium", "data_access", "Overprivileged users", 180, 35, "Regular reviews catch over-access.", ["Quarterly review of who has access to what.", "Remove access when roles change."]),
-    "independent_backups": ("Independent backups outside SaaS", "high", "backups", "Data loss risk", 240, 60, "Relying only on provider backups is risky.", ["Use a backup tool (e.g. Backupify, Spanning).", "Verify backups are not in same tenant."]),
-    "restore_tested": ("Restore tested recently", "medium", "backups", "Restore failure risk", 120, 40, "Untested backups often fail when needed.", ["Run a test restore at least every 6 months.", "Document the steps."]),
-    "phishing_training": ("Phishing training for staff", "medium", "training", "Click-through risk", 120, 35, "Training reduces successful phishing.", ["Run quarterly phishing awareness.", "Use a short simulated phishing test."]),
-    "incident_plan": ("Incident response plan", "high", "planning", "Chaos during incidents", 180, 45, "A plan reduces response time.", ["Write a one-page plan: who to call, what to do first.", "Share with key staff."]),
-    "domain_email_protection": ("Domain email protection (SPF/DKIM/DMARC)", "medium", "email", "Spoofing and deliverability", 180, 45, "SPF/DKIM/DMARC reduce spoofing.", ["Add SPF, DKIM, and DMARC records at your DNS host.", "Start with DMARC policy none, then tighten."]),
-}
-
-
-def _create_findings(assessment: Assessment, answers: Dict[str, Any], multipliers: Dict[str, float]) -> None:
-    Finding.objects.filter(assessment=assessment).delete()
-    for key, (title, severity, category, impact, time_to_fix, risk_red, explanation, steps) in FINDING_DEFS.items():
-        if answers.get(key) in ("yes", "enforced", "partial"):
-            continue
-        mult = multipliers.get(key, 1.0)
-        priority = (3 if severity == "high" else 2 if severity == "medium" else 1) * risk_red * mult / max(1, time_to_fix)
-        Finding.objects.create(
-            assessment=assessment,
-            key=key,
-            title=title,
-            severity=severity,
-            category=category,
-            impact=impact,
-            time_to_fix_minutes=time_to_fix,
-            estimated_risk_reduction_pct=risk_red,
-            explanation=explanation,
-            remediation_steps=steps,
-            priority_score=priority,
-        )
-
-
-def score_assessment(assessment: Assessment, answers: Dict[str, Any]) -> None:
+def _finding_priority(severity: str, risk_red: int, time_to_fix: int, mult: float) -> float:
+    return (3 if severity == "high" else 2 if severity == "medium" else 1) * risk_red * mult / max(1, time_to_fix)
+
+
+# Share of a key's weighted penalty charged for an answer; anything else is charged in full and is a finding.
+ANSWER_PENALTY_FACTOR: Dict[str, float] = {"yes": 0.0, "enforced": 0.0, "partial": 0.5}
+
+
+class ScoringPlan:
+    """A ruleset's rules for one org profile, flattened to (key, weight x multiplier, finding template) per
+    question in penalty order, so a score and its findings come from one pass over the answers."""
+
+    __slots__ = ("version", "multipliers", "entries")
+
+    def __init__(self, ruleset: Ruleset, business_type: str, downtime_impact: str):
+        self.version = ruleset.version
+        penalties, findings = ruleset.penalties, ruleset.findings
+        self.multipliers = {key: _multiplier_for(ruleset, business_type, downtime_impact, key) for key in penalties}
+        entries = []
+        for key in [*penalties, *(k for k in findings if k not in penalties)]:
+            finding = None
+            if key in findings:
+                title, severity, category, impact, time_to_fix, risk_red, explanation, steps = findings[key]
+                finding = {
+                    "title": title,
+                    "severity": severity,
+                    "category": category,
+                    "impact": impact,
+                    "time_to_fix_minutes": time_to_fix,
+                    "estimated_risk_reduction_pct": risk_red,
+                    "explanation": explanation,
+                    "remediation_steps": steps,
+                    "priority_score": _finding_priority(severity, risk_red, time_to_fix, self.multipliers.get(key, 1.0)),
+                }
+            entries.append((key, penalties.get(key, 0) * self.multipliers.get(key, 1.0), finding))
+        self.entries: Tuple[Tuple[str, float, Optional[Dict[str, Any]]], ...] = tuple(entries)
+
+    def evaluate(self, answers: Dict[str, Any]) -> Tuple[int, List[Tuple[str, Dict[str, Any]]]]:
+        """(score, [(key, finding template)] for unmet controls)."""
+        penalty = 0.0
+        unmet = []
+        for key, weight, finding in self.entries:
+            value = answers.get(key)
+            factor = ANSWER_PENALTY_FACTOR.get(value, 1.0) if isinstance(value, str) else 1.0
+            penalty += weight * factor
+            if factor == 1.0 and finding is not None:
+                unmet.append((key, finding))
+        return min(100, max(0, 100 - int(penalty))), unmet
+
+    @staticmethod
+    def findings(assessment_id: int, unmet: List[Tuple[str, Dict[str, Any]]]) -> List[Finding]:
+        """Unsaved Findings for the unmet controls returned by evaluate()."""
+        return [
+            Finding(assessment_id=assessment_id, key=key, **{**template, "remediation_steps": list(template["remediation_steps"])})
+            for key, template in unmet
+        ]
+
+
+@functools.lru_cache(maxsize=256)
+def _compiled_plan(business_type: str, downtime_impact: str, version: int) -> ScoringPlan:
+    return ScoringPlan(get_ruleset(version), business_type, downtime_impact)
+
+
+def scoring_plan(business_type: str, downtime_impact: str, ruleset: Optional[Ruleset] = None) -> ScoringPlan:
+    """Cached per (business_type, downtime_impact, ruleset version); default is the active ruleset."""
+    return _compiled_plan(business_type, downtime_impact, (ruleset or get_ruleset()).version)
+
+
+# Max ids per query with an `IN (...)` list (SQLite's bound-parameter limit is 999 on old builds); rescore
+# batches are larger, so every id list they produce is split into chunks of this size.
+UPDATE_CHUNK_SIZE = 900
+
+# Finding columns derived from the ruleset's findings + multipliers; compared to decide whether a stored row needs an update.
+FINDING_FIELDS = [
+    "title", "severity", "category", "impact", "time_to_fix_minutes",
+    "estimated_risk_reduction_pct", "explanation", "remediation_steps", "priority_score",
+]
+
+
+def sync_findings(desired: Dict[int, List[Finding]]) -> Dict[str, int]:
+    """Make each assessment's stored findings exactly `desired[assessment_id]`, matched by key:
+    new keys are bulk-inserted, changed rows bulk-updated and resolved keys deleted, in one transaction
+    (readers never see an assessment without its findings). Returns counts."""
+    creates: List[Finding] = []
+    updates: List[Finding] = []
+    changed_fields = set()
+    with transaction.atomic():
+        existing: Dict[Tuple[int, str], Finding] = {}
+        deletes: List[int] = []
+        assessment_ids = list(desired)
+        for i in range(0, len(assessment_ids), UPDATE_CHUNK_SIZE):
+            chunk = assessment_ids[i:i + UPDATE_CHUNK_SIZE]
+            for f in Finding.objects.filter(assessment_id__in=chunk).only("pk", "assessment_id", "key", *FINDING_FIELDS):
+                if (f.assessment_id, f.key) in existing:
+                    deletes.append(f.pk)
+                else:
+                    existing[(f.assessment_id, f.key)] = f
+        for assessment_id, rows in desired.items():
+            for row in rows:
+                current = existing.pop((assessment_id, row.key), None)
+                if current is None:
+                    creates.append(row)
+                    continue
+                diff = [name for name in FINDING_FIELDS if getattr(current, name) != getattr(row, name)]
+                if diff:
+                    for name in diff:
+                        setattr(current, name, getattr(row, name))
+                    changed_fields.update(diff)
+                    updates.append(current)
+        deletes.extend(f.pk for f in existing.values())
+
+        for i in range(0, len(deletes), UPDATE_CHUNK_SIZE):
+            Finding.objects.filter(pk__in=deletes[i:i + UPDATE_CHUNK_SIZE]).delete()
+        if updates:
+            Finding.objects.bulk_update(updates, [name for name in FINDING_FIELDS if name in changed_fields])
+        if creates:
+            Finding.objects.bulk_create(creates)
+    return {"created": len(creates), "updated": len(updates), "deleted": len(deletes)}
+
+
+def score_assessment(assessment: Assessment, answers: Dict[str, Any], ruleset: Optional[Ruleset] = None) -> None:
     org = assessment.organization
-    score, multipliers = _score_answers(org, answers)
+    plan = scoring_plan(org.business_type, org.downtime_impact, ruleset)
+    score, unmet = plan.evaluate(answers)
     band = _risk_band(score)
     insurance = _insurance_readiness(answers)
     cost_low, cost_high, days_low, days_high = _breach_cost(org, band)
@@ -163,6 +225,146 @@ def score_assessment(assessment: Assessment, answers: Dict[str, Any]) -> None:
     assessment.breach_cost_high = cost_high
     assessment.downtime_days_low = days_low
     assessment.downtime_days_high = days_high
-    assessment.save()
+    assessment.ruleset_version = plan.version
+    with transaction.atomic():
+        assessment.save()
+        sync_findings({assessment.pk: plan.findings(assessment.pk, unmet)})
+        record_assessment(assessment)
+        bump_org_versions([assessment.organization_id])
+
+
+# Bulk re-scoring: rows are read with values_list and evaluated against the cached plan for their profile.
+
+SCORE_FIELDS = [
+    "score", "risk_band", "insurance_readiness",
+    "breach_cost_low", "breach_cost_high", "downtime_days_low", "downtime_days_high", "ruleset_version",
+]
+DEFAULT_RESCORE_BATCH_SIZE = 2000
+
+
+
+def _flush(changed: Dict[tuple, List[int]], findings: Dict[int, List[Finding]], org_ids: Dict[int, int]) -> None:
+    """Results take few distinct values (score x band x readiness x cost bracket), so rows are written as
+    one UPDATE per distinct result instead of a per-row CASE statement."""
+    rescored = [pk for pks in changed.values() for pk in pks]
+    with transaction.atomic():
+        for values, pks in changed.items():
+            for i in range(0, len(pks), UPDATE_CHUNK_SIZE):
+                Assessment.objects.filter(pk__in=pks[i:i + UPDATE_CHUNK_SIZE]).update(**dict(zip(SCORE_FIELDS, values)))
+        findings_written = bool(findings) and any(sync_findings(findings).values())
+        touched = list(dict.fromkeys(rescored + list(findings)))
+        for i in range(0, len(touched), UPDATE_CHUNK_SIZE):
+            refresh_assessment_postures(touched[i:i + UPDATE_CHUNK_SIZE])
+        orgs = sorted({org_ids[pk] for pk in (touched if findings_written else rescored)})
+        for i in range(0, len(orgs), UPDATE_CHUNK_SIZE):
+            bump_org_versions(orgs[i:i + UPDATE_CHUNK_SIZE])
+
+
+def rescore_assessments(
+    assessments: Optional[QuerySet] = None,
+    batch_size: int = DEFAULT_RESCORE_BATCH_SIZE,
+    refresh_findings: bool = True,
+    ruleset: Optional[Ruleset] = None,
+) -> Dict[str, int]:
+    """Re-score completed assessments (default: all) with `ruleset` (default: the active one).
+    Only rows whose stored values differ are written; with refresh_findings, findings are synced
+    per batch so their priority reflects the current multipliers. Returns counts."""
+    qs = assessments if assessments is not None else Assessment.objects.filter(completed_at__isnull=False)
+    ruleset = ruleset or get_ruleset()
+    rows = qs.order_by("pk").values_list(
+        "pk", "organization_id", "answers", *SCORE_FIELDS,
+        "organization__business_type", "organization__downtime_impact",
+        "organization__revenue_range", "organization__employee_count",
+    )
+    costs: Dict[tuple, Tuple[int, int, int, int]] = {}
+    stats = {"scanned": 0, "updated": 0}
+    changed: Dict[tuple, List[int]] = {}
+    pending = 0
+    findings: Dict[int, List[Finding]] = {}
+    org_ids: Dict[int, int] = {}
+    for pk, org_id, answers, *stored, business_type, downtime_impact, revenue_range, employee_count in rows.iterator(chunk_size=batch_size):
+        answers = answers or {}
+        plan = scoring_plan(business_type, downtime_impact, ruleset)
+        score, unmet = plan.evaluate(answers)
+        band = _risk_band(score)
+        cost_key = (revenue_range, employee_count > 15, downtime_impact, band)
+        if cost_key not in costs:
+            costs[cost_key] = _breach_cost_for(revenue_range, employee_count, downtime_impact, band)
+        cost_low, cost_high, days_low, days_high = costs[cost_key]
+        values = (score, band, str(_insurance_readiness(answers)), cost_low, cost_high, days_low, days_high, plan.version)
+
+        stats["scanned"] += 1
+        org_ids[pk] = org_id
+        if list(values) != stored:
+            changed.setdefault(values, []).append(pk)
+            pending += 1
+        if refresh_findings:
+            findings[pk] = plan.findings(pk, unmet)
+        if pending >= batch_size or len(findings) >= batch_size:
+            stats["updated"] += pending
+            _flush(changed, findings, org_ids)
+            changed, pending, findings, org_ids = {}, 0, {}, {}
+    stats["updated"] += pending
+    _flush(changed, findings, org_ids)
+    return stats
+
+
+def _histogram_bucket(score: int) -> str:
+    low = min(score // 10 * 10, 90)
+    return f"{low}-{low + 9 if low < 90 else 100}"
+
+
+def compare_rulesets(
+    old: Ruleset,
+    new: Ruleset,
+    assessments: Optional[QuerySet] = None,
+    chunk_size: int = DEFAULT_RESCORE_BATCH_SIZE,
+) -> Dict[str, Any]:
+    """Score every completed assessment (default: all) under both rulesets in one streaming read and
+    summarize the score distributions and band movements. Nothing is written."""
+    qs = assessments if assessments is not None else Assessment.objects.filter(completed_at__isnull=False)
+    rows = qs.order_by("pk").values_list("answers", "organization__business_type", "organization__downtime_impact")
+    # Keyed by side, not version: comparing a version with itself must not count every assessment twice.
+    summary = {
+        side: {"version": ruleset.version, "total_score": 0, "bands": Counter(), "score_histogram": Counter()}
+        for side, ruleset in (("old", old), ("new", new))
+    }
+    transitions: Counter = Counter()
+    count = changed = delta_total = 0
+    delta_min = delta_max = None
+    for answers, business_type, downtime_impact in rows.iterator(chunk_size=chunk_size):
+        answers = answers or {}
+        scores = []
+        for side, ruleset in (("old", old), ("new", new)):
+            score, _ = scoring_plan(business_type, downtime_impact, ruleset).evaluate(answers)
+            band = _risk_band(score)
+            stats = summary[side]
+            stats["total_score"] += score
+            stats["bands"][band] += 1
+            stats["score_histogram"][_histogram_bucket(score)] += 1
+            scores.append((score, band))
+        (old_score, old_band), (new_score, new_band) = scores
+        delta = new_score - old_score
+        count += 1
+        delta_total += delta
+        changed += bool(delta)
+        delta_min = delta if delta_min is None else min(delta_min, delta)
+        delta_max = delta if delta_max is None else max(delta_max, delta)
+        if old_band != new_band:
+            transitions[f"{old_band} -> {new_band}"] += 1
 
-    _create_findings(assessment, answers, multipliers)
+    return {
+        "assessments": count,
+        "rulesets": {
+            side: {
+                "version": stats["version"],
+                "mean_score": round(stats["total_score"] / count, 2) if count else None,
+                "bands": dict(stats["bands"]),
+                "score_histogram": dict(sorted(stats["score_histogram"].items(), key=lambda item: int(item[0].split("-")[0]))),
+            }
+            for side, stats in summary.items()
+        },
+        "changed": changed,
+        "score_delta": {"mean": round(delta_total / count, 2) if count else None, "min": delta_min, "max": delta_max},
+        "band_transitions": dict(transitions.most_common()),
+    }
@@ -99,6 +99,76 @@ USE_TZ = True
 STATIC_URL = "static/"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Domain scans: all probes run concurrently; probes still running after this many seconds are reported as timed out.
+SCAN_DEADLINE_SECONDS = float(os.environ.get("SCAN_DEADLINE_SECONDS", "12"))
+# Async scans (fleet sweeps in run_worker): TLS handshakes run on a thread pool of this size (pyOpenSSL has no asyncio API).
+SCAN_TLS_THREADS = int(os.environ.get("SCAN_TLS_THREADS", "32"))
+# Scan job queue (manage.py run_worker): max jobs running at once across all workers;
+# running jobs older than the stale timeout are assumed orphaned by a dead worker and requeued.
+SCAN_JOB_MAX_CONCURRENT = int(os.environ.get("SCAN_JOB_MAX_CONCURRENT", "4"))
+SCAN_JOB_STALE_SECONDS = int(os.environ.get("SCAN_JOB_STALE_SECONDS", "300"))
+# Process-wide DNS cache for scans: entries honor record TTLs; NXDOMAIN/NoAnswer are kept for the negative TTL.
+DNS_CACHE_MAX_ENTRIES = int(os.environ.get("DNS_CACHE_MAX_ENTRIES", "10000"))
+DNS_CACHE_NEGATIVE_TTL = int(os.environ.get("DNS_CACHE_NEGATIVE_TTL", "300"))
+# Scoring ruleset used for new assessments (guardrail/rulesets/v<N>.json); unset means the latest version.
+SCORING_RULESET_VERSION = int(os.environ["SCORING_RULESET_VERSION"]) if os.environ.get("SCORING_RULESET_VERSION") else None
+# Response cache for polled GETs (dashboard, org scan runs, assessment findings), keyed by per-org change counters.
+# Local memory by default; set RESPONSE_CACHE_DIR to share entries between processes on one host.
+# Counter changes made by other processes (the scan worker) are seen within RESPONSE_CACHE_VERSION_TTL seconds.
+RESPONSE_CACHE_TTL = int(os.environ.get("RESPONSE_CACHE_TTL", "300"))
+RESPONSE_CACHE_VERSION_TTL = int(os.environ.get("RESPONSE_CACHE_VERSION_TTL", "5"))
+_cache_dir = os.environ.get("RESPONSE_CACHE_DIR", "").strip()
+CACHES = {
+    "default": (
+        {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": _cache_dir}
+        if _cache_dir
+        else {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "stacktrail"}
+    )
+}
+# AI suggestions: backend class (core.ai_suggestions.StubBackend runs offline), model, parallel model calls per
+# request, items packed into one prompt (1 = one prompt per item), and the persistent AISuggestion cache
+# (entries expire after the TTL; least recently used evicted past the max).
+AI_SUGGESTION_BACKEND = os.environ.get("AI_SUGGESTION_BACKEND", "core.ai_suggestions.OpenAIBackend")
+AI_SUGGESTION_MODEL = os.environ.get("AI_SUGGESTION_MODEL", "gpt-4o-mini")
+AI_SUGGESTION_CONCURRENCY = int(os.environ.get("AI_SUGGESTION_CONCURRENCY", "4"))
+AI_SUGGESTION_BATCH_SIZE = int(os.environ.get("AI_SUGGESTION_BATCH_SIZE", "20"))
+AI_SUGGESTION_CACHE_TTL_SECONDS = int(os.environ.get("AI_SUGGESTION_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+AI_SUGGESTION_CACHE_MAX_ENTRIES = int(os.environ.get("AI_SUGGESTION_CACHE_MAX_ENTRIES", "5000"))
+# Workflow tickets (delivered from the outbox by run_worker): provider calls in flight at once, per-provider call rate
+# (calls per second; 0 = unlimited), and how long an item left sending by a crashed worker waits before it is requeued.
+TICKET_WORKFLOW_CONCURRENCY = int(os.environ.get("TICKET_WORKFLOW_CONCURRENCY", "8"))
+TICKET_PROVIDER_RATE_LIMITS = {
+    "trello": float(os.environ.get("TRELLO_RATE_LIMIT", "8")),
+    "jira": float(os.environ.get("JIRA_RATE_LIMIT", "5")),
+    "google_tasks": float(os.environ.get("GOOGLE_TASKS_RATE_LIMIT", "5")),
+}
+TICKET_CLAIM_STALE_SECONDS = int(os.environ.get("TICKET_CLAIM_STALE_SECONDS", "300"))
+# Ticket outbox: items claimed per delivery pass, and retries of deliveries that never reached the provider or got
+# 429/503 (exponential backoff from the base up to the max; an item fails for good after TICKET_OUTBOX_MAX_ATTEMPTS,
+# about 2-3h of outage at the defaults). Other failures are not retried.
+TICKET_OUTBOX_BATCH_SIZE = int(os.environ.get("TICKET_OUTBOX_BATCH_SIZE", "200"))
+TICKET_OUTBOX_MAX_ATTEMPTS = int(os.environ.get("TICKET_OUTBOX_MAX_ATTEMPTS", "10"))
+TICKET_OUTBOX_RETRY_BASE_SECONDS = float(os.environ.get("TICKET_OUTBOX_RETRY_BASE_SECONDS", "30"))
+TICKET_OUTBOX_RETRY_MAX_SECONDS = float(os.environ.get("TICKET_OUTBOX_RETRY_MAX_SECONDS", "3600"))
+# NDJSON progress streams (?stream=1 and the /stream endpoints): database poll interval, keep-alive ping after
+# this many quiet seconds, and the longest a stream stays open (clients re-open it to keep watching).
+STREAM_POLL_INTERVAL = float(os.environ.get("STREAM_POLL_INTERVAL", "0.5"))
+STREAM_KEEPALIVE_SECONDS = float(os.environ.get("STREAM_KEEPALIVE_SECONDS", "15"))
+STREAM_MAX_SECONDS = float(os.environ.get("STREAM_MAX_SECONDS", "300"))
+# Outbound provider calls (core.outbound): token-bucket burst per provider + credential (the refill rate is
+# TICKET_PROVIDER_RATE_LIMITS), retries of 429/502/503/504 and connect failures with jittered exponential
+# backoff, the longest Retry-After we'll wait in-request, and the per-provider circuit breaker.
+OUTBOUND_BURST = int(os.environ.get("OUTBOUND_BURST", "5"))
+OUTBOUND_MAX_ATTEMPTS = int(os.environ.get("OUTBOUND_MAX_ATTEMPTS", "4"))
+OUTBOUND_BACKOFF_BASE_SECONDS = float(os.environ.get("OUTBOUND_BACKOFF_BASE_SECONDS", "0.5"))
+OUTBOUND_BACKOFF_MAX_SECONDS = float(os.environ.get("OUTBOUND_BACKOFF_MAX_SECONDS", "8"))
+OUTBOUND_MAX_RETRY_AFTER_SECONDS = float(os.environ.get("OUTBOUND_MAX_RETRY_AFTER_SECONDS", "30"))
+OUTBOUND_CIRCUIT_FAILURES = int(os.environ.get("OUTBOUND_CIRCUIT_FAILURES", "5"))
+OUTBOUND_CIRCUIT_COOLDOWN_SECONDS = float(os.environ.get("OUTBOUND_CIRCUIT_COOLDOWN_SECONDS", "30"))
+# Provider API base URLs (override to point the integrations at a local fake server).
+TRELLO_API_BASE = os.environ.get("TRELLO_API_BASE", "https://api.trello.com")
+GOOGLE_TASKS_API_BASE = os.environ.get("GOOGLE_TASKS_API_BASE", "https://tasks.googleapis.com")
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
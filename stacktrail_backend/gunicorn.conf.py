@@ -0,0 +1,21 @@
+"""Gunicorn settings, read automatically when gunicorn starts in this directory.
+
+Default (WSGI) profile: threaded workers. A long NDJSON progress stream (core.streaming) holds one thread
+instead of a whole worker, and the worker keeps heartbeating, so streams are not killed by the worker timeout.
+
+GUNICORN_PROFILE=asgi serves guardrail.asgi with uvicorn workers (uvicorn-worker package). The AI-suggestion
+and progress-stream endpoints are async, so each worker handles hundreds of requests that are waiting on the
+model or on queued work, instead of one per thread. Start without an app argument so the profile picks it:
+    GUNICORN_PROFILE=asgi gunicorn --bind 127.0.0.1:8000
+"""
+import os
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "60"))
+
+if os.environ.get("GUNICORN_PROFILE") == "asgi":
+    wsgi_app = "guardrail.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    wsgi_app = "guardrail.wsgi:application"
+    worker_class = "gthread"
+    threads = int(os.environ.get("GUNICORN_THREADS", "8"))
@@ -7,10 +7,7 @@ function getToken(): string | null {
   return localStorage.getItem('access')
 }
 
-export async function api<T>(
-  path: string,
-  options: RequestInit = {}
-): Promise<T> {
+async function request(path: string, options: RequestInit = {}): Promise<Response> {
   const token = getToken()
   const headers: HeadersInit = {
     'Content-Type': 'application/json',
@@ -34,10 +31,39 @@ export async function api<T>(
         : err.message || (err.username && err.username[0]) || (err.password && err.password[0]) || (err.non_field_errors && err.non_field_errors[0]) || res.statusText
     throw new Error(msg)
   }
+  return res
+}
+
+export async function api<T>(
+  path: string,
+  options: RequestInit = {}
+): Promise<T> {
+  const res = await request(path, options)
   if (res.status === 204) return undefined as T
   return res.json()
 }
 
+// NDJSON streams (?stream=1 and /stream endpoints): calls onEvent for each line as it arrives
+export async function streamApi<E extends { event: string }>(
+  path: string,
+  onEvent: (event: E) => void,
+  options: RequestInit = {}
+): Promise<void> {
+  const res = await request(path, options)
+  const reader = res.body!.getReader()
+  const decoder = new TextDecoder()
+  let buffered = ''
+  for (;;) {
+    const { done, value } = await reader.read()
+    buffered += decoder.decode(value, { stream: !done })
+    const lines = buffered.split('\n')
+    buffered = lines.pop() ?? ''
+    for (const line of lines) if (line.trim()) onEvent(JSON.parse(line))
+    if (done) break
+  }
+  if (buffered.trim()) onEvent(JSON.parse(buffered))
+}
+
 export async function login(username: string, password: string) {
   const u = username.trim()
   const p = password
@@ -83,6 +109,12 @@ export interface DashboardOrg {
     risk_band: string
     answers: Record<string, string>
   } | null
+  posture: {
+    insurance_readiness: string | null
+    open_high_findings: number
+    scan_status: string | null
+    cert_days_until_expiry: number | null
+  }
 }
 
 /** Dashboard summary: orgs with latest assessment (score + answers) for charts. */
@@ -144,9 +176,40 @@ export function listOrgAssessments(orgId: number) {
   return api<import('./types').Assessment[]>(`/orgs/${orgId}/assessments`)
 }
 
-// Scan
+/** Slim, cursor-paged history rows. Pass `next` from the previous page to continue. */
+function historyPage<T>(orgId: number, resource: string, next?: string | null, pageSize = 25) {
+  if (next) return api<import('./types').CursorPage<T>>(next.slice(next.indexOf('/orgs/')))
+  return api<import('./types').CursorPage<T>>(`/orgs/${orgId}/${resource}?view=summary&page_size=${pageSize}`)
+}
+
+export function listOrgAssessmentHistory(orgId: number, next?: string | null) {
+  return historyPage<import('./types').AssessmentSummary>(orgId, 'assessments', next)
+}
+
+export function listOrgScanRunHistory(orgId: number, next?: string | null) {
+  return historyPage<import('./types').ScanRunSummary>(orgId, 'scan-runs', next)
+}
+
+export function listOrgReportHistory(orgId: number, next?: string | null) {
+  return historyPage<import('./types').ReportRunSummary>(orgId, 'reports', next)
+}
+
+// Scan (queued; poll getScanJob or follow streamScanJob until status is done or failed)
 export function runScan(orgId: number) {
-  return api<import('./types').ScanRun>(`/orgs/${orgId}/scan`, { method: 'POST' })
+  return api<{ job_id: number; status: string; status_url: string; stream_url: string }>(`/orgs/${orgId}/scan`, { method: 'POST' })
+}
+
+export function getScanJob(jobId: number) {
+  return api<import('./types').ScanJob>(`/scan-jobs/${jobId}`)
+}
+
+export function streamScanJob(jobId: number, onEvent: (event: import('./types').ScanJobEvent) => void) {
+  return streamApi(`/scan-jobs/${jobId}/stream`, onEvent)
+}
+
+export function getScanHistory(orgId: number, before?: number) {
+  const q = before ? `?before=${before}` : ''
+  return api<import('./types').ScanHistoryPage>(`/orgs/${orgId}/scan-history${q}`)
 }
 
 // Reports
@@ -185,7 +248,7 @@ export function createTicket(
   findingKey: string,
   aiSuggestions?: string[]
 ) {
-  return api<{ url?: string; id?: string; key?: string }>(`/orgs/${orgId}/create-ticket`, {
+  return api<{ outbox_id: number; status: string; status_url: string }>(`/orgs/${orgId}/create-ticket`, {
     method: 'POST',
     body: JSON.stringify({
       provider,
@@ -196,6 +259,20 @@ export function createTicket(
   })
 }
 
+// Tickets are queued and delivered by the worker; poll until status is delivered or failed
+export function getTicketOutboxItem(outboxId: number) {
+  return api<import('./types').TicketOutboxItem>(`/ticket-outbox/${outboxId}`)
+}
+
+export function listTicketOutbox(orgId: number, batchId?: string) {
+  const q = batchId ? `?batch=${encodeURIComponent(batchId)}` : ''
+  return api<import('./types').TicketOutboxItem[]>(`/orgs/${orgId}/ticket-outbox${q}`)
+}
+
+export function streamTicketOutbox(orgId: number, batchId: string, onEvent: (event: import('./types').TicketOutboxEvent) => void) {
+  return streamApi(`/orgs/${orgId}/ticket-outbox/stream?batch=${encodeURIComponent(batchId)}`, onEvent)
+}
+
 // AI suggestions and tags for findings / checklist items
 export function getAISuggestions(assessmentId: number, findingKey?: string, questionLabel?: string) {
   return api<{ finding_key: string; suggestions: string[]; tags: string[] } | { findings: { finding_key: string; suggestions: string[]; tags: string[] }[] }>(
@@ -204,6 +281,10 @@ export function getAISuggestions(assessmentId: number, findingKey?: string, ques
   )
 }
 
+export function streamAISuggestions(assessmentId: number, onEvent: (event: import('./types').AISuggestionEvent) => void) {
+  return streamApi(`/assessments/${assessmentId}/ai-suggestions?stream=1`, onEvent, { method: 'POST', body: '{}' })
+}
+
 // Mock: create tags in Google Workspace (demo only; no real API call)
 export function createMockGoogleWorkspaceTag(
   orgId: number,
@@ -217,9 +298,9 @@ export function createMockGoogleWorkspaceTag(
   })
 }
 
-// Workflow: create tickets for all findings across integrations
+// Workflow: queue tickets for all findings across integrations (poll listTicketOutbox with batch_id)
 export function runWorkflow(orgId: number, assessmentId: number, includeAiSuggestions = true) {
-  return api<{ created: { provider: string; finding_key: string; url?: string; id?: string; key?: string }[]; errors: { provider: string; finding_key: string; detail: string }[] }>(
+  return api<{ batch_id: string; status_url: string; stream_url: string; queued: import('./types').TicketOutboxItem[]; skipped: { provider: string; finding_key: string; url?: string; id?: string; detail?: string }[]; errors: { provider: string; finding_key: string; detail: string }[] }>(
     `/orgs/${orgId}/run-workflow`,
     {
       method: 'POST',
@@ -10,6 +10,22 @@ export interface Organization {
   primary_domain: string
   saas_stack: Record<string, string>
   created_at: string
+  // Present on org list/detail responses
+  posture?: OrgPosture | null
+}
+
+export interface OrgPosture {
+  assessment: number | null
+  assessed_at: string | null
+  score: number | null
+  risk_band: string
+  insurance_readiness: string
+  open_high_findings: number
+  scan_run: number | null
+  scanned_at: string | null
+  scan_status: string
+  cert_days_until_expiry: number | null
+  updated_at: string
 }
 
 export interface Assessment {
@@ -25,6 +41,7 @@ export interface Assessment {
   downtime_days_low: number
   downtime_days_high: number
   insurance_readiness: string
+  ruleset_version: number | null
   checklist_notes?: Record<string, string>
 }
 
@@ -52,10 +69,74 @@ export interface ScanRun {
   website_headers?: unknown
 }
 
+export type SectionDiff = Record<string, { from: unknown; to: unknown }>
+
+export interface ScanHistoryEntry {
+  id: number
+  scanned_at: string
+  overall_scan_status: string
+  // Only sections that changed since the previous run
+  changes?: Record<string, SectionDiff>
+  // Oldest run: full sections
+  snapshot?: Record<string, unknown>
+}
+
+export interface ScanHistoryPage {
+  results: ScanHistoryEntry[]
+  next_before: number | null
+}
+
+export interface ScanJob {
+  id: number
+  organization: number
+  status: 'queued' | 'running' | 'done' | 'failed'
+  created_at: string
+  started_at: string | null
+  finished_at: string | null
+  progress: Record<string, Record<string, unknown>>
+  scan_run: ScanRun | null
+  error: string
+}
+
+export type ScanJobEvent =
+  | { event: 'status'; status: ScanJob['status'] }
+  | { event: 'probe'; probe: string; result: Record<string, unknown> }
+  | { event: 'done'; job: ScanJob }
+  | { event: 'ping' | 'timeout' }
+
+export interface TicketOutboxItem {
+  id: number
+  organization: number
+  assessment: number
+  finding_key: string
+  provider: string
+  batch_id: string
+  title: string
+  status: 'queued' | 'sending' | 'delivered' | 'failed'
+  attempts: number
+  next_attempt_at: string
+  last_error: string
+  external_id: string
+  url: string
+  created_at: string
+  delivered_at: string | null
+}
+
+export type TicketOutboxEvent =
+  | { event: 'ticket'; item: TicketOutboxItem }
+  | { event: 'done'; counts: Record<TicketOutboxItem['status'], number> }
+  | { event: 'ping' | 'timeout' }
+
+export type AISuggestionEvent =
+  | { event: 'suggestion'; finding_key: string; suggestions: string[]; tags: string[] }
+  | { event: 'done'; count: number }
+
 export interface ReportRun {
   id: number
   organization: number
   generated_at: string
+  linked_assessment: number | null
+  linked_scan: number | null
   summary: string
   top_risks: string[]
   recommendations: { title: string; steps: string[] }[]
@@ -65,3 +146,21 @@ export interface LoginResponse {
   access: string
   refresh: string
 }
+
+export interface CursorPage<T> {
+  next: string | null
+  previous: string | null
+  results: T[]
+}
+
+export type AssessmentSummary = Pick<
+  Assessment,
+  'id' | 'created_at' | 'completed_at' | 'score' | 'risk_band' | 'insurance_readiness' | 'ruleset_version'
+> & { organization: number }
+
+export type ScanRunSummary = Pick<ScanRun, 'id' | 'organization' | 'scanned_at' | 'overall_scan_status'>
+
+export type ReportRunSummary = Pick<
+  ReportRun,
+  'id' | 'organization' | 'generated_at' | 'linked_assessment' | 'linked_scan' | 'summary'
+>
@@ -1,4 +1,4 @@
-// Must match backend PENALTIES / FINDING_DEFS keys. Values: yes | no | partial | enforced
+// Must match backend ruleset keys (guardrail/rulesets/v<N>.json penalties / findings). Values: yes | no | partial | enforced
 export const CHECKUP_QUESTIONS: { key: string; label: string; options?: ('yes' | 'no' | 'partial')[] }[] = [
   { key: 'mfa_all', label: 'Do all staff use 2-step login (MFA) for work accounts?', options: ['yes', 'partial', 'no'] },
   { key: 'admin_protection', label: 'Are admin accounts protected (separate accounts, MFA)?', options: ['yes', 'no'] },
@@ -47,7 +47,7 @@ export default function OrgDetail() {
   const [mockGoogleResultByKey, setMockGoogleResultByKey] = useState<Record<string, string>>({})
   const [mockGoogleLoading, setMockGoogleLoading] = useState<string | null>(null)
   const [workflowRunning, setWorkflowRunning] = useState(false)
-  const [workflowResult, setWorkflowResult] = useState<{ created: number; errors: number } | null>(null)
+  const [workflowResult, setWorkflowResult] = useState<{ queued: number; skipped: number; errors: number; delivered?: number; failed?: number } | null>(null)
   const actionItemRefs = useRef<Record<string, HTMLDivElement | null>>({})
   const [assessmentHistoryOpen, setAssessmentHistoryOpen] = useState(false)
 
@@ -260,9 +260,14 @@ export default function OrgDetail() {
                     setWorkflowResult(null)
                     try {
                       const result = await api.runWorkflow(orgId, latest.id, true)
-                      setWorkflowResult({ created: result.created.length, errors: result.errors.length })
+                      setWorkflowResult({ queued: result.queued.length, skipped: result.skipped?.length ?? 0, errors: result.errors.length })
+                      if (result.queued.length) {
+                        api.streamTicketOutbox(orgId, result.batch_id, (e) => {
+                          if (e.event === 'done') setWorkflowResult((prev) => prev && { ...prev, delivered: e.counts.delivered, failed: e.counts.failed })
+                        }).catch(() => {})
+                      }
                     } catch {
-                      setWorkflowResult({ created: 0, errors: 1 })
+                      setWorkflowResult({ queued: 0, skipped: 0, errors: 1 })
                     } finally {
                       setWorkflowRunning(false)
                     }
@@ -275,7 +280,8 @@ export default function OrgDetail() {
             </div>
             {workflowResult && (
               <p className="text-sm text-[var(--text-secondary)] mb-3">
-                Workflow: {workflowResult.created} ticket(s) created, {workflowResult.errors} error(s).
+                Workflow: {workflowResult.queued} ticket(s) queued for delivery, {workflowResult.skipped} already existed or queued, {workflowResult.errors} error(s).
+                {workflowResult.delivered !== undefined && ` Delivered ${workflowResult.delivered}, failed ${workflowResult.failed ?? 0}.`}
               </p>
             )}
             <div className="space-y-3 flex-1 min-h-0 overflow-y-auto pr-2 max-h-[70vh]">
@@ -424,16 +430,21 @@ export default function OrgDetail() {
                                     setTicketCreating(key)
                                     setTicketResult((prev) => ({ ...prev, [key]: {} }))
                                     try {
-                                      const data = await api.createTicket(
+                                      const queued = await api.createTicket(
                                         orgId,
                                         'trello',
                                         latest.id,
                                         q.key,
                                         aiSuggestionsByKey[q.key]?.length ? aiSuggestionsByKey[q.key] : undefined
                                       )
+                                      let item = await api.getTicketOutboxItem(queued.outbox_id)
+                                      for (let i = 0; i < 30 && (item.status === 'queued' || item.status === 'sending'); i++) {
+                                        await new Promise((resolve) => setTimeout(resolve, 1000))
+                                        item = await api.getTicketOutboxItem(queued.outbox_id)
+                                      }
                                       setTicketResult((prev) => ({
                                         ...prev,
-                                        [key]: data.url ? { url: data.url } : {},
+                                        [key]: item.status === 'failed' ? { error: item.last_error || 'Ticket delivery failed' } : item.url ? { url: item.url } : {},
                                       }))
                                     } catch (e) {
                                       setTicketResult((prev) => ({ ...prev, [key]: { error: (e as Error).message } }))